@@ -57,6 +57,16 @@ options:
           to reference an existing distribution. If not specified, this defaults to a datetime stamp of the format
           'YYYY-MM-DDTHH:MM:SS.ffffff'.
 
+    caller_reference_cache:
+      description:
+        - Directory in which to remember which distribution each I(caller_reference) belongs to.
+        - Without it, finding a distribution by I(caller_reference) fetches distributions one by one until
+          one matches. With it, a remembered distribution is checked with a single C(get_distribution), and
+          distributions whose caller reference is already known are never fetched again, since a caller
+          reference can't change.
+        - Each account has its own cache file in the directory.
+      version_added: "2.8"
+
     tags:
       description:
         - Should be input as a dict() of key-value pairs.
@@ -289,7 +299,9 @@ options:
     wait:
       description:
         - Specifies whether the module waits until the distribution has completed processing the creation or update.
-      type: bool
+        - C(async) doesn't wait, and returns a C(deployment) token instead. Register the tokens of many
+          distributions and wait for all of their deployments at once with M(cloudfront_distribution_wait).
+      choices: [ 'yes', 'no', 'async' ]
       default: 'no'
 
     wait_timeout:
@@ -398,6 +410,27 @@ EXAMPLES = '''
 - cloudfront_distribution:
     state: absent
     caller_reference: replaceable distribution
+
+# update many distributions, then wait for all of their deployments together
+
+- cloudfront_distribution:
+    state: present
+    caller_reference: "{{ item }}"
+    comment: modified by cloudfront.py again
+    wait: async
+  loop: "{{ distribution_caller_references }}"
+  register: updated
+
+- cloudfront_distribution_wait:
+    deployments: "{{ updated.results | selectattr('deployment', 'defined') | map(attribute='deployment') | list }}"
+
+# look distributions up by caller reference quickly on later runs
+
+- cloudfront_distribution:
+    state: present
+    caller_reference: my test distribution
+    caller_reference_cache: ~/.ansible/tmp/cloudfront
+    comment: modified by cloudfront.py again
 '''
 
 RETURN = '''
@@ -859,11 +892,32 @@ default_root_object:
   returned: always
   type: string
   sample: ''
+deployment:
+  description:
+    - Token to wait for the deployment this task started with M(cloudfront_distribution_wait).
+  returned: when I(wait=async) and the distribution was created or its configuration updated
+  type: complex
+  contains:
+    distribution_id:
+      description: The distribution being deployed
+      type: string
+      sample: E1RP5A2MJ8073O
+    caller_reference:
+      description: The caller reference of the distribution
+      type: string
+      sample: my test distribution
 diff:
-  description: Difference between previous configuration and new configuration
+  description:
+    - Difference between previous configuration and new configuration.
+    - C(before) and C(after) map the path of each changed setting to its old and new value. Lists CloudFront
+      treats as sets are compared regardless of order, lists of origins, behaviors, error responses, headers
+      and Lambda associations are compared item by item, and empty settings compare equal to missing ones.
   returned: always
   type: dict
-  sample: {}
+  sample: {
+    "before": {"Origins[Id=origin1].OriginPath": "/v1", "Comment": "old"},
+    "after": {"Origins[Id=origin1].OriginPath": "/v2", "Comment": "new"}
+  }
 domain_name:
   description: Domain name of cloudfront distribution
   returned: always
@@ -1093,11 +1147,14 @@ web_acl_id:
 from ansible.module_utils._text import to_text, to_native
 from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.aws.cloudfront_facts import CloudFrontFactsServiceManager
+from ansible.module_utils.aws.cache import cache_file, load_cache, save_cache
+from ansible.module_utils.parsing.convert_bool import boolean
 from ansible.module_utils.ec2 import get_aws_connection_info
 from ansible.module_utils.ec2 import ec2_argument_spec, boto3_conn, compare_aws_tags
 from ansible.module_utils.ec2 import camel_dict_to_snake_dict, ansible_dict_to_boto3_tag_list
 from ansible.module_utils.ec2 import snake_dict_to_camel_dict, boto3_tag_list_to_ansible_dict
 import datetime
+import json
 
 try:
     from collections import OrderedDict
@@ -1147,28 +1204,91 @@ def ansible_list_to_cloudfront_list(list_items=None, include_quantity=True):
     return result
 
 
-def recursive_diff(dict1, dict2):
-    left = dict((k, v) for (k, v) in dict1.items() if k not in dict2)
-    right = dict((k, v) for (k, v) in dict2.items() if k not in dict1)
-    for k in (set(dict1.keys()) & set(dict2.keys())):
-        if isinstance(dict1[k], dict) and isinstance(dict2[k], dict):
-            result = recursive_diff(dict1[k], dict2[k])
-            if result:
-                left[k] = result[0]
-                right[k] = result[1]
-        elif dict1[k] != dict2[k]:
-            left[k] = dict1[k]
-            right[k] = dict2[k]
-    if left or right:
-        return left, right
-    else:
-        return None
+# Lists CloudFront applies in order; every other list of a distribution config is a set
+ORDERED_CONFIG_LISTS = frozenset(['CacheBehaviors', 'Members'])
+# Keys that identify the items of a list, so that lists are diffed item by item
+CONFIG_ITEM_ID_KEYS = ('Id', 'PathPattern', 'ErrorCode', 'EventType', 'HeaderName')
+# Values that mean the same as leaving a setting out
+EMPTY_CONFIG_VALUES = (None, '', [], {})
+
+
+def config_item_id(item):
+    if isinstance(item, dict):
+        for key in CONFIG_ITEM_ID_KEYS:
+            if key in item:
+                return '{0}={1}'.format(key, item[key])
+    return None
+
+
+def canonical_config(node, key=None):
+    """
+    Canonical form of a distribution config, for comparing configs
+
+    Quantity/Items wrappers become plain lists, since Quantity is derived from
+    Items, unordered lists are sorted and empty settings are left out.
+    """
+    if isinstance(node, dict):
+        if 'Quantity' in node:
+            items = canonical_config(node.get('Items') or [], key)
+            others = canonical_config(dict((k, v) for k, v in node.items() if k not in ('Quantity', 'Items')))
+            if not others:
+                return items
+            others['Items'] = items
+            return others
+        result = {}
+        for k, v in node.items():
+            v = canonical_config(v, k)
+            if v not in EMPTY_CONFIG_VALUES:
+                result[k] = v
+        return result
+    if isinstance(node, list):
+        items = [canonical_config(item) for item in node]
+        if key not in ORDERED_CONFIG_LISTS:
+            items.sort(key=lambda item: config_item_id(item) or json.dumps(item, sort_keys=True, default=str))
+        return items
+    return node
+
+
+def config_changes(before, after, path='', key=None):
+    """
+    Minimal list of (path, before, after) at which two canonical configs differ, None meaning not set
+    """
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for k in sorted(set(before) | set(after)):
+            changes.extend(config_changes(before.get(k), after.get(k), '{0}.{1}'.format(path, k) if path else k, k))
+        return changes
+    if isinstance(before, list) and isinstance(after, list):
+        before_ids = [config_item_id(item) for item in before]
+        after_ids = [config_item_id(item) for item in after]
+        ids = before_ids + after_ids
+        if ids and None not in ids and len(set(before_ids)) == len(before) and len(set(after_ids)) == len(after):
+            before_items = dict(zip(before_ids, before))
+            after_items = dict(zip(after_ids, after))
+            changes = []
+            if key in ORDERED_CONFIG_LISTS:
+                common = set(before_ids) & set(after_ids)
+                before_order = [i for i in before_ids if i in common]
+                after_order = [i for i in after_ids if i in common]
+                if before_order != after_order:
+                    changes.append(('{0}[order]'.format(path), before_order, after_order))
+            for item_id in sorted(set(ids)):
+                changes.extend(config_changes(before_items.get(item_id), after_items.get(item_id), '{0}[{1}]'.format(path, item_id)))
+            return changes
+    if before != after:
+        return [(path, before, after)]
+    return []
+
+
+def changes_to_diff(changes):
+    return dict(before=dict((path, before) for path, before, after in changes),
+                after=dict((path, after) for path, before, after in changes))
 
 
 def create_distribution(client, module, config, tags):
     try:
         if not tags:
-            return client.create_distribution(DistributionConfig=config)['Distribution']
+            return client.create_distribution(DistributionConfig=config)
         else:
             distribution_config_with_tags = {
                 'DistributionConfig': config,
@@ -1176,7 +1296,7 @@ def create_distribution(client, module, config, tags):
                     'Items': tags
                 }
             }
-            return client.create_distribution_with_tags(DistributionConfigWithTags=distribution_config_with_tags)['Distribution']
+            return client.create_distribution_with_tags(DistributionConfigWithTags=distribution_config_with_tags)
     except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
         module.fail_json_aws(e, msg="Error creating distribution")
 
@@ -1190,7 +1310,7 @@ def delete_distribution(client, module, distribution):
 
 def update_distribution(client, module, config, distribution_id, e_tag):
     try:
-        return client.update_distribution(DistributionConfig=config, Id=distribution_id, IfMatch=e_tag)['Distribution']
+        return client.update_distribution(DistributionConfig=config, Id=distribution_id, IfMatch=e_tag)
     except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
         module.fail_json_aws(e, msg="Error updating distribution to %s" % to_native(config))
 
@@ -1234,9 +1354,18 @@ class CloudFrontValidationManager(object):
     Manages Cloudfront validations
     """
 
-    def __init__(self, module):
+    def __init__(self, module, client=None):
         self.__cloudfront_facts_mgr = CloudFrontFactsServiceManager(module)
         self.module = module
+        self.client = client
+        self.__distribution_aliases = None
+        self.__caller_references = {}
+        self.__caller_reference_cache = None
+        if module.params.get('caller_reference_cache'):
+            # caller references are only unique within an account
+            self.__caller_reference_cache = cache_file(module.params.get('caller_reference_cache'), 'cloudfront-caller-references',
+                                                       self.account_id())
+            self.__caller_references = load_cache(self.__caller_reference_cache) or {}
         self.__default_distribution_enabled = True
         self.__default_http_port = 80
         self.__default_https_port = 443
@@ -1772,20 +1901,74 @@ class CloudFrontValidationManager(object):
         if attribute is not None and attribute not in allowed_list:
             self.module.fail_json(msg='The attribute {0} must be one of [{1}]'.format(attribute_name, ' '.join(str(a) for a in allowed_list)))
 
+    def distribution_index(self):
+        """
+        Aliases of every distribution by id, from a single list_distributions sweep per run
+        """
+        if self.__distribution_aliases is None:
+            distributions = self.__cloudfront_facts_mgr.list_distributions(False) or []
+            self.__distribution_aliases = OrderedDict((distribution['Id'], distribution.get('Aliases', {}).get('Items', []))
+                                                      for distribution in distributions)
+        return self.__distribution_aliases
+
+    def remember_caller_reference(self, caller_reference, distribution_id, save=True):
+        if self.__caller_references.get(caller_reference) != distribution_id:
+            if distribution_id is None:
+                self.__caller_references.pop(caller_reference, None)
+            else:
+                self.__caller_references[caller_reference] = distribution_id
+            if save:
+                self.save_caller_references()
+
+    def account_id(self):
+        region, ec2_url, aws_connect_kwargs = get_aws_connection_info(self.module, boto3=True)
+        sts = boto3_conn(self.module, conn_type='client', resource='sts', region=region or 'us-east-1', **aws_connect_kwargs)
+        try:
+            return sts.get_caller_identity()['Account']
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            self.module.fail_json_aws(e, msg="Couldn't get the account id for the caller reference cache")
+
+    def save_caller_references(self):
+        if self.__caller_reference_cache:
+            save_cache(self.__caller_reference_cache, self.__caller_references)
+
+    def get_distribution_if_caller_reference(self, distribution_id, caller_reference):
+        """
+        Get a distribution remembered for caller_reference, or None if it can't be fetched or doesn't match
+        """
+        try:
+            distribution = self.client.get_distribution(Id=distribution_id)
+        except botocore.exceptions.ClientError:
+            # whatever went wrong, the full lookup can still find the distribution
+            return None
+        if distribution['Distribution']['DistributionConfig'].get('CallerReference') != caller_reference:
+            return None
+        return distribution
+
     def validate_distribution_from_caller_reference(self, caller_reference):
         try:
-            distributions = self.__cloudfront_facts_mgr.list_distributions(False)
-            distribution_name = 'Distribution'
-            distribution_config_name = 'DistributionConfig'
-            distribution_ids = [dist.get('Id') for dist in distributions]
-            for distribution_id in distribution_ids:
-                config = self.__cloudfront_facts_mgr.get_distribution(distribution_id)
-                distribution = config.get(distribution_name)
+            distribution_id = self.__caller_references.get(caller_reference)
+            if distribution_id:
+                distribution = self.get_distribution_if_caller_reference(distribution_id, caller_reference)
                 if distribution is not None:
-                    distribution_config = distribution.get(distribution_config_name)
-                    if distribution_config is not None and distribution_config.get('CallerReference') == caller_reference:
-                        distribution['DistributionConfig'] = distribution_config
-                        return distribution
+                    return distribution
+                self.remember_caller_reference(caller_reference, None)
+
+            # A caller reference never changes, so distributions already remembered under another one can be skipped
+            known_ids = set(self.__caller_references.values())
+            found = None
+            for distribution_id in self.distribution_index():
+                if distribution_id in known_ids:
+                    continue
+                distribution = self.__cloudfront_facts_mgr.get_distribution(distribution_id)
+                distribution_caller_reference = distribution.get('Distribution', {}).get('DistributionConfig', {}).get('CallerReference')
+                if distribution_caller_reference is not None:
+                    self.remember_caller_reference(distribution_caller_reference, distribution_id, save=False)
+                if distribution_caller_reference == caller_reference:
+                    found = distribution
+                    break
+            self.save_caller_references()
+            return found
 
         except Exception as e:
             self.module.fail_json_aws(e, msg="Error validating distribution from caller reference")
@@ -1804,17 +1987,14 @@ class CloudFrontValidationManager(object):
             self.module.fail_json_aws(e, msg="Error validating distribution_id from alias, aliases and caller reference")
 
     def validate_distribution_id_from_alias(self, aliases):
-        distributions = self.__cloudfront_facts_mgr.list_distributions(False)
-        if distributions:
-            for distribution in distributions:
-                distribution_aliases = distribution.get('Aliases', {}).get('Items', [])
-                if set(aliases) & set(distribution_aliases):
-                    return distribution['Id']
+        for distribution_id, distribution_aliases in self.distribution_index().items():
+            if set(aliases) & set(distribution_aliases):
+                return distribution_id
         return None
 
     def wait_until_processed(self, client, wait_timeout, distribution_id, caller_reference):
         if distribution_id is None:
-            distribution_id = self.validate_distribution_id_from_caller_reference(caller_reference=caller_reference)
+            distribution_id = self.validate_distribution_from_caller_reference(caller_reference=caller_reference)['Distribution']['Id']
 
         try:
             waiter = client.get_waiter('distribution_deployed')
@@ -1860,12 +2040,14 @@ def main():
         ipv6_enabled=dict(type='bool'),
         default_origin_domain_name=dict(),
         default_origin_path=dict(),
-        wait=dict(default=False, type='bool'),
+        caller_reference_cache=dict(type='path'),
+        wait=dict(default='no', type='str'),
         wait_timeout=dict(default=1800, type='int')
     ))
 
     result = {}
     changed = True
+    config_changed = False
 
     module = AnsibleAWSModule(
         argument_spec=argument_spec,
@@ -1880,7 +2062,7 @@ def main():
     region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
     client = boto3_conn(module, conn_type='client', resource='cloudfront', region=region, endpoint=ec2_url, **aws_connect_kwargs)
 
-    validation_mgr = CloudFrontValidationManager(module)
+    validation_mgr = CloudFrontValidationManager(module, client)
 
     state = module.params.get('state')
     caller_reference = module.params.get('caller_reference')
@@ -1914,6 +2096,12 @@ def main():
     wait = module.params.get('wait')
     wait_timeout = module.params.get('wait_timeout')
 
+    if wait != 'async':
+        try:
+            wait = boolean(wait)
+        except TypeError:
+            module.fail_json(msg="wait must be a boolean or 'async', not {0}".format(wait))
+
     if alias and alias not in aliases:
         aliases.append(alias)
 
@@ -1956,37 +2144,45 @@ def main():
 
     if create:
         config['CallerReference'] = validation_mgr.validate_caller_reference(caller_reference)
-        result = create_distribution(client, module, config, ansible_dict_to_boto3_tag_list(tags))
+        response = create_distribution(client, module, config, ansible_dict_to_boto3_tag_list(tags))
+        result, e_tag = response['Distribution'], response['ETag']
+        distribution_id = result['Id']
+        validation_mgr.remember_caller_reference(config['CallerReference'], distribution_id)
         result = camel_dict_to_snake_dict(result)
         result['tags'] = list_tags_for_resource(client, module, result['arn'])
 
     if delete:
         if config['Enabled']:
             config['Enabled'] = False
-            result = update_distribution(client, module, config, distribution_id, e_tag)
+            # the ETag of the disabled distribution comes back with the update, so it needn't be looked up again
+            distribution = update_distribution(client, module, config, distribution_id, e_tag)
             validation_mgr.wait_until_processed(client, wait_timeout, distribution_id, config.get('CallerReference'))
-        distribution = validation_mgr.validate_distribution_from_aliases_caller_reference(distribution_id, aliases, caller_reference)
-        # e_tag = distribution['ETag']
         result = delete_distribution(client, module, distribution)
+        validation_mgr.remember_caller_reference(config.get('CallerReference'), None)
 
     if update:
-        changed = config != distribution['Distribution']['DistributionConfig']
-        if changed:
-            result = update_distribution(client, module, config, distribution_id, e_tag)
+        # only update when a setting really differs, as every update starts a new deployment
+        changes = config_changes(canonical_config(distribution['Distribution']['DistributionConfig']), canonical_config(config))
+        config_changed = bool(changes)
+        if config_changed:
+            response = update_distribution(client, module, config, distribution_id, e_tag)
+            result, e_tag = response['Distribution'], response['ETag']
         else:
             result = distribution['Distribution']
         existing_tags = list_tags_for_resource(client, module, result['ARN'])
-        distribution['Distribution']['DistributionConfig']['tags'] = existing_tags
-        changed |= update_tags(client, module, existing_tags, tags, purge_tags, result['ARN'])
+        if update_tags(client, module, existing_tags, tags, purge_tags, result['ARN']):
+            result_tags = list_tags_for_resource(client, module, result['ARN'])
+            changes.extend(config_changes(existing_tags, result_tags, 'tags'))
+        else:
+            result_tags = existing_tags
         result = camel_dict_to_snake_dict(result)
-        result['distribution_config']['tags'] = config['tags'] = list_tags_for_resource(client, module, result['arn'])
-        result['diff'] = dict()
-        diff = recursive_diff(distribution['Distribution']['DistributionConfig'], config)
-        if diff:
-            result['diff']['before'] = diff[0]
-            result['diff']['after'] = diff[1]
-
-    if wait and (create or update):
+        result['distribution_config']['tags'] = result_tags
+        result['diff'] = changes_to_diff(changes) if changes else dict()
+        changed = bool(changes)
+
+    if wait == 'async' and (create or (update and config_changed)):
+        result['deployment'] = dict(distribution_id=distribution_id, caller_reference=config.get('CallerReference'))
+    elif wait and (create or (update and config_changed)):
         validation_mgr.wait_until_processed(client, wait_timeout, distribution_id, config.get('CallerReference'))
 
     if 'distribution_config' in result:
@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# Copyright: Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: cloudfront_distribution_wait
+version_added: "2.8"
+short_description: Wait for many CloudFront deployments at once
+description:
+    - Waits until every given CloudFront distribution is deployed, and every given
+      invalidation is completed.
+    - Takes the C(deployment) tokens M(cloudfront_distribution) returns with I(wait=async),
+      so a play can update many distributions without waiting for each one in turn,
+      and then wait for all of them in a single task.
+    - All pending deployments are checked in one loop. While more than one distribution
+      is pending, a single paginated C(list_distributions) returns all of their statuses.
+      The delay between checks starts at I(min_delay) and grows to I(max_delay), since
+      deployments take minutes rather than seconds.
+requirements: [ boto3 ]
+options:
+    deployments:
+        description:
+            - The deployments to wait for.
+            - Each item is either a distribution id, or a dict with the key C(distribution_id) and
+              optionally C(invalidation_id), as returned in C(deployment) by M(cloudfront_distribution).
+            - An item with both keys is finished once the distribution is deployed and the invalidation
+              is completed.
+        required: true
+    wait_timeout:
+        description:
+            - How many seconds to wait for all deployments to finish.
+        default: 1800
+    min_delay:
+        description:
+            - Seconds between the first checks.
+        default: 10
+    max_delay:
+        description:
+            - The most seconds between two checks.
+        default: 60
+author:
+ - Ansible Project
+extends_documentation_fragment:
+  - aws
+  - ec2
+'''
+
+EXAMPLES = '''
+- cloudfront_distribution:
+    state: present
+    caller_reference: "{{ item }}"
+    enabled: yes
+    wait: async
+  loop: "{{ distribution_caller_references }}"
+  register: updated
+
+- cloudfront_distribution_wait:
+    deployments: "{{ updated.results | selectattr('deployment', 'defined') | map(attribute='deployment') | list }}"
+    wait_timeout: 3600
+
+- cloudfront_distribution_wait:
+    deployments:
+      - E1RP5A2MJ8073O
+      - distribution_id: E2QWRUHAPOMQZL
+        invalidation_id: I2J0I21PCUYOIK
+'''
+
+RETURN = '''
+deployments:
+    type: list
+    description:
+        - Per deployment, its distribution, its invalidation if any, and how many seconds it was waited for.
+        - C(status) is the status of the distribution, C(invalidation_status) that of the invalidation.
+    returned: always
+    sample:
+        - distribution_id: E1RP5A2MJ8073O
+          invalidation_id: null
+          status: Deployed
+          invalidation_status: null
+          waited: 742
+pending:
+    type: list
+    description: The deployments that were still in progress when I(wait_timeout) ran out
+    returned: on timeout
+'''
+
+import time
+
+try:
+    import botocore
+except ImportError:
+    pass  # handled by AnsibleAWSModule
+
+from ansible.module_utils.aws.core import AnsibleAWSModule
+from ansible.module_utils.ec2 import AWSRetry, ec2_argument_spec
+from ansible.module_utils.six import string_types
+
+
+@AWSRetry.jittered_backoff()
+def distribution_statuses(client):
+    paginator = client.get_paginator('list_distributions')
+    distributions = paginator.paginate().build_full_result().get('DistributionList', {}).get('Items', [])
+    return dict((distribution['Id'], distribution['Status']) for distribution in distributions)
+
+
+@AWSRetry.jittered_backoff()
+def distribution_status(client, distribution_id):
+    return client.get_distribution(Id=distribution_id)['Distribution']['Status']
+
+
+@AWSRetry.jittered_backoff()
+def invalidation_status(client, distribution_id, invalidation_id):
+    return client.get_invalidation(DistributionId=distribution_id, Id=invalidation_id)['Invalidation']['Status']
+
+
+def deployment_spec(item):
+    if isinstance(item, string_types):
+        item = dict(distribution_id=item)
+    if not isinstance(item, dict) or not item.get('distribution_id'):
+        raise ValueError('Every deployment needs a distribution_id: {0}'.format(item))
+    invalidation_id = item.get('invalidation_id')
+    return dict(distribution_id=item['distribution_id'], invalidation_id=invalidation_id,
+                status='InProgress', invalidation_status='InProgress' if invalidation_id else None, waited=None)
+
+
+def check_deployments(client, pending):
+    """Update the status of the pending deployments, returning those still in progress"""
+    statuses = {}
+    distribution_ids = set(d['distribution_id'] for d in pending if d['status'] != 'Deployed')
+    if len(distribution_ids) > 1:
+        statuses = distribution_statuses(client)
+    for deployment in pending:
+        if deployment['status'] != 'Deployed':
+            if deployment['distribution_id'] in statuses:
+                deployment['status'] = statuses[deployment['distribution_id']]
+            else:
+                deployment['status'] = distribution_status(client, deployment['distribution_id'])
+        if deployment['invalidation_id'] and deployment['invalidation_status'] != 'Completed':
+            deployment['invalidation_status'] = invalidation_status(client, deployment['distribution_id'], deployment['invalidation_id'])
+    return [d for d in pending if d['status'] != 'Deployed' or d['invalidation_status'] not in (None, 'Completed')]
+
+
+def main():
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(dict(
+        deployments=dict(required=True, type='list'),
+        wait_timeout=dict(type='int', default=1800),
+        min_delay=dict(type='int', default=10),
+        max_delay=dict(type='int', default=60),
+    ))
+    module = AnsibleAWSModule(argument_spec=argument_spec, supports_check_mode=True)
+
+    try:
+        deployments = [deployment_spec(item) for item in module.params['deployments']]
+    except ValueError as e:
+        module.fail_json(msg=str(e))
+
+    client = module.client('cloudfront')
+    start = time.time()
+    deadline = start + module.params['wait_timeout']
+    delay = module.params['min_delay']
+    pending = deployments
+    while True:
+        try:
+            pending = check_deployments(client, pending)
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            module.fail_json_aws(e, msg='Could not check the status of the deployments')
+        now = time.time()
+        for deployment in deployments:
+            if deployment['waited'] is None and deployment not in pending:
+                deployment['waited'] = int(now - start)
+        if not pending:
+            break
+        if now >= deadline:
+            module.fail_json(msg='Timeout waiting for {0} of {1} cloudfront deployments'.format(len(pending), len(deployments)),
+                             deployments=deployments, pending=pending)
+        time.sleep(min(delay, deadline - now))
+        delay = min(module.params['max_delay'], int(delay * 1.5) or 1)
+
+    module.exit_json(changed=False, deployments=deployments)
+
+
+if __name__ == '__main__':
+    main()
@@ -33,10 +33,99 @@ options:
     default: 99
   state:
     description:
-      - present, absent
+      - present, absent, list or enforce
+      - enforce brings the retention, KMS key and tags of every existing log group
+        matching I(select) to the given values. The log groups are listed once,
+        the differences are worked out in memory, and only the groups that differ
+        are changed, I(max_concurrency) at a time and under the CloudWatch Logs
+        request rate limits.
+      - export writes the events of I(log_group_name) between I(start_time) and I(end_time)
+        to I(dest), one JSON object per line. The time range is split in I(time_shards),
+        times each of I(log_stream_names) if given, and the shards are read concurrently
+        with C(filter_log_events). Events are written page by page as they arrive.
     required: false
     default: present
-    choices: ['present', 'absent']
+    choices: ['present', 'absent', 'list', 'enforce', 'export']
+  select:
+    description:
+      - Glob patterns (eg. C(/aws/lambda/*)) of the log groups I(state=enforce) works on.
+        A pattern without wildcards selects a single log group.
+    required: false
+    version_added: "2.8"
+  retention_in_days:
+    description:
+      - Days the events of the selected log groups are kept. 0 keeps them forever.
+    required: false
+    version_added: "2.8"
+  kms_key_id:
+    description:
+      - ARN of the KMS key the selected log groups are encrypted with. An empty string removes the key.
+    required: false
+    version_added: "2.8"
+  tags:
+    description:
+      - Tags the selected log groups must have.
+    required: false
+    version_added: "2.8"
+  purge_tags:
+    description:
+      - Remove the tags of the selected log groups that are not in I(tags).
+    type: bool
+    default: 'no'
+    version_added: "2.8"
+  max_concurrency:
+    description:
+      - How many log groups are read and changed at the same time with I(state=enforce),
+        or how many shards are read at the same time with I(state=export).
+    default: 4
+    version_added: "2.8"
+  dest:
+    description:
+      - File I(state=export) appends the events to.
+    required: false
+    version_added: "2.8"
+  compress:
+    description:
+      - Gzip I(dest). Every page of events is appended as a gzip member, which gzip tools read as one file.
+    type: bool
+    default: 'no'
+    version_added: "2.8"
+  start_time:
+    description:
+      - Start of the time range to export, as milliseconds since the epoch, as a UTC time
+        like C(2018-11-02T08:00:00), or relative to now like C(-2h) (units s, m, h and d).
+      - Ignored when I(cursor) shows an earlier run exported up to a later time.
+    default: -1h
+    version_added: "2.8"
+  end_time:
+    description:
+      - End of the time range to export, in the same formats as I(start_time).
+      - Events are ingested with some delay, so an end time a few minutes back misses fewer of them.
+    default: now
+    version_added: "2.8"
+  filter_pattern:
+    description:
+      - Only export the events matching this CloudWatch Logs filter pattern.
+    required: false
+    version_added: "2.8"
+  log_stream_names:
+    description:
+      - Only export these log streams, each read as shards of its own.
+    required: false
+    version_added: "2.8"
+  time_shards:
+    description:
+      - How many equal time slices the time range is split in.
+    default: 4
+    version_added: "2.8"
+  cursor:
+    description:
+      - File in which I(state=export) records its progress, defaults to I(dest) with C(.cursor) appended.
+      - A later run with the same cursor carries on with the shards left unfinished, then exports only
+        the events after the end of the previous run. A shard whose saved position has expired is read
+        again from its start, which may repeat some of its events.
+    required: false
+    version_added: "2.8"
 author: Mike Mochan(@mmochan)
 extends_documentation_fragment: aws
 '''
@@ -45,12 +134,48 @@ EXAMPLES = '''
 # Create a CloudWatch LogGroup.
 
 
+# Keep Lambda logs for two weeks, encrypted and tagged
+- cloudwatch_log:
+    state: enforce
+    select:
+      - /aws/lambda/*
+    retention_in_days: 14
+    kms_key_id: arn:aws:kms:us-east-1:123456789012:key/abcd1234-a123-456a-a12b-a123b4cd56ef
+    tags:
+      team: platform
+
+# Export yesterday's API errors, then pick up where it left off on every later run
+- cloudwatch_log:
+    state: export
+    log_group_name: /aws/lambda/api
+    filter_pattern: ERROR
+    start_time: -1d
+    dest: /tmp/incident-4711/api.ndjson.gz
+    compress: yes
 '''
 RETURN = '''
 task:
   description: The result of the present, and absent actions.
   returned: success
   type: dictionary
+results:
+  description: With I(state=enforce), the number of selected log groups and, per changed log group, what was changed.
+  returned: success
+  type: dictionary
+  sample:
+    selected: 1520
+    changed:
+      /aws/lambda/api: [put_retention_policy, tag_log_group]
+events:
+  description: With I(state=export), the number of events written to I(dest) by this run.
+  returned: success
+  type: int
+  sample: 18210
+until:
+  description: With I(state=export), the time in milliseconds since the epoch up to which the log group has been exported.
+  returned: success
+  type: int
+  sample: 1541146800000
 '''
 
 try:
@@ -62,10 +187,33 @@ except ImportError:
     HAS_BOTO3 = False
 
 from dateutil.tz import tzutc
+import calendar
 import datetime
+import fnmatch
+import gzip
+import io
+import os
+import re
+import threading
+import time
+
+# Requests per second CloudWatch Logs allows for each API, per account and region
+LOGS_REQUESTS_PER_SECOND = {
+    'describe_log_groups': 5,
+    'list_tags_log_group': 5,
+    'put_retention_policy': 5,
+    'delete_retention_policy': 5,
+    'associate_kms_key': 5,
+    'disassociate_kms_key': 5,
+    'tag_log_group': 5,
+    'untag_log_group': 5,
+}
+GLOB_CHARACTERS = re.compile(r'[*?\[]')
+RELATIVE_TIME = re.compile(r'^-(\d+)([smhd])$')
+SECONDS_PER_UNIT = dict(s=1, m=60, h=60 * 60, d=24 * 60 * 60)
 
 
-def create_log_group(client, name):
+def create_log_group(client, module, name):
     try:
         return client.create_log_group(logGroupName=name)
     except botocore.exceptions.ClientError as e:
@@ -79,14 +227,33 @@ def delete_log_group(client, module, name):
         module.fail_json(msg=str(e))
 
 
+def describe_all_log_groups(client, filter_prefix):
+    paginator = client.get_paginator('describe_log_groups')
+    params = dict(logGroupNamePrefix=filter_prefix) if filter_prefix else dict()
+    return AWSRetry.jittered_backoff()(paginator.paginate(**params).build_full_result)()['logGroups']
+
+
 def describe_log_groups(client, module, filter_prefix):
     try:
-        return client.describe_log_groups(logGroupNamePrefix=filter_prefix,
-                                          limit=50)
+        return dict(logGroups=describe_all_log_groups(client, filter_prefix))
     except botocore.exceptions.ClientError as e:
         module.fail_json(msg=str(e))
 
 
+def log_group_index(client, module, prefixes):
+    """Every log group whose name starts with one of prefixes, by name"""
+    prefixes = sorted(set(prefixes))
+    if '' in prefixes:
+        prefixes = ['']
+    # prefixes covered by a shorter one would list the same groups twice
+    prefixes = [p for p in prefixes if not any(p != other and p.startswith(other) for other in prefixes)]
+    index = dict()
+    for prefix in prefixes:
+        for log_group in describe_log_groups(client, module, prefix)['logGroups']:
+            index[log_group['logGroupName']] = log_group
+    return index
+
+
 def list_groups(client, module):
     changed = False
     result = None
@@ -99,13 +266,13 @@ def setup(client, module):
     changed = False
     result = None
     name = module.params.get('log_group_name')
-    filter_prefix = module.params.get('filter_prefix')
-    log_groups = describe_log_groups(client, module, filter_prefix)
-    if not log_groups['logGroups']:
+    log_groups = log_group_index(client, module, [name])
+    if name not in log_groups:
         changed = True
-        result = create_log_group(client, name)
+        if not module.check_mode:
+            result = create_log_group(client, module, name)
     else:
-        result = log_groups
+        result = dict(logGroups=[log_groups[name]])
     return changed, result
 
 
@@ -113,23 +280,254 @@ def teardown(client, module):
     changed = False
     result = None
     name = module.params.get('log_group_name')
-    filter_prefix = module.params.get('filter_prefix')
-    log_groups = describe_log_groups(client, module, filter_prefix)
-    if log_groups['logGroups']:
-        result = delete_log_group(client, module, name)
+    log_groups = log_group_index(client, module, [name])
+    if name in log_groups:
+        if not module.check_mode:
+            result = delete_log_group(client, module, name)
         changed = True
     return changed, result
 
 
+def throttled_call(limiter, func, **kwargs):
+    # AWSRetry comes from the module snippets imported at the bottom, so it can't decorate at import time
+    return AWSRetry.jittered_backoff()(limiter.call)(func, **kwargs)
+
+
+def plan_log_group(log_group, current_tags, retention, kms_key_id, tags, purge_tags):
+    """The calls, as (api, params), that bring one log group to the desired spec"""
+    name = log_group['logGroupName']
+    calls = []
+    if retention is not None and log_group.get('retentionInDays', 0) != retention:
+        if retention:
+            calls.append(('put_retention_policy', dict(logGroupName=name, retentionInDays=retention)))
+        else:
+            calls.append(('delete_retention_policy', dict(logGroupName=name)))
+    if kms_key_id is not None and log_group.get('kmsKeyId', '') != kms_key_id:
+        if kms_key_id:
+            calls.append(('associate_kms_key', dict(logGroupName=name, kmsKeyId=kms_key_id)))
+        else:
+            calls.append(('disassociate_kms_key', dict(logGroupName=name)))
+    if current_tags is not None:
+        to_tag = dict((k, v) for k, v in tags.items() if current_tags.get(k) != v)
+        if to_tag:
+            calls.append(('tag_log_group', dict(logGroupName=name, tags=to_tag)))
+        to_untag = [k for k in current_tags if k not in tags] if purge_tags else []
+        if to_untag:
+            calls.append(('untag_log_group', dict(logGroupName=name, tags=sorted(to_untag))))
+    return calls
+
+
+def enforce(client, module):
+    selectors = module.params.get('select') or []
+    if not selectors:
+        module.fail_json(msg='select is required with state=enforce')
+    retention = module.params.get('retention_in_days')
+    kms_key_id = module.params.get('kms_key_id')
+    tags = module.params.get('tags')
+    if tags is not None:
+        tags = dict((k, str(v)) for k, v in tags.items())
+    purge_tags = module.params.get('purge_tags')
+    max_workers = module.params.get('max_concurrency')
+    limiters = dict((api, RateLimiter(rate)) for api, rate in LOGS_REQUESTS_PER_SECOND.items())
+
+    index = log_group_index(client, module, [GLOB_CHARACTERS.split(selector)[0] for selector in selectors])
+    selected = [index[name] for name in sorted(index) if any(fnmatch.fnmatchcase(name, selector) for selector in selectors)]
+
+    def plan(log_group):
+        current_tags = None
+        if tags is not None:
+            current_tags = throttled_call(limiters['list_tags_log_group'], client.list_tags_log_group,
+                                          logGroupName=log_group['logGroupName']).get('tags', {})
+        return plan_log_group(log_group, current_tags, retention, kms_key_id, tags or {}, purge_tags)
+
+    plans = []
+    failures = dict()
+    for log_group, (calls, error) in zip(selected, run_concurrently(plan, selected, max_workers)):
+        if error is not None:
+            failures[log_group['logGroupName']] = str(error)
+        elif calls:
+            plans.append((log_group['logGroupName'], calls))
+
+    def apply(item):
+        for api, params in item[1]:
+            throttled_call(limiters[api], getattr(client, api), **params)
+
+    if not module.check_mode:
+        for (name, calls), (dummy, error) in zip(plans, run_concurrently(apply, plans, max_workers)):
+            if error is not None:
+                failures[name] = str(error)
+
+    result = dict(selected=len(selected), changed=dict((name, [api for api, params in calls]) for name, calls in plans))
+    if failures:
+        module.fail_json(msg='Failed to update {0} of {1} log groups'.format(len(failures), len(selected)),
+                         failures=failures, results=result)
+    return bool(plans), result
+
+
+def parse_time(value, now):
+    """Milliseconds since the epoch of an export time option"""
+    value = str(value).strip()
+    if value == 'now':
+        return now
+    if value.isdigit():
+        return int(value)
+    match = RELATIVE_TIME.match(value)
+    if match:
+        return now - int(match.group(1)) * SECONDS_PER_UNIT[match.group(2)] * 1000
+    parsed = datetime.datetime.strptime(value.rstrip('Z'), '%Y-%m-%dT%H:%M:%S')
+    return calendar.timegm(parsed.utctimetuple()) * 1000
+
+
+def time_slices(start, end, count):
+    """Split [start, end) in count contiguous slices"""
+    count = max(1, min(count, end - start))
+    bounds = [start + (end - start) * i // count for i in range(count + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(count)]
+
+
+class EventWriter(object):
+    """Appends events to dest as NDJSON, shared by the shard workers
+
+    Every page is written and flushed as it arrives, and the cursor is saved
+    after it, so nothing more than a page is held in memory and a run that
+    stops half way loses at most the position of its last page. Compressed,
+    every page is a complete gzip member, and whatever a stopped run wrote
+    after the last saved position is cut off, so the file always stays
+    readable.
+    """
+
+    def __init__(self, dest, compress, cursor_path, cursor):
+        self.lock = threading.Lock()
+        self.handle = open(dest, 'ab')
+        if cursor.get('offset') is not None and os.path.getsize(dest) > cursor['offset']:
+            self.handle.truncate(cursor['offset'])
+        self.handle.seek(0, os.SEEK_END)
+        self.compress = compress
+        self.cursor_path = cursor_path
+        self.cursor = cursor
+        self.events = 0
+
+    def write_page(self, shard, events, next_token):
+        lines = b''.join((json.dumps(event, sort_keys=True) + '\n').encode('utf-8') for event in events)
+        if self.compress and lines:
+            member = io.BytesIO()
+            with gzip.GzipFile(fileobj=member, mode='wb') as f:
+                f.write(lines)
+            lines = member.getvalue()
+        with self.lock:
+            self.handle.write(lines)
+            self.handle.flush()
+            self.events += len(events)
+            shard['next_token'] = next_token
+            shard['done'] = next_token is None
+            self.cursor['offset'] = self.handle.tell()
+            save_cache(self.cursor_path, self.cursor)
+
+    def close(self):
+        self.handle.close()
+
+
+def export_shard(client, module, writer, shard):
+    params = dict(logGroupName=module.params.get('log_group_name'), startTime=shard['start'], endTime=shard['end'] - 1)
+    if module.params.get('filter_pattern'):
+        params['filterPattern'] = module.params.get('filter_pattern')
+    if shard.get('stream'):
+        params['logStreamNames'] = [shard['stream']]
+    next_token = shard.get('next_token')
+    while True:
+        try:
+            kwargs = dict(params, nextToken=next_token) if next_token else params
+            page = AWSRetry.jittered_backoff()(client.filter_log_events)(**kwargs)
+        except botocore.exceptions.ClientError as e:
+            if next_token and e.response['Error']['Code'] == 'InvalidParameterException':
+                # the saved position expired, read the whole shard again
+                next_token = None
+                continue
+            raise
+        next_token = page.get('nextToken')
+        writer.write_page(shard, page.get('events', []), next_token)
+        if not next_token:
+            return
+
+
+def export(client, module):
+    name = module.params.get('log_group_name')
+    dest = module.params.get('dest')
+    if not name or not dest:
+        module.fail_json(msg='log_group_name and dest are required with state=export')
+    now = int(time.time() * 1000)
+    try:
+        start = parse_time(module.params.get('start_time'), now)
+        end = parse_time(module.params.get('end_time'), now)
+    except ValueError as e:
+        module.fail_json(msg='Could not parse the export time range: {0}'.format(e))
+    streams = module.params.get('log_stream_names') or [None]
+
+    cursor_path = os.path.abspath(module.params.get('cursor') or dest + '.cursor')
+    identity = dict(log_group_name=name, filter_pattern=module.params.get('filter_pattern'),
+                    log_stream_names=module.params.get('log_stream_names'))
+    cursor = load_cache(cursor_path) or {}
+    if any(cursor.get(key) != value for key, value in identity.items()):
+        cursor = dict(identity, until=None, shards=[], offset=None)
+    # carry on with the unfinished shards of an earlier run, then export what came after it
+    shards = [shard for shard in cursor['shards'] if not shard['done']]
+    if cursor['until'] is not None:
+        start = max(start, cursor['until'])
+    if end > start:
+        for stream in streams:
+            for slice_start, slice_end in time_slices(start, end, module.params.get('time_shards')):
+                shards.append(dict(stream=stream, start=slice_start, end=slice_end, next_token=None, done=False))
+        cursor['until'] = end
+    cursor['shards'] = shards
+
+    result = dict(dest=dest, cursor=cursor_path, shards=len(shards), events=0, until=cursor['until'])
+    if not shards or module.check_mode:
+        return bool(shards), result
+
+    try:
+        directory = os.path.dirname(os.path.abspath(dest))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        writer = EventWriter(dest, module.params.get('compress'), cursor_path, cursor)
+    except (IOError, OSError) as e:
+        module.fail_json(msg='Could not open {0} for writing: {1}'.format(dest, e))
+    try:
+        outcomes = run_concurrently(lambda shard: export_shard(client, module, writer, shard), shards, module.params.get('max_concurrency'))
+    finally:
+        writer.close()
+    result['events'] = writer.events
+    errors = [str(error) for dummy, error in outcomes if error is not None]
+    if errors:
+        module.fail_json(msg='Failed to export {0} of {1} shards, run again to resume: {2}'.format(len(errors), len(shards), errors[0]),
+                         results=result)
+    cursor['shards'] = []
+    save_cache(cursor_path, cursor)
+    return writer.events > 0, result
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
         log_group_name=dict(default=None, required=False),
         filter_prefix=dict(default=None, required=False),
-        state=dict(default='present', choices=['present', 'absent', 'list'])
+        state=dict(default='present', choices=['present', 'absent', 'list', 'enforce', 'export']),
+        select=dict(default=None, required=False, type='list'),
+        retention_in_days=dict(default=None, required=False, type='int'),
+        kms_key_id=dict(default=None, required=False),
+        tags=dict(default=None, required=False, type='dict'),
+        purge_tags=dict(default=False, type='bool'),
+        max_concurrency=dict(default=4, type='int'),
+        dest=dict(default=None, required=False, type='path'),
+        compress=dict(default=False, type='bool'),
+        start_time=dict(default='-1h', required=False),
+        end_time=dict(default='now', required=False),
+        filter_pattern=dict(default=None, required=False),
+        log_stream_names=dict(default=None, required=False, type='list'),
+        time_shards=dict(default=4, type='int'),
+        cursor=dict(default=None, required=False, type='path')
         )
     )
-    module = AnsibleModule(argument_spec=argument_spec)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
     state = module.params.get('state').lower()
 
     if not HAS_BOTO3:
@@ -138,13 +536,15 @@ def main():
     try:
         region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
         client = boto3_conn(module, conn_type='client', resource='logs', region=region, endpoint=ec2_url, **aws_connect_kwargs)       
-    except botocore.exceptions.NoCredentialsError, e:
+    except botocore.exceptions.NoCredentialsError as e:
         module.fail_json(msg="Can't authorize connection - " + str(e))
 
     invocations = {
         "present": setup,
         "absent": teardown,
-        "list": list_groups
+        "list": list_groups,
+        "enforce": enforce,
+        "export": export
     }
 
     (changed, results) = invocations[state](client, module)
@@ -154,6 +554,8 @@ def main():
 # import module snippets
 from ansible.module_utils.basic import *
 from ansible.module_utils.ec2 import *
+from ansible.module_utils.aws.cache import load_cache, save_cache
+from ansible.module_utils.aws.concurrency import RateLimiter, run_concurrently
 
 if __name__ == '__main__':
     main()
@@ -30,12 +30,31 @@ notes:
     case the rule will trigger on matching events as well as on a schedule.
   - When specifying targets, I(input) and I(input_path) are mutually-exclusive
     and optional parameters.
+  - Each rule and its targets are described once per run, and described again
+    only after they were changed. Targets are put and removed 10 at a time, the
+    most the API accepts in one call.
 options:
   name:
     description:
       - The name of the rule you are creating, updating or deleting. No spaces
         or special characters allowed (i.e. must match C([\.\-_A-Za-z0-9]+))
-    required: true
+      - Either I(name) or I(rules) is required.
+    required: false
+  rules:
+    description:
+      - Manage many rules in one invocation instead of looping over I(name).
+      - Each item is a dict with the keys C(name), C(schedule_expression), C(event_pattern),
+        C(state), C(description), C(role_arn) and C(targets). Missing keys default to the
+        module level options.
+      - The rules are reconciled I(max_concurrency) at a time and the result is returned
+        per rule in C(rules).
+    required: false
+    version_added: "2.8"
+  max_concurrency:
+    description:
+      - How many rules of I(rules) are reconciled at the same time.
+    default: 4
+    version_added: "2.8"
   schedule_expression:
     description:
       - A cron or rate expression that defines the schedule the rule will
@@ -100,6 +119,17 @@ EXAMPLES = '''
 - cloudwatchevent_rule:
     name: MyCronTask
     state: absent
+
+- cloudwatchevent_rule:
+    state: present
+    rules:
+      - name: nightly-report
+        schedule_expression: "cron(0 2 * * ? *)"
+        targets:
+          - id: report
+            arn: arn:aws:lambda:us-east-1:123456789012:function:Report
+      - name: retired-job
+        state: absent
 '''
 
 RETURN = '''
@@ -118,6 +148,10 @@ targets:
     returned: success
     type: list
     sample: "[{ 'arn': 'arn:aws:lambda:us-east-1:123456789012:function:MyFunction', 'id': 'MyTargetId' }]"
+rules:
+    description: One result per item of I(rules), each with the rule's name, C(rule), C(targets) and C(changed)
+    returned: when rules is given
+    type: list
 '''
 
 try:
@@ -126,13 +160,25 @@ except ImportError:
     pass  # handled by AnsibleAWSModule
 
 from ansible.module_utils.aws.core import AnsibleAWSModule
+from ansible.module_utils.aws.concurrency import chunks, run_concurrently
 from ansible.module_utils.ec2 import boto3_conn, camel_dict_to_snake_dict
 from ansible.module_utils.ec2 import ec2_argument_spec, get_aws_connection_info
 
+# The most targets put_targets and remove_targets accept in one call
+TARGETS_PER_REQUEST = 10
+RULE_KEYS = ('schedule_expression', 'event_pattern', 'state', 'description', 'role_arn', 'targets')
+
+
+class RuleError(Exception):
+    def __init__(self, msg, error):
+        super(RuleError, self).__init__(msg)
+        self.msg = msg
+        self.error = error
+
 
 class CloudWatchEventRule(object):
     def __init__(self, module, name, client, schedule_expression=None,
-                 event_pattern=None, description=None, role_arn=None):
+                 event_pattern=None, description=None, role_arn=None, raise_errors=False):
         self.name = name
         self.client = client
         self.changed = False
@@ -141,19 +187,37 @@ class CloudWatchEventRule(object):
         self.description = description
         self.role_arn = role_arn
         self.module = module
+        self.raise_errors = raise_errors
+        # what describe() and list_targets() returned, until a change makes them stale
+        self._description = None
+        self._targets = None
+
+    def _fail(self, e, msg):
+        if self.raise_errors:
+            raise RuleError(msg, e)
+        self.module.fail_json_aws(e, msg=msg)
+
+    def invalidate(self, description=True, targets=True):
+        """Forget what was described, after changing it"""
+        if description:
+            self._description = None
+        if targets:
+            self._targets = None
 
     def describe(self):
         """Returns the existing details of the rule in AWS"""
-        try:
-            rule_info = self.client.describe_rule(Name=self.name)
-        except botocore.exceptions.ClientError as e:
-            error_code = e.response.get('Error', {}).get('Code')
-            if error_code == 'ResourceNotFoundException':
-                return {}
-            self.module.fail_json_aws(e, msg="Could not describe rule %s" % self.name)
-        except botocore.exceptions.BotoCoreError as e:
-            self.module.fail_json_aws(e, msg="Could not describe rule %s" % self.name)
-        return self._snakify(rule_info)
+        if self._description is None:
+            try:
+                self._description = self._snakify(self.client.describe_rule(Name=self.name))
+            except botocore.exceptions.ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code')
+                if error_code == 'ResourceNotFoundException':
+                    self._description = {}
+                else:
+                    self._fail(e, "Could not describe rule %s" % self.name)
+            except botocore.exceptions.BotoCoreError as e:
+                self._fail(e, "Could not describe rule %s" % self.name)
+        return self._description
 
     def put(self, enabled=True):
         """Creates or updates the rule in AWS"""
@@ -172,8 +236,9 @@ class CloudWatchEventRule(object):
         try:
             response = self.client.put_rule(**request)
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not create/update rule %s" % self.name)
+            self._fail(e, "Could not create/update rule %s" % self.name)
         self.changed = True
+        self.invalidate(targets=False)
         return response
 
     def delete(self):
@@ -183,8 +248,9 @@ class CloudWatchEventRule(object):
         try:
             response = self.client.delete_rule(Name=self.name)
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not delete rule %s" % self.name)
+            self._fail(e, "Could not delete rule %s" % self.name)
         self.changed = True
+        self.invalidate()
         return response
 
     def enable(self):
@@ -192,8 +258,9 @@ class CloudWatchEventRule(object):
         try:
             response = self.client.enable_rule(Name=self.name)
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not enable rule %s" % self.name)
+            self._fail(e, "Could not enable rule %s" % self.name)
         self.changed = True
+        self.invalidate(targets=False)
         return response
 
     def disable(self):
@@ -201,51 +268,58 @@ class CloudWatchEventRule(object):
         try:
             response = self.client.disable_rule(Name=self.name)
         except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not disable rule %s" % self.name)
+            self._fail(e, "Could not disable rule %s" % self.name)
         self.changed = True
+        self.invalidate(targets=False)
         return response
 
     def list_targets(self):
         """Lists the existing targets for the rule in AWS"""
-        try:
-            targets = self.client.list_targets_by_rule(Rule=self.name)
-        except botocore.exceptions.ClientError as e:
-            error_code = e.response.get('Error', {}).get('Code')
-            if error_code == 'ResourceNotFoundException':
-                return []
-            self.module.fail_json_aws(e, msg="Could not find target for rule %s" % self.name)
-        except botocore.exceptions.BotoCoreError as e:
-            self.module.fail_json_aws(e, msg="Could not find target for rule %s" % self.name)
-        return self._snakify(targets)['targets']
+        if self._targets is None:
+            try:
+                paginator = self.client.get_paginator('list_targets_by_rule')
+                targets = paginator.paginate(Rule=self.name).build_full_result()
+                self._targets = self._snakify(targets)['targets']
+            except botocore.exceptions.ClientError as e:
+                error_code = e.response.get('Error', {}).get('Code')
+                if error_code == 'ResourceNotFoundException':
+                    self._targets = []
+                else:
+                    self._fail(e, "Could not find target for rule %s" % self.name)
+            except botocore.exceptions.BotoCoreError as e:
+                self._fail(e, "Could not find target for rule %s" % self.name)
+        return self._targets
 
     def put_targets(self, targets):
         """Creates or updates the provided targets on the rule in AWS"""
         if not targets:
             return
-        request = {
-            'Rule': self.name,
-            'Targets': self._targets_request(targets),
-        }
-        try:
-            response = self.client.put_targets(**request)
-        except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not create/update rule targets for rule %s" % self.name)
+        response = {'FailedEntryCount': 0, 'FailedEntries': []}
+        for chunk in chunks(self._targets_request(targets), TARGETS_PER_REQUEST):
+            try:
+                chunk_response = self.client.put_targets(Rule=self.name, Targets=chunk)
+            except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
+                self._fail(e, "Could not create/update rule targets for rule %s" % self.name)
+            response['FailedEntryCount'] += chunk_response.get('FailedEntryCount', 0)
+            response['FailedEntries'].extend(chunk_response.get('FailedEntries', []))
         self.changed = True
+        self.invalidate(description=False)
         return response
 
     def remove_targets(self, target_ids):
         """Removes the provided targets from the rule in AWS"""
         if not target_ids:
             return
-        request = {
-            'Rule': self.name,
-            'Ids': target_ids
-        }
-        try:
-            response = self.client.remove_targets(**request)
-        except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
-            self.module.fail_json_aws(e, msg="Could not remove rule targets from rule %s" % self.name)
+        response = {'FailedEntryCount': 0, 'FailedEntries': []}
+        for chunk in chunks(target_ids, TARGETS_PER_REQUEST):
+            try:
+                chunk_response = self.client.remove_targets(Rule=self.name, Ids=chunk)
+            except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
+                self._fail(e, "Could not remove rule targets from rule %s" % self.name)
+            response['FailedEntryCount'] += chunk_response.get('FailedEntryCount', 0)
+            response['FailedEntries'].extend(chunk_response.get('FailedEntries', []))
         self.changed = True
+        self.invalidate(description=False)
         return response
 
     def remove_all_targets(self):
@@ -320,12 +394,12 @@ class CloudWatchEventRuleManager(object):
             'targets': [],
             'changed': self.rule.changed
         }
-        rule_description = self.rule.describe()
+        rule_description = dict(self.rule.describe())
         if not rule_description:
             return aws_state
 
         # Don't need to include response metadata noise in response
-        del rule_description['response_metadata']
+        rule_description.pop('response_metadata', None)
 
         aws_state['rule'] = rule_description
         aws_state['targets'].extend(self.rule.list_targets())
@@ -338,13 +412,15 @@ class CloudWatchEventRuleManager(object):
 
     def _sync_targets(self):
         """Syncs local targets with AWS"""
-        # Identify and remove extraneous targets on AWS
+        # Work out both changes from the same listing, before changing anything
         target_ids_to_remove = self._remote_target_ids_to_remove()
+        targets_to_put = self._targets_to_put()
+
+        # Remove extraneous targets on AWS
         if target_ids_to_remove:
             self.rule.remove_targets(target_ids_to_remove)
 
-        # Identify targets that need to be added or updated on AWS
-        targets_to_put = self._targets_to_put()
+        # Add or update targets on AWS
         if targets_to_put:
             self.rule.put_targets(targets_to_put)
 
@@ -374,12 +450,12 @@ class CloudWatchEventRuleManager(object):
 
     def _targets_to_put(self):
         """Returns a list of targets that need to be updated or added remotely"""
-        remote_targets = self.rule.list_targets()
-        return [t for t in self.targets if t not in remote_targets]
+        remote_targets = dict((rt['id'], rt) for rt in self.rule.list_targets())
+        return [t for t in self.targets if remote_targets.get(t['id']) != t]
 
     def _remote_target_ids_to_remove(self):
         """Returns a list of targets that need to be removed remotely"""
-        target_ids = [t['id'] for t in self.targets]
+        target_ids = set(t['id'] for t in self.targets)
         remote_targets = self.rule.list_targets()
         return [
             rt['id'] for rt in remote_targets if rt['id'] not in target_ids
@@ -410,11 +486,63 @@ def get_cloudwatchevents_client(module):
         module.fail_json(msg=str(e))
 
 
+def ensure_rule(cwe_rule_manager, state):
+    if state == 'present':
+        cwe_rule_manager.ensure_present()
+    elif state == 'disabled':
+        cwe_rule_manager.ensure_disabled()
+    elif state == 'absent':
+        cwe_rule_manager.ensure_absent()
+
+
+def ensure_rules(module, client):
+    """Reconcile every item of the rules option, returning one result per rule"""
+    specs = []
+    for item in module.params.get('rules'):
+        if not isinstance(item, dict) or not item.get('name'):
+            module.fail_json(msg="Every item of rules needs a name: {0}".format(item))
+        spec = dict((key, module.params.get(key)) for key in RULE_KEYS)
+        spec.update((key, item[key]) for key in RULE_KEYS if item.get(key) is not None)
+        spec['name'] = item['name']
+        if spec['state'] not in ('present', 'disabled', 'absent'):
+            module.fail_json(msg="Invalid state '{0}' provided for rule {1}".format(spec['state'], spec['name']))
+        specs.append(spec)
+
+    managers = []
+    for spec in specs:
+        rule_data = dict((rf, spec.get(rf)) for rf in CloudWatchEventRuleManager.RULE_FIELDS)
+        cwe_rule = CloudWatchEventRule(module, client=client, raise_errors=True, **rule_data)
+        managers.append((CloudWatchEventRuleManager(cwe_rule, spec['targets'] or []), spec['state']))
+
+    def reconcile(manager):
+        cwe_rule_manager, state = manager
+        ensure_rule(cwe_rule_manager, state)
+        return cwe_rule_manager.fetch_aws_state()
+
+    results = []
+    failed = []
+    outcomes = run_concurrently(reconcile, managers, module.params.get('max_concurrency'))
+    for (cwe_rule_manager, state), (aws_state, error) in zip(managers, outcomes):
+        name = cwe_rule_manager.rule.name
+        if error is None:
+            results.append(dict(aws_state, name=name))
+            continue
+        if isinstance(error, RuleError):
+            msg = "{0}: {1}".format(error.msg, error.error)
+        else:
+            msg = str(error)
+        results.append(dict(name=name, failed=True, msg=msg, changed=cwe_rule_manager.rule.changed))
+        failed.append(name)
+    return results, failed
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            name=dict(required=True),
+            name=dict(),
+            rules=dict(type='list'),
+            max_concurrency=dict(type='int', default=4),
             schedule_expression=dict(),
             event_pattern=dict(),
             state=dict(choices=['present', 'disabled', 'absent'],
@@ -424,7 +552,16 @@ def main():
             targets=dict(type='list', default=[]),
         )
     )
-    module = AnsibleAWSModule(argument_spec=argument_spec)
+    module = AnsibleAWSModule(argument_spec=argument_spec,
+                              required_one_of=[['name', 'rules']],
+                              mutually_exclusive=[['name', 'rules']])
+
+    if module.params.get('rules') is not None:
+        results, failed = ensure_rules(module, get_cloudwatchevents_client(module))
+        changed = any(result.get('changed') for result in results)
+        if failed:
+            module.fail_json(msg="Failed to reconcile rules: {0}".format(', '.join(failed)), changed=changed, rules=results)
+        module.exit_json(changed=changed, rules=results)
 
     rule_data = dict(
         [(rf, module.params.get(rf)) for rf in CloudWatchEventRuleManager.RULE_FIELDS]
@@ -437,14 +574,7 @@ def main():
                                    **rule_data)
     cwe_rule_manager = CloudWatchEventRuleManager(cwe_rule, targets)
 
-    if state == 'present':
-        cwe_rule_manager.ensure_present()
-    elif state == 'disabled':
-        cwe_rule_manager.ensure_disabled()
-    elif state == 'absent':
-        cwe_rule_manager.ensure_absent()
-    else:
-        module.fail_json(msg="Invalid state '{0}' provided".format(state))
+    ensure_rule(cwe_rule_manager, state)
 
     module.exit_json(**cwe_rule_manager.fetch_aws_state())
 
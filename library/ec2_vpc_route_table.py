@@ -43,6 +43,13 @@ options:
     version_added: "2.3"
     description: Purge existing routes that are not found in routes.
     default: 'true'
+  max_concurrency:
+    version_added: "2.8"
+    description:
+      - How many route changes are made at the same time.
+      - Routes to different destinations are independent, so they are deleted, replaced and created
+        concurrently, staying under a shared limit of ten EC2 requests per second.
+    default: 4
   purge_subnets:
     version_added: "2.3"
     description: Purge existing subnets that are not found in subnets. Ignored unless the subnets option is supplied.
@@ -53,11 +60,23 @@ options:
     default: 'false'
   route_table_id:
     description: The ID of the route table to update or delete.
+  route_tables:
+    version_added: "2.8"
+    description:
+      - Manage many route tables of the VPC I(vpc_id) in one invocation.
+      - Each item is a dict with the keys C(lookup), C(route_table_id), C(tags), C(routes), C(subnets),
+        C(propagating_vgw_ids), C(purge_routes), C(purge_subnets), C(purge_tags) and C(state).
+        C(lookup), C(propagating_vgw_ids), the C(purge_*) keys and C(state) default to the module level options.
+      - The VPC's subnets, route tables and internet gateway are described once, and every table
+        resolves its lookup, subnets and C(igw) against that snapshot.
+      - A subnet may only be listed for one of the route tables.
+      - The result is returned per route table in C(route_tables).
   routes:
     description: List of routes in the route table.
         Routes are specified as dicts containing the keys 'dest' and one of 'gateway_id',
         'instance_id', 'interface_id', or 'vpc_peering_connection_id'.
         If 'gateway_id' is specified, you can refer to the VPC's IGW by using the value 'igw'.
+        'dest' may be an IPv4 CIDR, an IPv6 CIDR or a prefix list ID.
         Routes are required for present states.
     default: None
   state:
@@ -121,6 +140,28 @@ EXAMPLES = '''
     route_table_id: "{{ route_table.id }}"
     lookup: id
     state: absent
+
+- name: Set up all route tables of the VPC at once
+  ec2_vpc_route_table:
+    vpc_id: vpc-1245678
+    region: us-west-1
+    route_tables:
+      - tags:
+          Name: Public
+        subnets: ['Public A', 'Public B']
+        routes:
+          - dest: 0.0.0.0/0
+            gateway_id: igw
+      - tags:
+          Name: Private A
+        subnets: ['10.0.10.0/24']
+        routes:
+          - dest: 0.0.0.0/0
+            gateway_id: "{{ nat_a.nat_gateway_id }}"
+      - tags:
+          Name: Legacy
+        state: absent
+  register: route_tables
 '''
 
 RETURN = '''
@@ -221,6 +262,31 @@ route_table:
       returned: always
       type: string
       sample: vpc-6e2d2407
+route_tables:
+  description: One result per item of I(route_tables), with the keys C(changed), C(route_table)
+    and, in check mode, C(plan)
+  returned: when route_tables is given
+  type: list
+plan:
+  description: Destinations of the routes that would be created, replaced and deleted
+  returned: in check mode
+  type: complex
+  contains:
+    create:
+      description: Destinations of routes to create
+      returned: always
+      type: list
+      sample: ["10.1.0.0/16"]
+    replace:
+      description: Destinations of routes whose target changes
+      returned: always
+      type: list
+      sample: ["0.0.0.0/0"]
+    delete:
+      description: Destinations of routes to delete
+      returned: always
+      type: list
+      sample: ["10.9.0.0/16"]
 '''
 
 import re
@@ -231,6 +297,7 @@ from ansible.module_utils.ec2 import ansible_dict_to_boto3_filter_list
 from ansible.module_utils.ec2 import camel_dict_to_snake_dict, snake_dict_to_camel_dict
 from ansible.module_utils.ec2 import ansible_dict_to_boto3_tag_list, boto3_tag_list_to_ansible_dict
 from ansible.module_utils.ec2 import compare_aws_tags, AWSRetry
+from ansible.module_utils.aws.concurrency import RateLimiter, run_concurrently
 
 
 try:
@@ -243,6 +310,10 @@ CIDR_RE = re.compile(r'^(\d{1,3}\.){3}\d{1,3}/\d{1,2}$')
 SUBNET_RE = re.compile(r'^subnet-[A-z0-9]+$')
 ROUTE_TABLE_RE = re.compile(r'^rtb-[A-z0-9]+$')
 
+# Keys a route's destination can be under. A route table holds at most one route per destination.
+ROUTE_DESTINATION_KEYS = ('DestinationCidrBlock', 'DestinationIpv6CidrBlock', 'DestinationPrefixListId')
+EC2_ROUTE_REQUESTS_PER_SECOND = 10
+
 
 @AWSRetry.exponential_backoff()
 def describe_subnets_with_backoff(connection, **params):
@@ -319,6 +390,11 @@ def find_igw(connection, module, vpc_id):
         module.fail_json(msg='Multiple IGWs found for VPC {0}'.format(vpc_id))
 
 
+@AWSRetry.exponential_backoff()
+def describe_internet_gateways_with_backoff(connection, **params):
+    return connection.describe_internet_gateways(**params)['InternetGateways']
+
+
 @AWSRetry.exponential_backoff()
 def describe_tags_with_backoff(connection, resource_id):
     filters = ansible_dict_to_boto3_filter_list({'resource-id': resource_id})
@@ -409,86 +485,117 @@ def get_route_table_by_tags(connection, module, vpc_id, tags):
         return route_table
 
 
-def route_spec_matches_route(route_spec, route):
+def route_destination(route):
+    """Return the (key, value) destination of a route or route spec, or None"""
+    for key in ROUTE_DESTINATION_KEYS:
+        if route.get(key):
+            return key, route[key]
+    return None
+
+
+def normalize_route_spec(route_spec):
+    """Move a route spec's target and destination to the keys describe_route_tables uses"""
+    route_spec = dict(route_spec)
     if route_spec.get('GatewayId') and 'nat-' in route_spec['GatewayId']:
         route_spec['NatGatewayId'] = route_spec.pop('GatewayId')
-    if route_spec.get('GatewayId') and 'vpce-' in route_spec['GatewayId']:
-        if route_spec.get('DestinationCidrBlock', '').startswith('pl-'):
-            route_spec['DestinationPrefixListId'] = route_spec.pop('DestinationCidrBlock')
+    dest = route_spec.get('DestinationCidrBlock', '')
+    if dest.startswith('pl-'):
+        route_spec['DestinationPrefixListId'] = route_spec.pop('DestinationCidrBlock')
+    elif ':' in dest:
+        route_spec['DestinationIpv6CidrBlock'] = route_spec.pop('DestinationCidrBlock')
+    return route_spec
 
-    return set(route_spec.items()).issubset(route.items())
 
-
-def route_spec_matches_route_cidr(route_spec, route):
-    return route_spec['DestinationCidrBlock'] == route.get('DestinationCidrBlock')
+def route_spec_matches_route(route_spec, route):
+    return set(route_spec.items()).issubset(route.items())
 
 
 def rename_key(d, old_key, new_key):
     d[new_key] = d.pop(old_key)
 
 
-def index_of_matching_route(route_spec, routes_to_match):
-    for i, route in enumerate(routes_to_match):
-        if route_spec_matches_route(route_spec, route):
-            return "exact", i
-        elif route_spec_matches_route_cidr(route_spec, route):
-            return "replace", i
+@AWSRetry.exponential_backoff()
+def throttled_call(limiter, func, **kwargs):
+    return limiter.call(func, **kwargs)
 
 
-def ensure_routes(connection=None, module=None, route_table=None, route_specs=None,
-                  propagating_vgw_ids=None, check_mode=None, purge_routes=None):
-    routes_to_match = [route for route in route_table['Routes']]
-    route_specs_to_create = []
-    route_specs_to_recreate = []
+def plan_routes(module, route_table, route_specs, purge_routes):
+    """Diff route specs against a route table, both indexed by destination
+
+    Returns the route specs to create and to replace and the destinations to
+    delete, each sorted by destination.
+    """
+    current = dict()
+    for route in route_table.get('Routes', []):
+        destination = route_destination(route)
+        if destination:
+            current[destination] = route
+
+    desired = dict()
     for route_spec in route_specs:
-        match = index_of_matching_route(route_spec, routes_to_match)
-        if match is None:
-            if route_spec.get('DestinationCidrBlock'):
-                route_specs_to_create.append(route_spec)
-            else:
-                module.warn("Skipping creating {0} because it has no destination cidr block. "
-                            "To add VPC endpoints to route tables use the ec2_vpc_endpoint module.".format(route_spec))
+        route_spec = normalize_route_spec(route_spec)
+        destination = route_destination(route_spec)
+        if destination is None:
+            module.warn("Skipping creating {0} because it has no destination cidr block. "
+                        "To add VPC endpoints to route tables use the ec2_vpc_endpoint module.".format(route_spec))
+            continue
+        if destination in desired:
+            module.fail_json(msg="Route to {0} is listed more than once".format(destination[1]))
+        desired[destination] = route_spec
+
+    to_create, to_replace, to_delete = [], [], []
+    for destination in sorted(set(desired) - set(current)):
+        if destination[0] == 'DestinationPrefixListId':
+            module.warn("Skipping creating {0} because its destination is a prefix list. "
+                        "To add VPC endpoints to route tables use the ec2_vpc_endpoint module.".format(desired[destination]))
         else:
-            if match[0] == "replace":
-                if route_spec.get('DestinationCidrBlock'):
-                    route_specs_to_recreate.append(route_spec)
-                else:
-                    module.warn("Skipping recreating route {0} because it has no destination cidr block.".format(route_spec))
-            del routes_to_match[match[1]]
-
-    routes_to_delete = []
+            to_create.append(desired[destination])
+    for destination in sorted(set(desired) & set(current)):
+        if route_spec_matches_route(desired[destination], current[destination]):
+            continue
+        if destination[0] == 'DestinationPrefixListId':
+            module.warn("Skipping recreating route {0} because it has no destination cidr block.".format(desired[destination]))
+        else:
+            to_replace.append(desired[destination])
     if purge_routes:
-        for r in routes_to_match:
-            if not r.get('DestinationCidrBlock'):
+        for destination in sorted(set(current) - set(desired)):
+            route = current[destination]
+            if destination[0] != 'DestinationCidrBlock':
                 module.warn("Skipping purging route {0} because it has no destination cidr block. "
-                            "To remove VPC endpoints from route tables use the ec2_vpc_endpoint module.".format(r))
+                            "To remove VPC endpoints from route tables use the ec2_vpc_endpoint module.".format(route))
                 continue
-            if r['Origin'] == 'CreateRoute':
-                routes_to_delete.append(r)
+            if route['Origin'] == 'CreateRoute':
+                to_delete.append(destination)
+    return to_create, to_replace, to_delete
+
+
+def ensure_routes(connection=None, module=None, route_table=None, route_specs=None,
+                  propagating_vgw_ids=None, check_mode=None, purge_routes=None, limiter=None):
+    to_create, to_replace, to_delete = plan_routes(module, route_table, route_specs, purge_routes)
+    plan = dict(create=[route_destination(r)[1] for r in to_create],
+                replace=[route_destination(r)[1] for r in to_replace],
+                delete=[d[1] for d in to_delete])
 
-    changed = bool(routes_to_delete or route_specs_to_create or route_specs_to_recreate)
+    changed = bool(to_delete or to_create or to_replace)
     if changed and not check_mode:
-        for route in routes_to_delete:
-            try:
-                connection.delete_route(RouteTableId=route_table['RouteTableId'], DestinationCidrBlock=route['DestinationCidrBlock'])
-            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
-                module.fail_json_aws(e, msg="Couldn't delete route")
+        limiter = limiter or RateLimiter(EC2_ROUTE_REQUESTS_PER_SECOND)
+        route_table_id = route_table['RouteTableId']
+        mutations = ([(connection.delete_route, dict([destination]), "Couldn't delete route") for destination in to_delete] +
+                     [(connection.replace_route, route_spec, "Couldn't recreate route") for route_spec in to_replace] +
+                     [(connection.create_route, route_spec, "Couldn't create route") for route_spec in to_create])
 
-        for route_spec in route_specs_to_recreate:
-            try:
-                connection.replace_route(RouteTableId=route_table['RouteTableId'],
-                                         **route_spec)
-            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
-                module.fail_json_aws(e, msg="Couldn't recreate route")
+        def mutate(mutation):
+            func, params = mutation[0], mutation[1]
+            return throttled_call(limiter, func, RouteTableId=route_table_id, **params)
 
-        for route_spec in route_specs_to_create:
-            try:
-                connection.create_route(RouteTableId=route_table['RouteTableId'],
-                                        **route_spec)
-            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
-                module.fail_json_aws(e, msg="Couldn't create route")
+        outcomes = run_concurrently(mutate, mutations, module.params.get('max_concurrency') or 1)
+        for (func, params, msg), (dummy, error) in zip(mutations, outcomes):
+            if error is not None:
+                if isinstance(error, (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError)):
+                    module.fail_json_aws(error, msg="{0} to {1}".format(msg, route_destination(params)[1]))
+                raise error
 
-    return {'changed': bool(changed)}
+    return {'changed': bool(changed), 'plan': plan}
 
 
 def ensure_subnet_association(connection=None, module=None, vpc_id=None, route_table_id=None, subnet_id=None,
@@ -611,19 +718,23 @@ def get_route_table_info(connection, module, route_table):
     return result
 
 
-def create_route_spec(connection, module, vpc_id):
-    routes = module.params.get('routes')
-
+def convert_route_specs(routes, get_igw):
+    converted = []
     for route_spec in routes:
+        route_spec = dict(route_spec)
         rename_key(route_spec, 'dest', 'destination_cidr_block')
 
         if route_spec.get('gateway_id') and route_spec['gateway_id'].lower() == 'igw':
-            igw = find_igw(connection, module, vpc_id)
-            route_spec['gateway_id'] = igw
+            route_spec['gateway_id'] = get_igw()
         if route_spec.get('gateway_id') and route_spec['gateway_id'].startswith('nat-'):
             rename_key(route_spec, 'gateway_id', 'nat_gateway_id')
+        converted.append(route_spec)
 
-    return snake_dict_to_camel_dict(routes, capitalize_first=True)
+    return snake_dict_to_camel_dict(converted, capitalize_first=True)
+
+
+def create_route_spec(connection, module, vpc_id):
+    return convert_route_specs(module.params.get('routes'), lambda: find_igw(connection, module, vpc_id))
 
 
 def ensure_route_table_present(connection, module):
@@ -672,13 +783,17 @@ def ensure_route_table_present(connection, module):
                 module.fail_json_aws(e, msg="Error creating route table")
         else:
             route_table = {"id": "rtb-xxxxxxxx", "route_table_id": "rtb-xxxxxxxx", "vpc_id": vpc_id}
-            module.exit_json(changed=changed, route_table=route_table)
+            result = ensure_routes(connection=connection, module=module, route_table={'Routes': []},
+                                   route_specs=routes or [], check_mode=True, purge_routes=purge_routes)
+            module.exit_json(changed=changed, route_table=route_table, plan=result['plan'])
 
+    plan = None
     if routes is not None:
         result = ensure_routes(connection=connection, module=module, route_table=route_table,
                                route_specs=routes, propagating_vgw_ids=propagating_vgw_ids,
                                check_mode=module.check_mode, purge_routes=purge_routes)
         changed = changed or result['changed']
+        plan = result['plan']
 
     if propagating_vgw_ids is not None:
         result = ensure_propagation(connection=connection, module=module, route_table=route_table,
@@ -699,22 +814,276 @@ def ensure_route_table_present(connection, module):
                                             purge_subnets=purge_subnets)
         changed = changed or result['changed']
 
+    if module.check_mode and plan is not None:
+        module.exit_json(changed=changed, route_table=get_route_table_info(connection, module, route_table), plan=plan)
     if changed:
         # pause to allow route table routes/subnets/associations to be updated before exiting with final state
         sleep(5)
     module.exit_json(changed=changed, route_table=get_route_table_info(connection, module, route_table))
 
 
+class VpcSnapshot(object):
+    """Subnets, route tables and internet gateways of one VPC, described once
+
+    Route tables are described with their tags, so tag lookups need no
+    describe_tags calls either. The subnet association index is kept up to
+    date as tables take subnets over from each other.
+    """
+
+    def __init__(self, connection, module, vpc_id):
+        self.connection = connection
+        self.module = module
+        self.vpc_id = vpc_id
+        try:
+            self.subnets = describe_subnets_with_backoff(
+                connection, Filters=ansible_dict_to_boto3_filter_list({'vpc-id': vpc_id}))
+            self.igws = describe_internet_gateways_with_backoff(
+                connection, Filters=ansible_dict_to_boto3_filter_list({'attachment.vpc-id': vpc_id}))
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            module.fail_json_aws(e, msg="Couldn't describe VPC {0}".format(vpc_id))
+        self.subnets_by_id = dict((subnet['SubnetId'], subnet) for subnet in self.subnets)
+        self.subnets_by_cidr = dict()
+        self.subnets_by_name = dict()
+        for subnet in self.subnets:
+            self.subnets_by_cidr.setdefault(subnet['CidrBlock'], []).append(subnet)
+            name = boto3_tag_list_to_ansible_dict(subnet.get('Tags', [])).get('Name')
+            if name is not None:
+                self.subnets_by_name.setdefault(name, []).append(subnet)
+        self.refresh_route_tables()
+
+    def refresh_route_tables(self):
+        try:
+            route_tables = describe_route_tables_with_backoff(
+                self.connection, Filters=ansible_dict_to_boto3_filter_list({'vpc-id': self.vpc_id}))
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            self.module.fail_json_aws(e, msg="Couldn't describe route tables of VPC {0}".format(self.vpc_id))
+        self.route_tables = dict()
+        self.tags = dict()
+        # subnet id -> (route table id, association id), for explicit associations only
+        self.associations = dict()
+        for route_table in route_tables:
+            self.add_route_table(route_table)
+
+    def add_route_table(self, route_table):
+        route_table_id = route_table['RouteTableId']
+        self.route_tables[route_table_id] = route_table
+        self.tags[route_table_id] = boto3_tag_list_to_ansible_dict(route_table.get('Tags', []))
+        for association in route_table.get('Associations', []):
+            if not association.get('Main') and association.get('SubnetId'):
+                self.associations[association['SubnetId']] = (route_table_id, association['RouteTableAssociationId'])
+
+    def find_route_table(self, lookup, route_table_id, tags):
+        if lookup == 'id':
+            return self.route_tables.get(route_table_id)
+        if tags is None:
+            return None
+        matches = [self.route_tables[rt_id] for rt_id, rt_tags in self.tags.items() if tags_match(tags, rt_tags)]
+        if len(matches) > 1:
+            self.module.fail_json(msg="Tags {0} do not identify a unique route table".format(tags))
+        return matches[0] if matches else None
+
+    def find_subnets(self, identified_subnets):
+        subnets = []
+        for subnet in (identified_subnets or []):
+            if re.match(SUBNET_RE, subnet):
+                found = [self.subnets_by_id[subnet]] if subnet in self.subnets_by_id else []
+            elif re.match(CIDR_RE, subnet):
+                found = self.subnets_by_cidr.get(subnet, [])
+            else:
+                found = self.subnets_by_name.get(subnet, [])
+                if len(found) > 1:
+                    self.module.fail_json(msg='Multiple subnets named "{0}"'.format(subnet))
+            if not found:
+                self.module.fail_json(msg='Subnet "{0}" does not exist in VPC {1}'.format(subnet, self.vpc_id))
+            subnets.extend(found)
+        return subnets
+
+    def find_igw(self):
+        if len(self.igws) == 1:
+            return self.igws[0]['InternetGatewayId']
+        elif not self.igws:
+            self.module.fail_json(msg='No IGWs found for VPC {0}'.format(self.vpc_id))
+        self.module.fail_json(msg='Multiple IGWs found for VPC {0}'.format(self.vpc_id))
+
+
+ROUTE_TABLE_DEFAULT_KEYS = ('lookup', 'propagating_vgw_ids', 'purge_routes', 'purge_subnets', 'purge_tags', 'state')
+ROUTE_TABLE_ITEM_KEYS = ROUTE_TABLE_DEFAULT_KEYS + ('route_table_id', 'tags', 'routes', 'subnets')
+
+
+def route_table_spec(module, item):
+    unknown = sorted(set(item) - set(ROUTE_TABLE_ITEM_KEYS))
+    if unknown:
+        module.fail_json(msg="Unknown keys {0} in item of route_tables: {1}".format(', '.join(unknown), item))
+    spec = dict((key, module.params.get(key)) for key in ROUTE_TABLE_DEFAULT_KEYS)
+    spec.update(route_table_id=None, tags=None, routes=[], subnets=None)
+    spec.update((key, value) for key, value in item.items() if value is not None)
+    if spec['lookup'] == 'id' and not spec['route_table_id']:
+        module.fail_json(msg="route_table_id is required for items of route_tables with lookup id: {0}".format(item))
+    return spec
+
+
+def snapshot_tags(connection, module, snapshot, route_table_id, tags, purge_tags, check_mode):
+    to_add, to_delete = compare_aws_tags(snapshot.tags.get(route_table_id, {}), tags, purge_tags)
+    if not to_add and not to_delete:
+        return False
+    if not check_mode:
+        try:
+            if to_delete:
+                connection.delete_tags(Resources=[route_table_id], Tags=[{'Key': k} for k in to_delete])
+            if to_add:
+                connection.create_tags(Resources=[route_table_id], Tags=ansible_dict_to_boto3_tag_list(to_add))
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            module.fail_json_aws(e, msg="Couldn't update tags of route table {0}".format(route_table_id))
+    return True
+
+
+def snapshot_subnet_associations(connection, module, snapshot, route_table, subnets, purge_subnets, check_mode):
+    route_table_id = route_table['RouteTableId']
+    desired = set(subnet['SubnetId'] for subnet in subnets)
+    changed = False
+    try:
+        for subnet_id in sorted(desired):
+            current = snapshot.associations.get(subnet_id)
+            if current and current[0] == route_table_id:
+                continue
+            changed = True
+            if check_mode:
+                continue
+            if current:
+                association_id = connection.replace_route_table_association(
+                    AssociationId=current[1], RouteTableId=route_table_id)['NewAssociationId']
+            else:
+                association_id = connection.associate_route_table(
+                    RouteTableId=route_table_id, SubnetId=subnet_id)['AssociationId']
+            snapshot.associations[subnet_id] = (route_table_id, association_id)
+
+        if purge_subnets:
+            for subnet_id, (rt_id, association_id) in list(snapshot.associations.items()):
+                if rt_id != route_table_id or subnet_id in desired:
+                    continue
+                changed = True
+                if not check_mode:
+                    connection.disassociate_route_table(AssociationId=association_id)
+                    del snapshot.associations[subnet_id]
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json_aws(e, msg="Couldn't update subnet associations of route table {0}".format(route_table_id))
+    return changed
+
+
+def ensure_snapshot_route_table(connection, module, snapshot, limiter, spec):
+    """Reconcile one item of route_tables against the VPC snapshot
+
+    Returns (changed, route table id or None, plan or None).
+    """
+    check_mode = module.check_mode
+    route_table = snapshot.find_route_table(spec['lookup'], spec['route_table_id'], spec['tags'])
+
+    if spec['state'] == 'absent':
+        if route_table is None:
+            return False, None, None
+        if not check_mode:
+            snapshot_subnet_associations(connection, module, snapshot, route_table, [], True, False)
+            try:
+                connection.delete_route_table(RouteTableId=route_table['RouteTableId'])
+            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+                module.fail_json_aws(e, msg="Error deleting route table {0}".format(route_table['RouteTableId']))
+        return True, None, None
+
+    routes = convert_route_specs(spec['routes'] or [], snapshot.find_igw)
+    subnets = spec['resolved_subnets']
+    changed = False
+    if route_table is None:
+        changed = True
+        if check_mode:
+            result = ensure_routes(connection=connection, module=module, route_table={'Routes': []},
+                                   route_specs=routes, check_mode=True, purge_routes=spec['purge_routes'])
+            return True, None, result['plan']
+        try:
+            route_table = connection.create_route_table(VpcId=snapshot.vpc_id)['RouteTable']
+            for attempt in range(5):
+                if not get_route_table_by_id(connection, module, route_table['RouteTableId']):
+                    sleep(2)
+                else:
+                    break
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            module.fail_json_aws(e, msg="Error creating route table")
+        snapshot.add_route_table(route_table)
+
+    result = ensure_routes(connection=connection, module=module, route_table=route_table, route_specs=routes,
+                           check_mode=check_mode, purge_routes=spec['purge_routes'], limiter=limiter)
+    changed = changed or result['changed']
+    plan = result['plan'] if check_mode else None
+
+    if spec['propagating_vgw_ids'] is not None:
+        result = ensure_propagation(connection=connection, module=module, route_table=route_table,
+                                    propagating_vgw_ids=spec['propagating_vgw_ids'], check_mode=check_mode)
+        changed = changed or result['changed']
+
+    if spec['tags'] is not None:
+        changed = snapshot_tags(connection, module, snapshot, route_table['RouteTableId'], spec['tags'],
+                                spec['purge_tags'], check_mode) or changed
+
+    if subnets is not None:
+        changed = snapshot_subnet_associations(connection, module, snapshot, route_table, subnets,
+                                               spec['purge_subnets'], check_mode) or changed
+
+    return changed, route_table['RouteTableId'], plan
+
+
+def ensure_route_tables(connection, module):
+    vpc_id = module.params.get('vpc_id')
+    if not vpc_id:
+        module.fail_json(msg="vpc_id is required with route_tables")
+    specs = [route_table_spec(module, item) for item in module.params.get('route_tables')]
+
+    snapshot = VpcSnapshot(connection, module, vpc_id)
+
+    # subnets may be given by id, CIDR or Name, so compare them by the ids they resolve to
+    claimed = dict()
+    for index, spec in enumerate(specs):
+        spec['resolved_subnets'] = None
+        if spec['state'] == 'absent' or spec['subnets'] is None:
+            continue
+        spec['resolved_subnets'] = snapshot.find_subnets(spec['subnets'])
+        for subnet in spec['resolved_subnets']:
+            if claimed.setdefault(subnet['SubnetId'], index) != index:
+                module.fail_json(msg='Subnet "{0}" is listed for more than one route table'.format(subnet['SubnetId']))
+
+    limiter = RateLimiter(EC2_ROUTE_REQUESTS_PER_SECOND)
+    outcomes = [ensure_snapshot_route_table(connection, module, snapshot, limiter, spec) for spec in specs]
+    changed = any(outcome[0] for outcome in outcomes)
+
+    if changed and not module.check_mode:
+        # pause to allow route table routes/subnets/associations to be updated before describing the final state
+        sleep(5)
+        snapshot.refresh_route_tables()
+
+    results = []
+    for changed_table, route_table_id, plan in outcomes:
+        result = dict(changed=changed_table)
+        if route_table_id in snapshot.route_tables:
+            info = camel_dict_to_snake_dict(snapshot.route_tables[route_table_id], ignore_list=['Tags'])
+            info['tags'] = snapshot.tags[route_table_id]
+            info['id'] = info['route_table_id']
+            result['route_table'] = info
+        if plan is not None:
+            result['plan'] = plan
+        results.append(result)
+    return dict(changed=changed, route_tables=results)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
             lookup=dict(default='tag', choices=['tag', 'id']),
+            max_concurrency=dict(default=4, type='int'),
             propagating_vgw_ids=dict(type='list'),
             purge_routes=dict(default=True, type='bool'),
             purge_subnets=dict(default=True, type='bool'),
             purge_tags=dict(default=False, type='bool'),
             route_table_id=dict(),
+            route_tables=dict(type='list'),
             routes=dict(default=[], type='list'),
             state=dict(default='present', choices=['present', 'absent']),
             subnets=dict(type='list'),
@@ -727,6 +1096,9 @@ def main():
                               required_if=[['lookup', 'id', ['route_table_id']],
                                            ['lookup', 'tag', ['vpc_id']],
                                            ['state', 'present', ['vpc_id']]],
+                              mutually_exclusive=[['route_tables', 'route_table_id'],
+                                                  ['route_tables', 'subnets'],
+                                                  ['route_tables', 'tags']],
                               supports_check_mode=True)
 
     region, ec2_url, aws_connect_params = get_aws_connection_info(module, boto3=True)
@@ -736,7 +1108,9 @@ def main():
 
     state = module.params.get('state')
 
-    if state == 'present':
+    if module.params.get('route_tables') is not None:
+        result = ensure_route_tables(connection, module)
+    elif state == 'present':
         result = ensure_route_table_present(connection, module)
     elif state == 'absent':
         result = ensure_route_table_absent(connection, module)
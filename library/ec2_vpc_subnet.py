@@ -28,9 +28,43 @@ options:
     default: null
   cidr:
     description:
-      - "The CIDR block for the subnet. E.g. 192.0.2.0/24. Only required when state=present."
+      - "The CIDR block for the subnet. E.g. 192.0.2.0/24."
+      - "One of I(cidr), I(subnets) or I(carve) is required."
     required: false
     default: null
+  subnets:
+    description:
+      - "Manage many subnets of the VPC in one invocation instead of looping over I(cidr)."
+      - "Each item is a dict with the keys C(cidr), C(az), C(tags), C(map_public) and C(state).
+        Missing keys default to the module level options."
+      - "The VPC's subnets are described once and matched by CIDR. Missing subnets are created
+        concurrently, tagged at creation, and waited on together until they are available."
+      - "The result is returned per subnet in C(subnets)."
+    required: false
+    version_added: "2.8"
+  carve:
+    description:
+      - "Split a parent CIDR into one subnet per availability zone, and manage them like items of I(subnets)."
+      - "A dict with the keys C(cidr), the parent CIDR, C(azs), the list of availability zones, and optionally
+        C(prefix), the prefix length of the subnets. C(prefix) defaults to the longest prefix that still
+        fits one subnet per zone."
+      - "The subnets get the module level I(tags) and I(map_public). The string C({az}) in a tag value is
+        replaced by the subnet's availability zone."
+      - "Requires the python ipaddress module (standard library in python 3)."
+    required: false
+    version_added: "2.8"
+  max_concurrency:
+    description:
+      - "How many subnets of I(subnets) and I(carve) are created, updated or deleted at the same time."
+    required: false
+    default: 4
+    version_added: "2.8"
+  wait_timeout:
+    description:
+      - "How long to wait for subnets created by I(subnets) and I(carve) to become available, in seconds."
+    required: false
+    default: 300
+    version_added: "2.8"
   tags:
     description:
       - "A dict of tags to apply to the subnet. Any tags currently applied to the subnet and not present here will be removed."
@@ -77,20 +111,87 @@ EXAMPLES = '''
     vpc_id: vpc-123456
     cidr: 10.0.1.16/28
 
+- name: Create the application subnets in one go
+  ec2_vpc_subnet:
+    vpc_id: vpc-123456
+    subnets:
+      - cidr: 10.0.2.0/24
+        az: us-east-1a
+        tags:
+          Name: App A
+      - cidr: 10.0.3.0/24
+        az: us-east-1b
+        tags:
+          Name: App B
+  register: app_subnets
+
+- name: Split 10.0.16.0/20 into one public subnet per zone
+  ec2_vpc_subnet:
+    vpc_id: vpc-123456
+    map_public: yes
+    tags:
+      Name: "Public {az}"
+    carve:
+      cidr: 10.0.16.0/20
+      azs: [us-east-1a, us-east-1b, us-east-1c]
+  register: public_subnets
+
+'''
+
+RETURN = '''
+subnet:
+    description: Dictionary of subnet values
+    returned: when I(cidr) is given and I(state=present)
+    type: complex
+    contains:
+        id:
+            description: Subnet resource id
+            returned: I(state=present)
+            type: string
+            sample: subnet-b883b2c4
+        cidr_block:
+            description: The IPv4 CIDR of the Subnet
+            returned: I(state=present)
+            type: string
+            sample: "10.0.0.0/16"
+        tags:
+            description: tags attached to the Subnet, includes name
+            returned: I(state=present)
+            type: dict
+            sample: {"Name": "My Subnet", "env": "staging"}
+subnets:
+    description: One result per subnet of I(subnets) and I(carve), with the keys C(cidr), C(changed)
+      and C(subnet), the subnet values as in I(subnet)
+    returned: when I(subnets) or I(carve) is given
+    type: list
 '''
 
 import time
 import traceback
 
+try:
+    import ipaddress
+    HAS_IPADDRESS = True
+except ImportError:
+    HAS_IPADDRESS = False
+
 try:
     import botocore
 except ImportError:
     pass  # caught by imported boto3
 
 from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils._text import to_text
+from ansible.module_utils.aws.concurrency import RateLimiter, chunks, run_concurrently
 from ansible.module_utils.ec2 import (ansible_dict_to_boto3_filter_list, ansible_dict_to_boto3_tag_list,
                                       ec2_argument_spec, camel_dict_to_snake_dict, get_aws_connection_info,
-                                      boto3_conn, boto3_tag_list_to_ansible_dict, HAS_BOTO3)
+                                      boto3_conn, boto3_tag_list_to_ansible_dict, HAS_BOTO3, AWSRetry)
+from ansible.module_utils.six import text_type
+
+EC2_SUBNET_REQUESTS_PER_SECOND = 10
+DESCRIBE_SUBNETS_MAX_IDS = 200
+SUBNET_KEYS = ('cidr', 'az', 'tags', 'map_public', 'state')
+CARVE_KEYS = ('cidr', 'azs', 'prefix')
 
 
 def get_subnet_info(subnet):
@@ -224,12 +325,221 @@ def ensure_subnet_absent(conn, module, vpc_id, cidr, check_mode):
                          **camel_dict_to_snake_dict(e.response))
 
 
+class SubnetError(Exception):
+    def __init__(self, msg, error=None):
+        super(SubnetError, self).__init__(msg)
+        self.msg = msg
+        self.error = error
+
+
+@AWSRetry.exponential_backoff()
+def throttled_call(limiter, func, **kwargs):
+    return limiter.call(func, **kwargs)
+
+
+def carve_subnets(module, carve):
+    """Split carve['cidr'] into one subnet spec per zone of carve['azs']"""
+    if not HAS_IPADDRESS:
+        module.fail_json(msg="carve requires the python ipaddress module")
+    unknown = sorted(set(carve) - set(CARVE_KEYS))
+    if unknown:
+        module.fail_json(msg="Unknown keys {0} in carve".format(', '.join(unknown)))
+    azs = carve.get('azs') or []
+    if not carve.get('cidr') or not azs:
+        module.fail_json(msg="carve needs a cidr and a list of azs")
+    try:
+        parent = ipaddress.ip_network(text_type(carve['cidr']))
+    except ValueError as e:
+        module.fail_json(msg="Invalid carve cidr {0}: {1}".format(carve['cidr'], e))
+    prefix = carve.get('prefix')
+    if prefix is None:
+        prefix = parent.prefixlen + (len(azs) - 1).bit_length()
+    prefix = int(prefix)
+    if prefix < parent.prefixlen or prefix > parent.max_prefixlen:
+        module.fail_json(msg="carve prefix {0} does not fit in {1}".format(prefix, parent))
+    blocks = []
+    for block in parent.subnets(new_prefix=prefix):
+        blocks.append(block)
+        if len(blocks) == len(azs):
+            break
+    if len(blocks) < len(azs):
+        module.fail_json(msg="{0} cannot be split into {1} /{2} subnets".format(parent, len(azs), prefix))
+
+    tags = module.params.get('tags') or {}
+    specs = []
+    for az, block in zip(azs, blocks):
+        specs.append(dict(cidr=str(block), az=az,
+                          tags=dict((k, to_text(v).replace('{az}', az)) for k, v in tags.items())))
+    return specs
+
+
+def subnet_spec(module, item):
+    unknown = sorted(set(item) - set(SUBNET_KEYS))
+    if unknown:
+        module.fail_json(msg="Unknown keys {0} in item of subnets: {1}".format(', '.join(unknown), item))
+    spec = dict((key, module.params.get(key)) for key in SUBNET_KEYS)
+    spec.update((key, value) for key, value in item.items() if value is not None)
+    if not spec['cidr']:
+        module.fail_json(msg="Every item of subnets needs a cidr: {0}".format(item))
+    if HAS_IPADDRESS:
+        # the form describe_subnets returns, so that each subnet is only listed and matched one way
+        try:
+            spec['cidr'] = str(ipaddress.ip_network(text_type(spec['cidr'])))
+        except ValueError as e:
+            module.fail_json(msg="Invalid cidr {0}: {1}".format(spec['cidr'], e))
+    return spec
+
+
+@AWSRetry.exponential_backoff()
+def describe_subnets_with_backoff(conn, **params):
+    return conn.describe_subnets(**params)
+
+
+def describe_vpc_subnets(conn, vpc_id):
+    """All subnets of the VPC, indexed by CIDR"""
+    filters = ansible_dict_to_boto3_filter_list({'vpc-id': vpc_id})
+    return dict((subnet['cidr_block'], subnet)
+                for subnet in get_subnet_info(describe_subnets_with_backoff(conn, Filters=filters)))
+
+
+def wait_for_subnets(conn, module, subnet_ids):
+    """Poll the new subnets with batched describe_subnets calls until all of them are available"""
+    pending = set(subnet_ids)
+    available = dict()
+    deadline = time.time() + module.params.get('wait_timeout')
+    delay = 1
+    while pending:
+        for batch in chunks(sorted(pending), DESCRIBE_SUBNETS_MAX_IDS):
+            try:
+                subnets = get_subnet_info(describe_subnets_with_backoff(conn, SubnetIds=batch))
+            except botocore.exceptions.ClientError as e:
+                # new subnets can take a moment to become visible to describe calls
+                if e.response['Error']['Code'] == 'InvalidSubnetID.NotFound':
+                    continue
+                raise
+            for subnet in subnets:
+                if subnet.get('state') == 'available':
+                    available[subnet['id']] = subnet
+                    pending.discard(subnet['id'])
+        if not pending:
+            break
+        if time.time() + delay > deadline:
+            module.fail_json(msg="Timed out waiting for subnets {0} to become available".format(', '.join(sorted(pending))))
+        time.sleep(delay)
+        delay = min(delay * 2, 15)
+    return available
+
+
+def create_subnet_tagged(conn, limiter, vpc_id, spec):
+    params = dict(VpcId=vpc_id, CidrBlock=spec['cidr'])
+    if spec['az']:
+        params['AvailabilityZone'] = spec['az']
+    if spec['tags']:
+        params['TagSpecifications'] = [dict(ResourceType='subnet', Tags=ansible_dict_to_boto3_tag_list(spec['tags']))]
+    try:
+        return get_subnet_info(throttled_call(limiter, conn.create_subnet, **params))
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        raise SubnetError("Couldn't create subnet {0}".format(spec['cidr']), e)
+
+
+def update_subnet(conn, limiter, spec, subnet, check_mode):
+    """Bring an existing (or freshly created) subnet's attributes and tags to spec, returns changed"""
+    changed = False
+    try:
+        if spec['state'] == 'absent':
+            if not check_mode:
+                throttled_call(limiter, conn.delete_subnet, SubnetId=subnet['id'])
+            return True
+        if spec['map_public'] != subnet.get('map_public_ip_on_launch'):
+            changed = True
+            if not check_mode:
+                throttled_call(limiter, conn.modify_subnet_attribute, SubnetId=subnet['id'],
+                               MapPublicIpOnLaunch={'Value': spec['map_public']})
+            subnet['map_public_ip_on_launch'] = spec['map_public']
+        tags = spec['tags'] or {}
+        if tags != subnet['tags']:
+            changed = True
+            to_delete = dict((k, v) for k, v in subnet['tags'].items() if k not in tags)
+            to_add = dict((k, v) for k, v in tags.items() if subnet['tags'].get(k) != v)
+            if not check_mode:
+                if to_delete:
+                    throttled_call(limiter, conn.delete_tags, Resources=[subnet['id']],
+                                   Tags=ansible_dict_to_boto3_tag_list(to_delete))
+                if to_add:
+                    throttled_call(limiter, conn.create_tags, Resources=[subnet['id']],
+                                   Tags=ansible_dict_to_boto3_tag_list(to_add))
+            subnet['tags'] = tags
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        raise SubnetError("Couldn't update subnet {0}".format(spec['cidr']), e)
+    return changed
+
+
+def ensure_subnets(conn, module, vpc_id):
+    specs = [subnet_spec(module, item) for item in (module.params.get('subnets') or [])]
+    if module.params.get('carve'):
+        specs.extend(subnet_spec(module, item) for item in carve_subnets(module, module.params['carve']))
+    seen = set()
+    for spec in specs:
+        if spec['cidr'] in seen:
+            module.fail_json(msg="Subnet {0} is listed more than once".format(spec['cidr']))
+        seen.add(spec['cidr'])
+
+    check_mode = module.check_mode
+    max_workers = module.params.get('max_concurrency')
+    limiter = RateLimiter(EC2_SUBNET_REQUESTS_PER_SECOND)
+    existing = describe_vpc_subnets(conn, vpc_id)
+    results = dict((spec['cidr'], dict(cidr=spec['cidr'], changed=False, subnet={})) for spec in specs)
+    errors = []
+
+    to_create = [spec for spec in specs if spec['state'] == 'present' and spec['cidr'] not in existing]
+    for spec in to_create:
+        results[spec['cidr']]['changed'] = True
+    if to_create and not check_mode:
+        created = []
+        for spec, (subnet, error) in zip(to_create, run_concurrently(
+                lambda spec: create_subnet_tagged(conn, limiter, vpc_id, spec), to_create, max_workers)):
+            if error is not None:
+                errors.append(error)
+            else:
+                created.append((spec, subnet))
+        if created:
+            available = wait_for_subnets(conn, module, [subnet['id'] for spec, subnet in created])
+            for spec, subnet in created:
+                existing[spec['cidr']] = available[subnet['id']]
+
+    to_update = [spec for spec in specs if spec['cidr'] in existing]
+    for spec, (changed, error) in zip(to_update, run_concurrently(
+            lambda spec: update_subnet(conn, limiter, spec, existing[spec['cidr']], check_mode), to_update, max_workers)):
+        if error is not None:
+            errors.append(error)
+            continue
+        results[spec['cidr']]['changed'] = results[spec['cidr']]['changed'] or changed
+        if spec['state'] == 'present':
+            results[spec['cidr']]['subnet'] = existing[spec['cidr']]
+
+    result = dict(changed=any(r['changed'] for r in results.values()),
+                  subnets=[results[spec['cidr']] for spec in specs])
+    if errors:
+        error = errors[0]
+        msg = getattr(error, 'msg', str(error))
+        if len(errors) > 1:
+            msg += " (and {0} more errors)".format(len(errors) - 1)
+        if isinstance(getattr(error, 'error', None), botocore.exceptions.ClientError):
+            result.update(camel_dict_to_snake_dict(error.error.response))
+        module.fail_json(msg=msg, **result)
+    return result
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
             az=dict(default=None, required=False),
-            cidr=dict(default=None, required=True),
+            cidr=dict(default=None, required=False),
+            subnets=dict(default=None, required=False, type='list'),
+            carve=dict(default=None, required=False, type='dict'),
+            max_concurrency=dict(default=4, required=False, type='int'),
+            wait_timeout=dict(default=300, required=False, type='int'),
             state=dict(default='present', choices=['present', 'absent']),
             tags=dict(default={}, required=False, type='dict', aliases=['resource_tags']),
             vpc_id=dict(default=None, required=True),
@@ -237,7 +547,9 @@ def main():
         )
     )
 
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True,
+                           required_one_of=[['cidr', 'subnets', 'carve']],
+                           mutually_exclusive=[['cidr', 'subnets'], ['cidr', 'carve']])
 
     if not HAS_BOTO3:
         module.fail_json(msg='boto3 and botocore are required for this module')
@@ -257,7 +569,9 @@ def main():
     map_public = module.params.get('map_public')
 
     try:
-        if state == 'present':
+        if module.params.get('subnets') is not None or module.params.get('carve') is not None:
+            result = ensure_subnets(connection, module, vpc_id)
+        elif state == 'present':
             result = ensure_subnet_present(connection, module, vpc_id, cidr, az, tags, map_public,
                                            check_mode=module.check_mode)
         elif state == 'absent':
@@ -22,7 +22,26 @@ options:
     name:
         description:
             - the name of the repository
-        required: true
+            - Either I(name) or I(repositories) is required.
+        required: false
+    repositories:
+        description:
+            - Manage many repositories in one invocation instead of looping over I(name).
+            - Each item is a dict with the keys C(name), C(state), C(policy), C(purge_policy),
+              C(force_set_policy), C(lifecycle_policy) and C(purge_lifecycle_policy).
+              Missing keys default to the module level options, so a policy shared by
+              all repositories only needs to be given once.
+            - The registry's repositories are listed once, their policies are fetched
+              concurrently and only the repositories that differ are written to.
+            - The result is returned per repository in C(repositories).
+        required: false
+        version_added: "2.8"
+    max_concurrency:
+        description:
+            - How many repositories of I(repositories) are worked on at the same time.
+        required: false
+        default: 4
+        version_added: "2.8"
     registry_id:
         description:
             - AWS account id associated with the registry.
@@ -130,6 +149,16 @@ EXAMPLES = '''
   ecs_ecr:
     name: needs-no-lifecycle-policy
     purge_lifecycle_policy: yes
+
+- name: all team repositories with the same policies
+  ecs_ecr:
+    policy: "{{ lookup('template', 'policy.json.j2') }}"
+    lifecycle_policy: "{{ lookup('file', 'lifecycle.json') }}"
+    repositories:
+      - name: team/api
+      - name: team/worker
+      - name: team/legacy
+        state: absent
 '''
 
 RETURN = '''
@@ -155,8 +184,19 @@ repository:
         repositoryArn: arn:aws:ecr:us-east-1:999999999999:repository/ecr-test-1484664090
         repositoryName: ecr-test-1484664090
         repositoryUri: 999999999999.dkr.ecr.us-east-1.amazonaws.com/ecr-test-1484664090
+repositories:
+    type: list
+    description: One result per item of I(repositories)
+    returned: "when repositories is given"
+    sample:
+        - name: team/api
+          state: present
+          created: false
+          changed: true
+          actions: [set_policy]
 '''
 
+import hashlib
 import json
 import traceback
 
@@ -166,8 +206,10 @@ except ImportError:
     pass  # Taken care of by ec2.HAS_BOTO3
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.ec2 import (HAS_BOTO3, boto3_conn, boto_exception, ec2_argument_spec,
+from ansible.module_utils.aws.concurrency import run_concurrently
+from ansible.module_utils.ec2 import (HAS_BOTO3, AWSRetry, boto3_conn, boto_exception, ec2_argument_spec,
                                       get_aws_connection_info, sort_json_policy_dict)
+from ansible.module_utils.six import string_types
 
 
 def build_kwargs(registry_id):
@@ -210,18 +252,28 @@ class EcsEcr:
                 return None
             raise
 
-    def get_repository_policy(self, registry_id, name):
+    @AWSRetry.exponential_backoff()
+    def describe_all_repositories(self, registry_id):
+        paginator = self.ecr.get_paginator('describe_repositories')
+        result = paginator.paginate(**build_kwargs(registry_id)).build_full_result()
+        return dict((repo['repositoryName'], repo) for repo in result['repositories'])
+
+    @AWSRetry.exponential_backoff()
+    def get_repository_policy_text(self, registry_id, name):
         try:
             res = self.ecr.get_repository_policy(
                 repositoryName=name, **build_kwargs(registry_id))
-            text = res.get('policyText')
-            return text and json.loads(text)
+            return res.get('policyText')
         except ClientError as err:
             code = err.response['Error'].get('Code', 'Unknown')
             if code == 'RepositoryPolicyNotFoundException':
                 return None
             raise
 
+    def get_repository_policy(self, registry_id, name):
+        text = self.get_repository_policy_text(registry_id, name)
+        return text and json.loads(text)
+
     def create_repository(self, registry_id, name):
         if registry_id:
             default_registry_id = self.sts.get_caller_identity().get('Account')
@@ -282,18 +334,22 @@ class EcsEcr:
                 return policy
             return None
 
-    def get_lifecycle_policy(self, registry_id, name):
+    @AWSRetry.exponential_backoff()
+    def get_lifecycle_policy_text(self, registry_id, name):
         try:
             res = self.ecr.get_lifecycle_policy(
                 repositoryName=name, **build_kwargs(registry_id))
-            text = res.get('lifecyclePolicyText')
-            return text and json.loads(text)
+            return res.get('lifecyclePolicyText')
         except ClientError as err:
             code = err.response['Error'].get('Code', 'Unknown')
             if code == 'LifecyclePolicyNotFoundException':
                 return None
             raise
 
+    def get_lifecycle_policy(self, registry_id, name):
+        text = self.get_lifecycle_policy_text(registry_id, name)
+        return text and json.loads(text)
+
     def put_lifecycle_policy(self, registry_id, name, policy_text):
         if not self.check_mode:
             policy = self.ecr.put_lifecycle_policy(
@@ -452,10 +508,161 @@ def run(ecr, params):
     return True, result
 
 
+REPOSITORY_KEYS = ('state', 'policy', 'purge_policy', 'force_set_policy',
+                   'lifecycle_policy', 'purge_lifecycle_policy')
+
+
+class PolicyDigests:
+    """Digests of normalised policies, for comparing many repositories' policies
+
+    Repositories managed together usually share their policies, so digests
+    are remembered by policy text, and each distinct sort_json_policy_dict
+    output is only serialised and hashed once.
+    """
+
+    def __init__(self):
+        self.by_text = dict()
+        self.by_normalised = dict()
+
+    def digest(self, text):
+        if text is None:
+            return None
+        if text not in self.by_text:
+            normalised = json.dumps(sort_json_policy_dict(json.loads(text)), sort_keys=True)
+            if normalised not in self.by_normalised:
+                self.by_normalised[normalised] = hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+            self.by_text[text] = self.by_normalised[normalised]
+        return self.by_text[text]
+
+
+def repository_spec(params, item):
+    spec = dict((key, params.get(key)) for key in REPOSITORY_KEYS)
+    spec.update((key, item[key]) for key in REPOSITORY_KEYS if item.get(key) is not None)
+    spec['name'] = item.get('name')
+    if not spec['name']:
+        raise ValueError('Every item of repositories needs a name: {}'.format(item))
+    spec['state'] = spec['state'] or 'present'
+    spec['purge_policy'] = spec['purge_policy'] or params.get('delete_policy')
+    for key in ('policy', 'lifecycle_policy'):
+        if spec[key] is not None and not isinstance(spec[key], string_types):
+            spec[key] = json.dumps(spec[key])
+        if spec[key] is not None:
+            try:
+                json.loads(spec[key])
+            except ValueError:
+                raise ValueError('Could not parse {} of repository {}'.format(key, spec['name']))
+    return spec
+
+
+def plan_repository(spec, exists, current, digests):
+    """List the writes that bring one repository to spec
+
+    current holds the policy texts fetched for the repository, keyed by
+    'policy' and 'lifecycle_policy'.
+    """
+    if spec['state'] == 'absent':
+        return ['delete'] if exists else []
+
+    actions = [] if exists else ['create']
+    if spec['purge_lifecycle_policy']:
+        if current.get('lifecycle_policy'):
+            actions.append('delete_lifecycle_policy')
+    elif spec['lifecycle_policy'] is not None:
+        if digests.digest(spec['lifecycle_policy']) != digests.digest(current.get('lifecycle_policy')):
+            actions.append('put_lifecycle_policy')
+    if spec['purge_policy']:
+        if current.get('policy'):
+            actions.append('delete_policy')
+    elif spec['policy'] is not None:
+        if digests.digest(spec['policy']) != digests.digest(current.get('policy')):
+            actions.append('set_policy')
+    return actions
+
+
+def run_repositories(ecr, params):
+    # type: (EcsEcr, dict) -> Tuple[bool, dict]
+    result = dict(changed=False, repositories=[])
+    registry_id = params['registry_id']
+    try:
+        specs = [repository_spec(params, item) for item in params['repositories']]
+    except ValueError as err:
+        result['msg'] = str(err)
+        return False, result
+
+    try:
+        existing = ecr.describe_all_repositories(registry_id)
+        if registry_id and any(spec['state'] == 'present' and spec['name'] not in existing for spec in specs):
+            default_registry_id = ecr.sts.get_caller_identity().get('Account')
+            if registry_id != default_registry_id:
+                raise Exception('Cannot create repositories in registry {}. '
+                                'They would be created in {} instead.'.format(registry_id, default_registry_id))
+    except Exception as err:
+        result['msg'] = boto_exception(err) if isinstance(err, ClientError) else str(err)
+        result['exception'] = traceback.format_exc()
+        return False, result
+
+    def fetch(spec):
+        current = dict()
+        if spec['state'] != 'present' or spec['name'] not in existing:
+            return current
+        if spec['policy'] is not None or spec['purge_policy']:
+            current['policy'] = ecr.get_repository_policy_text(registry_id, spec['name'])
+        if spec['lifecycle_policy'] is not None or spec['purge_lifecycle_policy']:
+            current['lifecycle_policy'] = ecr.get_lifecycle_policy_text(registry_id, spec['name'])
+        return current
+
+    def apply(item):
+        spec, actions = item
+        name = spec['name']
+        for action in actions:
+            if action == 'create':
+                ecr.create_repository(None, name)
+            elif action == 'delete':
+                ecr.delete_repository(registry_id, name)
+            elif action == 'put_lifecycle_policy':
+                ecr.put_lifecycle_policy(registry_id, name, spec['lifecycle_policy'])
+            elif action == 'delete_lifecycle_policy':
+                ecr.delete_lifecycle_policy(registry_id, name)
+            elif action == 'set_policy':
+                ecr.set_repository_policy(registry_id, name, spec['policy'], spec['force_set_policy'])
+            elif action == 'delete_policy':
+                ecr.delete_repository_policy(registry_id, name)
+
+    max_workers = params['max_concurrency']
+    digests = PolicyDigests()
+    plans = []
+    for spec, (current, error) in zip(specs, run_concurrently(fetch, specs, max_workers)):
+        record = dict(name=spec['name'], state=spec['state'], created=False, changed=False, actions=[])
+        result['repositories'].append(record)
+        if error is not None:
+            record.update(failed=True, msg=boto_exception(error) if isinstance(error, ClientError) else str(error))
+            continue
+        record['actions'] = plan_repository(spec, spec['name'] in existing, current, digests)
+        record['created'] = 'create' in record['actions']
+        record['changed'] = bool(record['actions'])
+        if record['actions']:
+            plans.append((record, spec))
+
+    if not ecr.check_mode:
+        outcomes = run_concurrently(apply, [(spec, record['actions']) for record, spec in plans], max_workers)
+        for (record, spec), (dummy, error) in zip(plans, outcomes):
+            if error is not None:
+                record.update(failed=True, msg=boto_exception(error) if isinstance(error, ClientError) else str(error))
+
+    result['changed'] = any(record['changed'] for record in result['repositories'])
+    failed = [record['name'] for record in result['repositories'] if record.get('failed')]
+    if failed:
+        result['msg'] = 'Failed to reconcile repositories: {}'.format(', '.join(failed))
+        return False, result
+    return True, result
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
-        name=dict(required=True),
+        name=dict(required=False),
+        repositories=dict(required=False, type='list'),
+        max_concurrency=dict(required=False, type='int', default=4),
         registry_id=dict(required=False),
         state=dict(required=False, choices=['present', 'absent'],
                    default='present'),
@@ -469,7 +676,9 @@ def main():
 
     module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True,
+                           required_one_of=[['name', 'repositories']],
                            mutually_exclusive=[
+                               ['name', 'repositories'],
                                ['policy', 'delete_policy', 'purge_policy'],
                                ['lifecycle_policy', 'purge_lifecycle_policy']])
 
@@ -477,7 +686,10 @@ def main():
         module.fail_json(msg='boto3 required for this module')
 
     ecr = EcsEcr(module)
-    passed, result = run(ecr, module.params)
+    if module.params['repositories'] is not None:
+        passed, result = run_repositories(ecr, module.params)
+    else:
+        passed, result = run(ecr, module.params)
 
     if passed:
         module.exit_json(**result)
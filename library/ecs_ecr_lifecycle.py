@@ -0,0 +1,284 @@
+#!/usr/bin/python
+# Copyright: Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+DOCUMENTATION = '''
+---
+module: ecs_ecr_lifecycle
+version_added: "2.8"
+short_description: Preview and apply an ECR lifecycle policy
+description:
+    - Evaluates an Elastic Container Registry lifecycle policy against the images
+      of a repository locally, and returns the images it would expire.
+    - AWS applies lifecycle policies asynchronously, some time after they are put.
+      This module shows their effect up front, and can optionally expire the images
+      right away.
+    - The images are listed once with a paginated C(describe_images) and sorted by
+      push time once. Every rule is then evaluated in a single pass over them.
+    - Rules are evaluated by ascending C(rulePriority). Once an image is selected by
+      the tag selection of a rule, rules with a lower priority don't consider it.
+requirements: [ boto3 ]
+options:
+    name:
+        description:
+            - The name of the repository.
+        required: true
+    registry_id:
+        description:
+            - AWS account id associated with the registry.
+            - If not specified, the default registry is assumed.
+        required: false
+    lifecycle_policy:
+        description:
+            - JSON or dict of the lifecycle policy to evaluate.
+            - Defaults to the lifecycle policy currently set on the repository.
+        required: false
+    expire:
+        description:
+            - Delete the images the policy would expire, with C(batch_delete_image)
+              calls of 100 images each.
+        type: bool
+        default: false
+    max_concurrency:
+        description:
+            - How many C(batch_delete_image) calls are made at the same time.
+        required: false
+        default: 4
+author:
+ - Ansible Project
+extends_documentation_fragment:
+  - aws
+  - ec2
+'''
+
+EXAMPLES = '''
+- name: what would the new lifecycle policy remove?
+  ecs_ecr_lifecycle:
+    name: team/api
+    lifecycle_policy: "{{ lookup('file', 'lifecycle.json') }}"
+  register: preview
+
+- name: prune the repository now instead of waiting for AWS
+  ecs_ecr_lifecycle:
+    name: team/api
+    expire: yes
+'''
+
+RETURN = '''
+image_count:
+    type: int
+    description: Number of images in the repository
+    returned: always
+    sample: 52113
+expired:
+    type: list
+    description: Digests of the images the policy expires, most recently pushed first
+    returned: always
+    sample: ["sha256:3f8c1e8a9b..."]
+expired_bytes:
+    type: int
+    description: Total size of the expired images
+    returned: always
+    sample: 73400320
+rules:
+    type: list
+    description: Per rule, the number of images its tag selection matched and the number it expires
+    returned: always
+    sample:
+        - rule_priority: 1
+          matched: 120
+          expired: 100
+failures:
+    type: list
+    description: Images that batch_delete_image could not delete
+    returned: when I(expire=true) and some images were not deleted
+'''
+
+import calendar
+import json
+import time
+
+try:
+    import botocore
+except ImportError:
+    pass  # handled by AnsibleAWSModule
+
+from ansible.module_utils.aws.core import AnsibleAWSModule
+from ansible.module_utils.aws.concurrency import chunks, run_concurrently
+from ansible.module_utils.ec2 import AWSRetry, ec2_argument_spec
+from ansible.module_utils.six import string_types
+
+BATCH_DELETE_IMAGE_MAX = 100
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def build_kwargs(registry_id):
+    if not registry_id:
+        return dict()
+    return dict(registryId=registry_id)
+
+
+@AWSRetry.exponential_backoff()
+def describe_images_page(ecr, params):
+    return ecr.describe_images(**params)
+
+
+@AWSRetry.exponential_backoff()
+def get_lifecycle_policy_text(ecr, registry_id, name):
+    try:
+        return ecr.get_lifecycle_policy(repositoryName=name, **build_kwargs(registry_id))['lifecyclePolicyText']
+    except botocore.exceptions.ClientError as e:
+        if e.response['Error']['Code'] == 'LifecyclePolicyNotFoundException':
+            return None
+        raise
+
+
+@AWSRetry.exponential_backoff()
+def batch_delete_image(ecr, registry_id, name, digests):
+    return ecr.batch_delete_image(repositoryName=name, imageIds=[dict(imageDigest=d) for d in digests],
+                                  **build_kwargs(registry_id))
+
+
+def image_table(ecr, registry_id, name):
+    """Every image of the repository as (pushed_at, digest, tags, size), most recently pushed first
+
+    Only the fields lifecycle rules look at are kept, so even repositories
+    with tens of thousands of images fit comfortably in memory.
+    """
+    params = dict(repositoryName=name, maxResults=1000, **build_kwargs(registry_id))
+    table = []
+    while True:
+        response = describe_images_page(ecr, params)
+        for image in response['imageDetails']:
+            pushed_at = image['imagePushedAt']
+            if hasattr(pushed_at, 'utctimetuple'):
+                pushed_at = calendar.timegm(pushed_at.utctimetuple())
+            table.append((pushed_at, image['imageDigest'], tuple(image.get('imageTags', ())),
+                          image.get('imageSizeInBytes', 0)))
+        if not response.get('nextToken'):
+            break
+        params['nextToken'] = response['nextToken']
+    table.sort(reverse=True)
+    return table
+
+
+def tag_selector(selection):
+    """Build a predicate on an image's tags from a rule's selection"""
+    status = selection.get('tagStatus', 'any')
+    prefixes = selection.get('tagPrefixList') or []
+    if status == 'untagged':
+        return lambda tags: not tags
+    if status == 'tagged':
+        # an image matches when every prefix is matched by at least one of its tags
+        return lambda tags: bool(tags) and all(any(t.startswith(p) for t in tags) for p in prefixes)
+    return lambda tags: True
+
+
+def evaluate_lifecycle_policy(policy, table, now=None):
+    """Return the images of table that policy expires, and per rule statistics
+
+    table must be sorted most recently pushed first, as image_table returns
+    it; imageCountMoreThan rules then keep the first countNumber images they
+    match and sinceImagePushed rules compare against a single cutoff, so
+    each rule is one pass over the images still unclaimed.
+    """
+    now = now or time.time()
+    claimed = set()
+    expired = []
+    stats = []
+    for rule in sorted(policy.get('rules', []), key=lambda r: r['rulePriority']):
+        selection = rule['selection']
+        selects = tag_selector(selection)
+        count_type = selection['countType']
+        count_number = selection['countNumber']
+        if count_type == 'sinceImagePushed':
+            if selection.get('countUnit', 'days') != 'days':
+                raise ValueError('Unsupported countUnit {0} in rule {1}'.format(selection['countUnit'], rule['rulePriority']))
+            cutoff = now - count_number * SECONDS_PER_DAY
+        elif count_type != 'imageCountMoreThan':
+            raise ValueError('Unsupported countType {0} in rule {1}'.format(count_type, rule['rulePriority']))
+        expires = rule.get('action', {}).get('type', 'expire') == 'expire'
+
+        matched = rule_expired = 0
+        for image in table:
+            pushed_at, digest, tags = image[0], image[1], image[2]
+            if digest in claimed or not selects(tags):
+                continue
+            claimed.add(digest)
+            matched += 1
+            if count_type == 'imageCountMoreThan':
+                expire = matched > count_number
+            else:
+                expire = pushed_at < cutoff
+            if expire and expires:
+                expired.append(image)
+                rule_expired += 1
+        stats.append(dict(rule_priority=rule['rulePriority'], matched=matched, expired=rule_expired))
+    expired.sort(reverse=True)
+    return expired, stats
+
+
+def main():
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(dict(
+        name=dict(required=True),
+        registry_id=dict(required=False),
+        lifecycle_policy=dict(required=False, type='json'),
+        expire=dict(type='bool', default=False),
+        max_concurrency=dict(type='int', default=4),
+    ))
+    module = AnsibleAWSModule(argument_spec=argument_spec, supports_check_mode=True)
+
+    name = module.params['name']
+    registry_id = module.params['registry_id']
+    ecr = module.client('ecr')
+
+    try:
+        policy_text = module.params['lifecycle_policy']
+        if policy_text is None:
+            policy_text = get_lifecycle_policy_text(ecr, registry_id, name)
+            if policy_text is None:
+                module.fail_json(msg='Repository {0} has no lifecycle policy, and none was given'.format(name))
+        table = image_table(ecr, registry_id, name)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json_aws(e, msg='Could not read repository {0}'.format(name))
+
+    try:
+        policy = json.loads(policy_text) if isinstance(policy_text, string_types) else policy_text
+        expired, stats = evaluate_lifecycle_policy(policy, table)
+    except (ValueError, KeyError, TypeError) as e:
+        module.fail_json(msg='Could not evaluate lifecycle_policy: {0}'.format(e), lifecycle_policy=policy_text)
+
+    digests = [image[1] for image in expired]
+    result = dict(changed=False, image_count=len(table), expired=digests,
+                  expired_bytes=sum(image[3] for image in expired), rules=stats)
+
+    if module.params['expire'] and digests:
+        result['changed'] = True
+        if not module.check_mode:
+            failures = []
+            batches = chunks(digests, BATCH_DELETE_IMAGE_MAX)
+            outcomes = run_concurrently(lambda batch: batch_delete_image(ecr, registry_id, name, batch),
+                                        batches, module.params['max_concurrency'])
+            for batch, (response, error) in zip(batches, outcomes):
+                if error is not None:
+                    failures.extend(dict(imageId=dict(imageDigest=d), failureReason=str(error)) for d in batch)
+                else:
+                    failures.extend(response.get('failures', []))
+            if failures:
+                result['failures'] = failures
+                module.fail_json(msg='Could not delete {0} of {1} expired images'.format(len(failures), len(digests)), **result)
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
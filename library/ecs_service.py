@@ -39,8 +39,29 @@ options:
     name:
         description:
           - The name of the service.
-        required: true
+          - One of I(name) or I(services) is required.
+        required: false
         type: str
+    services:
+        description:
+          - Manage many services of I(cluster) in one run instead of looping over I(name).
+          - Each item is a dict taking the same keys as the module (C(name), C(task_definition), C(desired_count),
+            C(load_balancers) and so on). Keys missing from an item default to the module level options.
+            C(state) may be C(present) or C(absent).
+          - All services are described with one call per ten services, and the creates, updates and deletes
+            that are needed are made concurrently, staying under the ECS request rate.
+          - With I(wait=true) all services are then waited on together.
+        required: false
+        version_added: 2.8
+        type: list
+        elements: dict
+    max_concurrency:
+        description:
+          - How many services of I(services) are created, updated or deleted at the same time.
+        required: false
+        default: 4
+        version_added: 2.8
+        type: int
     cluster:
         description:
           - The name of the cluster in which the service exists.
@@ -79,15 +100,42 @@ options:
     delay:
         description:
           - The time to wait before checking that the service is available.
+          - This is the shortest interval between polls when waiting; it grows while nothing changes.
         required: false
         default: 10
         type: int
     repeat:
         description:
           - The number of times to check that the service is available.
+          - With I(state=deleting), the service has I(delay) x I(repeat) seconds to become inactive.
         required: false
         default: 10
         type: int
+    wait:
+        description:
+          - With I(state=present), wait until the service has a single deployment with all of its tasks
+            running (and a C(COMPLETED) rollout, where ECS reports one).
+          - With I(state=absent), wait until the service is inactive.
+          - The wait fails early when the deployment is rolled back or tasks repeatedly fail to start.
+        required: false
+        default: false
+        version_added: 2.8
+        type: bool
+    wait_timeout:
+        description:
+          - How long to wait, in seconds, when I(wait=true).
+        required: false
+        default: 600
+        version_added: 2.8
+        type: int
+    wait_failure_threshold:
+        description:
+          - Fail the wait once this many task start failures have been reported for the service since the
+            wait began.
+        required: false
+        default: 3
+        version_added: 2.8
+        type: int
     force_new_deployment:
         description:
           - Force deployment of service even if there are no changes.
@@ -247,6 +295,31 @@ EXAMPLES = '''
     placement_strategy:
       - type: binpack
         field: memory
+
+# Roll a new image out to every service of a cluster and wait for all of them
+- ecs_service:
+    state: present
+    cluster: test-cluster
+    services:
+      - name: web
+        task_definition: 'web:17'
+        desired_count: 4
+      - name: worker
+        task_definition: 'worker:9'
+        desired_count: 2
+      - name: old-worker
+        state: absent
+    wait: yes
+
+# Deploy a new task definition and wait for the rollout to finish
+- ecs_service:
+    state: present
+    name: test-service
+    cluster: test-cluster
+    task_definition: 'test-task-definition:42'
+    desired_count: 3
+    wait: yes
+    wait_timeout: 900
 '''
 
 RETURN = '''
@@ -361,6 +434,32 @@ service:
                     returned: always
                     type: str
 
+services:
+    description: Result for every item of I(services).
+    returned: when I(services) is used
+    type: list
+    elements: dict
+    contains:
+        name:
+            description: The name of the service.
+            returned: always
+            type: str
+        action:
+            description: The call that was (or in check mode would be) made, C(create), C(update), C(delete) or null.
+            returned: always
+            type: str
+        changed:
+            description: Whether the service was changed.
+            returned: always
+            type: bool
+        service:
+            description: Details of the service, as in I(service) above.
+            returned: when the service is present
+            type: dict
+        msg:
+            description: Why the service could not be managed.
+            returned: when the service failed
+            type: str
 ansible_facts:
     description: Facts about deleted service.
     returned: when deleting a service
@@ -477,6 +576,7 @@ ansible_facts:
                             returned: always
                             type: str
 '''
+import calendar
 import time
 
 DEPLOYMENT_CONFIGURATION_TYPE_MAP = {
@@ -487,6 +587,7 @@ DEPLOYMENT_CONFIGURATION_TYPE_MAP = {
 from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.ec2 import ec2_argument_spec
 from ansible.module_utils.ec2 import snake_dict_to_camel_dict, map_complex_type, get_ec2_security_group_ids_from_names
+from ansible.module_utils.aws.concurrency import RateLimiter, chunks, run_concurrently
 import ansible.module_utils.ec2 as ec2
 
 try:
@@ -495,6 +596,128 @@ except ImportError:
     pass  # handled by AnsibleAWSModule
 
 
+# describe_services accepts at most this many services per call
+DESCRIBE_SERVICES_MAX = 10
+
+# Stay well under the ECS API request rate when updating many services at once
+ECS_REQUESTS_PER_SECOND = 10
+
+# Fragments of the service events ECS reports when it can't start tasks
+TASK_FAILURE_EVENTS = (
+    'unable to place a task',
+    'failed to launch a task',
+    'is unable to consistently start tasks',
+    'failed container health checks',
+    'failed elb health checks',
+)
+
+
+class ServiceWaitError(Exception):
+    pass
+
+
+class EcsServiceWaiter:
+    """Waits for services of one cluster to be stable or deleted
+
+    All services are polled together with describe_services, ten per call.
+    The poll interval starts at min_delay, grows while nothing changes and
+    drops back as soon as a service makes progress.
+    """
+
+    def __init__(self, service_mgr, cluster, names, min_delay=10, timeout=600, failure_threshold=3):
+        self.service_mgr = service_mgr
+        self.cluster = cluster
+        self.names = list(names)
+        self.min_delay = max(min_delay, 1)
+        self.max_delay = self.min_delay * 6
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.started = time.time()
+        # failedTasks of each primary deployment when the wait started, by deployment id
+        self.failed_before = {}
+
+    def created_before_start(self, item):
+        created = item.get('createdAt')
+        return hasattr(created, 'utctimetuple') and calendar.timegm(created.utctimetuple()) < self.started - 5
+
+    def task_failures(self, service):
+        """Count the tasks that failed since the wait started"""
+        failures = 0
+        for event in service.get('events', []):
+            if self.created_before_start(event):
+                continue
+            if any(fragment in event.get('message', '') for fragment in TASK_FAILURE_EVENTS):
+                failures += 1
+        for deployment in service.get('deployments', []):
+            if deployment.get('status') != 'PRIMARY':
+                continue
+            failed = deployment.get('failedTasks', 0)
+            baseline = self.failed_before.setdefault(deployment.get('id'), failed if self.created_before_start(deployment) else 0)
+            failures = max(failures, failed - baseline)
+        return failures
+
+    def check_stable(self, name, service):
+        """Return True once the service has finished deploying, raise ServiceWaitError if it never will"""
+        if service is None:
+            # a service that was only just created may not be visible yet
+            return False
+        if service.get('status') != 'ACTIVE':
+            raise ServiceWaitError("Service %s is %s" % (name, service.get('status')))
+        deployments = service.get('deployments', [])
+        for deployment in deployments:
+            if deployment.get('rolloutState') == 'FAILED':
+                raise ServiceWaitError("Deployment of service %s failed: %s" % (name, deployment.get('rolloutStateReason', '')))
+        if self.task_failures(service) >= self.failure_threshold:
+            messages = [e['message'] for e in service.get('events', [])[:self.failure_threshold]]
+            raise ServiceWaitError("Tasks of service %s keep failing to start: %s" % (name, '; '.join(messages)))
+        if len(deployments) != 1 or deployments[0].get('status') != 'PRIMARY':
+            return False
+        deployment = deployments[0]
+        if deployment.get('rolloutState', 'COMPLETED') != 'COMPLETED':
+            return False
+        return deployment['runningCount'] == deployment['desiredCount'] and deployment.get('pendingCount', 0) == 0
+
+    @staticmethod
+    def check_deleted(name, service):
+        return service is None or service.get('status') == 'INACTIVE'
+
+    @staticmethod
+    def progress(service):
+        if service is None:
+            return None
+        return (service.get('status'), service.get('runningCount'), service.get('pendingCount'),
+                tuple((d.get('id'), d.get('runningCount'), d.get('rolloutState')) for d in service.get('deployments', [])))
+
+    def wait(self, target):
+        """Poll until every service reaches target ('stable' or 'deleted')
+
+        Returns the last description of every service. Raises ServiceWaitError
+        on timeout or when a deployment fails.
+        """
+        check = self.check_stable if target == 'stable' else self.check_deleted
+        pending = list(self.names)
+        services = {}
+        last_progress = {}
+        delay = self.min_delay
+        while True:
+            services.update(self.service_mgr.describe_services(self.cluster, pending))
+            moved = False
+            for name in list(pending):
+                progress = self.progress(services[name])
+                if last_progress.get(name) != progress:
+                    moved = True
+                    last_progress[name] = progress
+                if check(name, services[name]):
+                    pending.remove(name)
+            if not pending:
+                return services
+            delay = self.min_delay if moved else min(delay * 1.5, self.max_delay)
+            if time.time() - self.started + delay > self.timeout:
+                raise ServiceWaitError("Timed out after %d seconds waiting for %s to be %s" %
+                                       (self.timeout, ', '.join(pending), target))
+            time.sleep(delay)
+
+
 class EcsServiceManager:
     """Handles ECS Services"""
 
@@ -505,11 +728,11 @@ class EcsServiceManager:
 
     def format_network_configuration(self, network_config):
         result = dict()
-        if network_config['subnets'] is not None:
+        if network_config.get('subnets') is not None:
             result['subnets'] = network_config['subnets']
         else:
             self.module.fail_json(msg="Network configuration must include subnets")
-        if network_config['security_groups'] is not None:
+        if network_config.get('security_groups') is not None:
             groups = network_config['security_groups']
             if any(not sg.startswith('sg-') for sg in groups):
                 try:
@@ -518,7 +741,7 @@ class EcsServiceManager:
                 except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
                     self.module.fail_json_aws(e, msg="Couldn't look up security groups")
             result['securityGroups'] = groups
-        if network_config['assign_public_ip'] is not None:
+        if network_config.get('assign_public_ip') is not None:
             if self.module.botocore_at_least('1.8.4'):
                 if network_config['assign_public_ip'] is True:
                     result['assignPublicIp'] = "ENABLED"
@@ -552,6 +775,27 @@ class EcsServiceManager:
                 return c
         raise Exception("Unknown problem describing service %s." % service_name)
 
+    @ec2.AWSRetry.backoff()
+    def describe_services_chunk(self, cluster_name, service_names):
+        return self.ecs.describe_services(cluster=cluster_name, services=service_names)
+
+    def describe_services(self, cluster_name, service_names):
+        """Describe many services, DESCRIBE_SERVICES_MAX per call
+
+        Returns a dict of the requested name (or ARN) to the service, or None
+        for services that don't exist.
+        """
+        found = dict((name, None) for name in service_names)
+        for chunk in chunks(service_names, DESCRIBE_SERVICES_MAX):
+            response = self.describe_services_chunk(cluster_name, chunk)
+            by_name = dict()
+            for service in response['services']:
+                by_name[service['serviceName']] = service
+                by_name[service['serviceArn']] = service
+            for name in chunk:
+                found[name] = by_name.get(name)
+        return found
+
     def is_matching_service(self, expected, existing):
         if expected['task_definition'] != existing['taskDefinition']:
             return False
@@ -656,11 +900,215 @@ class EcsServiceManager:
         return len(load_balancers) > 0 and self.module.botocore_at_least('1.8.20')
 
 
+class ServiceError(Exception):
+    def __init__(self, msg, exception=None):
+        super(ServiceError, self).__init__(msg)
+        self.msg = msg
+        self.exception = exception
+
+
+def prepare_service(service_mgr, params):
+    """Validate one service's options and turn them into the shapes the API wants"""
+    if params['state'] == 'present' and not params.get('task_definition'):
+        raise ServiceError("state is present but all of the following are missing: task_definition")
+    if params.get('launch_type') == 'FARGATE' and not params.get('network_configuration'):
+        raise ServiceError("launch_type is FARGATE but all of the following are missing: network_configuration")
+    if params['state'] == 'present' and params.get('scheduling_strategy') == 'REPLICA':
+        if params.get('desired_count') is None:
+            raise ServiceError('state is present, scheduling_strategy is REPLICA; missing desired_count')
+
+    if params.get('network_configuration'):
+        if not service_mgr.ecs_api_handles_network_configuration():
+            raise ServiceError('botocore needs to be version 1.7.44 or higher to use network configuration')
+        network_configuration = service_mgr.format_network_configuration(params['network_configuration'])
+    else:
+        network_configuration = None
+
+    deployment_configuration = map_complex_type(params.get('deployment_configuration') or {},
+                                                DEPLOYMENT_CONFIGURATION_TYPE_MAP)
+
+    loadBalancers = []
+    for loadBalancer in params.get('load_balancers') or []:
+        if 'containerPort' in loadBalancer:
+            loadBalancer['containerPort'] = int(loadBalancer['containerPort'])
+        loadBalancers.append(loadBalancer)
+
+    return dict(
+        network_configuration=network_configuration,
+        deployment_configuration=snake_dict_to_camel_dict(deployment_configuration),
+        service_registries=list(map(snake_dict_to_camel_dict, params.get('service_registries') or [])),
+        load_balancers=loadBalancers,
+    )
+
+
+def plan_service(service_mgr, params, existing):
+    """Return the call needed to bring the service to its state: create, update, delete or None"""
+    if params['state'] == 'present':
+        if existing and 'status' in existing and existing['status'] == "ACTIVE":
+            if params['force_new_deployment']:
+                return 'update'
+            elif service_mgr.is_matching_service(params, existing):
+                return None
+            return 'update'
+        return 'create'
+    if existing and existing.get('status') != 'INACTIVE':
+        return 'delete'
+    return None
+
+
+def apply_service(module, service_mgr, params, prepared, existing, action):
+    """Make the create, update or delete call planned for a service
+
+    Raises ServiceError rather than failing the module so it can run on a
+    worker thread in services mode.
+    """
+    if action == 'update':
+        # check various parameters and boto versions and give a helpful error in boto is not new enough for feature
+        if params.get('scheduling_strategy'):
+            if not module.botocore_at_least('1.10.37'):
+                raise ServiceError('botocore needs to be version 1.10.37 or higher to use scheduling_strategy')
+            elif (existing['schedulingStrategy']) != params['scheduling_strategy']:
+                raise ServiceError("It is not possible to update the scheduling strategy of an existing service")
+
+        if prepared['service_registries']:
+            if not module.botocore_at_least('1.9.15'):
+                raise ServiceError('botocore needs to be version 1.9.15 or higher to use service_registries')
+            elif (existing['serviceRegistries'] or []) != prepared['service_registries']:
+                raise ServiceError("It is not possible to update the service registries of an existing service")
+
+        if (existing['loadBalancers'] or []) != prepared['load_balancers']:
+            raise ServiceError("It is not possible to update the load balancers of an existing service")
+
+    try:
+        if action == 'update':
+            return service_mgr.update_service(params['name'],
+                                              params['cluster'],
+                                              params['task_definition'],
+                                              params['desired_count'],
+                                              prepared['deployment_configuration'],
+                                              prepared['network_configuration'],
+                                              params['health_check_grace_period_seconds'],
+                                              params['force_new_deployment'])
+        elif action == 'create':
+            return service_mgr.create_service(params['name'],
+                                              params['cluster'],
+                                              params['task_definition'],
+                                              prepared['load_balancers'],
+                                              params['desired_count'],
+                                              params['client_token'],
+                                              params['role'],
+                                              prepared['deployment_configuration'],
+                                              params['placement_constraints'],
+                                              params['placement_strategy'],
+                                              params['health_check_grace_period_seconds'],
+                                              prepared['network_configuration'],
+                                              prepared['service_registries'],
+                                              params['launch_type'],
+                                              params['scheduling_strategy']
+                                              )
+        elif action == 'delete':
+            service_mgr.delete_service(params['name'], params['cluster'])
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        raise ServiceError("Couldn't %s service %s" % (action, params['name']), e)
+
+
+def fail_service_error(module, e, **kwargs):
+    if e.exception is not None:
+        module.fail_json_aws(e.exception, msg=e.msg, **kwargs)
+    module.fail_json(msg=e.msg, **kwargs)
+
+
+def service_params(module, item):
+    """Module level options overlaid with one item of services"""
+    params = dict(module.params)
+    del params['services']
+    params.update(item)
+    if params.get('desired_count') is not None:
+        params['desired_count'] = int(params['desired_count'])
+    return params
+
+
+def manage_services(module, service_mgr):
+    """services mode: reconcile many services of one cluster in one run"""
+    cluster = module.params['cluster']
+    plans = []
+    for item in module.params['services']:
+        params = service_params(module, item)
+        if not params.get('name'):
+            module.fail_json(msg="Every item of services needs a name")
+        if params['state'] not in ('present', 'absent'):
+            module.fail_json(msg="state of service %s must be present or absent" % params['name'])
+        try:
+            prepared = prepare_service(service_mgr, params)
+        except ServiceError as e:
+            module.fail_json(msg="%s: %s" % (params['name'], e.msg))
+        plans.append(dict(params=params, prepared=prepared))
+
+    names = [plan['params']['name'] for plan in plans]
+    if len(set(names)) != len(names):
+        module.fail_json(msg="Every service must only be listed once in services")
+
+    try:
+        existing = service_mgr.describe_services(cluster, names)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json_aws(e, msg="Couldn't describe services in cluster %s" % cluster)
+
+    for plan in plans:
+        plan['existing'] = existing[plan['params']['name']]
+        plan['action'] = plan_service(service_mgr, plan['params'], plan['existing'])
+
+    limiter = RateLimiter(ECS_REQUESTS_PER_SECOND)
+
+    def worker(plan):
+        limiter.acquire()
+        return apply_service(module, service_mgr, plan['params'], plan['prepared'], plan['existing'], plan['action'])
+
+    to_apply = [plan for plan in plans if plan['action'] and not module.check_mode]
+    for plan, (response, error) in zip(to_apply, run_concurrently(worker, to_apply, module.params['max_concurrency'])):
+        plan['response'] = response
+        plan['error'] = error
+
+    results = []
+    for plan in plans:
+        result = dict(name=plan['params']['name'], action=plan['action'], changed=bool(plan['action']))
+        if plan.get('error') is not None:
+            result.update(changed=False, failed=True, msg=getattr(plan['error'], 'msg', str(plan['error'])))
+        elif plan.get('response'):
+            result['service'] = plan['response']
+        elif plan['existing'] and plan['params']['state'] == 'present':
+            result['service'] = service_mgr.jsonize(plan['existing'])
+        results.append(result)
+
+    failed = any(r.get('failed') for r in results)
+    if module.params['wait'] and not module.check_mode and not failed:
+        for target, state in (('stable', 'present'), ('deleted', 'absent')):
+            waiting = [r for r, plan in zip(results, plans) if plan['params']['state'] == state and
+                       (state == 'present' or plan['action'])]
+            if not waiting:
+                continue
+            waiter = EcsServiceWaiter(service_mgr, cluster, [r['name'] for r in waiting], module.params['delay'],
+                                      module.params['wait_timeout'], module.params['wait_failure_threshold'])
+            try:
+                services = waiter.wait(target)
+            except ServiceWaitError as e:
+                module.fail_json(msg=str(e), changed=any(r['changed'] for r in results), services=results)
+            if target == 'stable':
+                for r in waiting:
+                    r['service'] = service_mgr.jsonize(services[r['name']])
+
+    changed = any(r['changed'] for r in results)
+    if failed:
+        module.fail_json(msg="Failed to manage some services", changed=changed, services=results)
+    module.exit_json(changed=changed, services=results)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
         state=dict(required=True, choices=['present', 'absent', 'deleting']),
-        name=dict(required=True, type='str'),
+        name=dict(required=False, type='str'),
+        services=dict(required=False, type='list'),
+        max_concurrency=dict(required=False, default=4, type='int'),
         cluster=dict(required=False, type='str'),
         task_definition=dict(required=False, type='str'),
         load_balancers=dict(required=False, default=[], type='list'),
@@ -681,40 +1129,18 @@ def main():
         )),
         launch_type=dict(required=False, choices=['EC2', 'FARGATE']),
         service_registries=dict(required=False, type='list', default=[]),
-        scheduling_strategy=dict(required=False, choices=['DAEMON', 'REPLICA'])
+        scheduling_strategy=dict(required=False, choices=['DAEMON', 'REPLICA']),
+        wait=dict(required=False, default=False, type='bool'),
+        wait_timeout=dict(required=False, default=600, type='int'),
+        wait_failure_threshold=dict(required=False, default=3, type='int'),
     ))
 
     module = AnsibleAWSModule(argument_spec=argument_spec,
                               supports_check_mode=True,
-                              required_if=[('state', 'present', ['task_definition']),
-                                           ('launch_type', 'FARGATE', ['network_configuration'])],
+                              required_one_of=[['name', 'services']],
+                              mutually_exclusive=[['name', 'services']],
                               required_together=[['load_balancers', 'role']])
 
-    if module.params['state'] == 'present' and module.params['scheduling_strategy'] == 'REPLICA':
-        if module.params['desired_count'] is None:
-            module.fail_json(msg='state is present, scheduling_strategy is REPLICA; missing desired_count')
-
-    service_mgr = EcsServiceManager(module)
-    if module.params['network_configuration']:
-        if not service_mgr.ecs_api_handles_network_configuration():
-            module.fail_json(msg='botocore needs to be version 1.7.44 or higher to use network configuration')
-        network_configuration = service_mgr.format_network_configuration(module.params['network_configuration'])
-    else:
-        network_configuration = None
-
-    deployment_configuration = map_complex_type(module.params['deployment_configuration'],
-                                                DEPLOYMENT_CONFIGURATION_TYPE_MAP)
-
-    deploymentConfiguration = snake_dict_to_camel_dict(deployment_configuration)
-    serviceRegistries = list(map(snake_dict_to_camel_dict, module.params['service_registries']))
-
-    try:
-        existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
-    except Exception as e:
-        module.fail_json(msg="Exception describing service '" + module.params['name'] + "' in cluster '" + module.params['cluster'] + "': " + str(e))
-
-    results = dict(changed=False)
-
     if module.params['launch_type']:
         if not module.botocore_at_least('1.8.4'):
             module.fail_json(msg='botocore needs to be version 1.8.4 or higher to use launch_type')
@@ -725,89 +1151,48 @@ def main():
         if not module.botocore_at_least('1.8.20'):
             module.fail_json(msg='botocore needs to be version 1.8.20 or higher to use health_check_grace_period_seconds')
 
-    if module.params['state'] == 'present':
+    service_mgr = EcsServiceManager(module)
 
-        matching = False
-        update = False
+    if module.params['services'] is not None:
+        manage_services(module, service_mgr)
 
-        if existing and 'status' in existing and existing['status'] == "ACTIVE":
-            if module.params['force_new_deployment']:
-                update = True
-            elif service_mgr.is_matching_service(module.params, existing):
-                matching = True
-                results['service'] = existing
-            else:
-                update = True
+    prepared = None
+    if module.params['state'] != 'deleting':
+        try:
+            prepared = prepare_service(service_mgr, module.params)
+        except ServiceError as e:
+            module.fail_json(msg=e.msg)
 
-        if not matching:
-            if not module.check_mode:
+    try:
+        existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
+    except Exception as e:
+        module.fail_json(msg="Exception describing service '" + module.params['name'] + "' in cluster '" + module.params['cluster'] + "': " + str(e))
 
-                role = module.params['role']
-                clientToken = module.params['client_token']
-
-                loadBalancers = []
-                for loadBalancer in module.params['load_balancers']:
-                    if 'containerPort' in loadBalancer:
-                        loadBalancer['containerPort'] = int(loadBalancer['containerPort'])
-                    loadBalancers.append(loadBalancer)
-
-                for loadBalancer in loadBalancers:
-                    if 'containerPort' in loadBalancer:
-                        loadBalancer['containerPort'] = int(loadBalancer['containerPort'])
-
-                if update:
-                    # check various parameters and boto versions and give a helpful error in boto is not new enough for feature
-
-                    if module.params['scheduling_strategy']:
-                        if not module.botocore_at_least('1.10.37'):
-                            module.fail_json(msg='botocore needs to be version 1.10.37 or higher to use scheduling_strategy')
-                        elif (existing['schedulingStrategy']) != module.params['scheduling_strategy']:
-                            module.fail_json(msg="It is not possible to update the scheduling strategy of an existing service")
-
-                    if module.params['service_registries']:
-                        if not module.botocore_at_least('1.9.15'):
-                            module.fail_json(msg='botocore needs to be version 1.9.15 or higher to use service_registries')
-                        elif (existing['serviceRegistries'] or []) != serviceRegistries:
-                            module.fail_json(msg="It is not possible to update the service registries of an existing service")
-
-                    if (existing['loadBalancers'] or []) != loadBalancers:
-                        module.fail_json(msg="It is not possible to update the load balancers of an existing service")
-
-                    # update required
-                    response = service_mgr.update_service(module.params['name'],
-                                                          module.params['cluster'],
-                                                          module.params['task_definition'],
-                                                          module.params['desired_count'],
-                                                          deploymentConfiguration,
-                                                          network_configuration,
-                                                          module.params['health_check_grace_period_seconds'],
-                                                          module.params['force_new_deployment'])
+    results = dict(changed=False)
 
-                else:
-                    try:
-                        response = service_mgr.create_service(module.params['name'],
-                                                              module.params['cluster'],
-                                                              module.params['task_definition'],
-                                                              loadBalancers,
-                                                              module.params['desired_count'],
-                                                              clientToken,
-                                                              role,
-                                                              deploymentConfiguration,
-                                                              module.params['placement_constraints'],
-                                                              module.params['placement_strategy'],
-                                                              module.params['health_check_grace_period_seconds'],
-                                                              network_configuration,
-                                                              serviceRegistries,
-                                                              module.params['launch_type'],
-                                                              module.params['scheduling_strategy']
-                                                              )
-                    except botocore.exceptions.ClientError as e:
-                        module.fail_json_aws(e, msg="Couldn't create service")
-
-                results['service'] = response
+    if module.params['state'] == 'present':
+        action = plan_service(service_mgr, module.params, existing)
+
+        if action is None:
+            results['service'] = existing
+        else:
+            if not module.check_mode:
+                try:
+                    results['service'] = apply_service(module, service_mgr, module.params, prepared, existing, action)
+                except ServiceError as e:
+                    fail_service_error(module, e)
 
             results['changed'] = True
 
+        if module.params['wait'] and not module.check_mode:
+            waiter = EcsServiceWaiter(service_mgr, module.params['cluster'], [module.params['name']],
+                                      module.params['delay'], module.params['wait_timeout'],
+                                      module.params['wait_failure_threshold'])
+            try:
+                results['service'] = service_mgr.jsonize(waiter.wait('stable')[module.params['name']])
+            except ServiceWaitError as e:
+                module.fail_json(msg=str(e), **results)
+
     elif module.params['state'] == 'absent':
         if not existing:
             pass
@@ -822,12 +1207,16 @@ def main():
             else:
                 if not module.check_mode:
                     try:
-                        service_mgr.delete_service(
-                            module.params['name'],
-                            module.params['cluster']
-                        )
-                    except botocore.exceptions.ClientError as e:
-                        module.fail_json_aws(e, msg="Couldn't delete service")
+                        apply_service(module, service_mgr, module.params, prepared, existing, 'delete')
+                    except ServiceError as e:
+                        fail_service_error(module, e)
+                    if module.params['wait']:
+                        waiter = EcsServiceWaiter(service_mgr, module.params['cluster'], [module.params['name']],
+                                                  module.params['delay'], module.params['wait_timeout'])
+                        try:
+                            waiter.wait('deleted')
+                        except ServiceWaitError as e:
+                            module.fail_json(msg=str(e))
                 results['changed'] = True
 
     elif module.params['state'] == 'deleting':
@@ -838,17 +1227,12 @@ def main():
         # return info about the cluster deleted
         delay = module.params['delay']
         repeat = module.params['repeat']
-        time.sleep(delay)
-        for i in range(repeat):
-            existing = service_mgr.describe_service(module.params['cluster'], module.params['name'])
-            status = existing['status']
-            if status == "INACTIVE":
-                results['changed'] = True
-                break
-            time.sleep(delay)
-        if i is repeat - 1:
+        waiter = EcsServiceWaiter(service_mgr, module.params['cluster'], [module.params['name']], delay, delay * repeat)
+        try:
+            waiter.wait('deleted')
+        except ServiceWaitError:
             module.fail_json(msg="Service still not deleted after " + str(repeat) + " tries of " + str(delay) + " seconds each.")
-            return
+        results['changed'] = True
 
     module.exit_json(**results)
 
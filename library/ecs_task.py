@@ -45,6 +45,7 @@ options:
     count:
         description:
             - How many new instances to start.
+            - Counts above 10, the most a single RunTask call accepts, are started with several concurrent calls.
         required: False
         type: int
     task:
@@ -84,6 +85,22 @@ options:
         version_added: 2.8
         choices: ["EC2", "FARGATE"]
         type: str
+    wait:
+        description:
+          - Wait until the started, run or stopped tasks are C(running) or C(stopped).
+          - When waiting for C(running), the module fails if a task stops first.
+          - The tasks are then returned with their latest details and the exit code of each container in I(exit_codes).
+        required: false
+        version_added: 2.8
+        choices: ["running", "stopped"]
+        type: str
+    wait_timeout:
+        description:
+          - How long to wait, in seconds.
+        required: false
+        default: 600
+        version_added: 2.8
+        type: int
 extends_documentation_fragment:
     - aws
     - ec2
@@ -135,6 +152,21 @@ EXAMPLES = '''
         - my_security_group
   register: task_output
 
+- name: Run a database migration and wait for it to finish
+  ecs_task:
+      operation: run
+      cluster: console-sample-app-static-cluster
+      task_definition: console-sample-app-migrate
+      count: 1
+      started_by: ansible_user
+      wait: stopped
+      wait_timeout: 1800
+  register: migration
+
+- name: Fail if the migration container exited with an error
+  assert:
+    that: (migration.exit_codes.values() | first).migrate == 0
+
 - name: Stop a task
   ecs_task:
       operation: stop
@@ -206,9 +238,30 @@ task:
             description: The launch type on which to run your task.
             returned: always
             type: str
+exit_codes:
+    description: Exit code of every container of every waited on task, keyed by task ARN then container name
+    returned: when I(wait) is set
+    type: dict
+    sample:
+        "arn:aws:ecs:us-west-2:172139249013:task/3f8353d1-29a8-4689-bbf6-ad79937ffe8a":
+            migrate: 0
+stopped_reasons:
+    description: Why each stopped task stopped, keyed by task ARN
+    returned: when I(wait) is set and tasks stopped
+    type: dict
+    sample:
+        "arn:aws:ecs:us-west-2:172139249013:task/3f8353d1-29a8-4689-bbf6-ad79937ffe8a": "Essential container in task exited"
+failures:
+    description: Failures reported by RunTask, for example when no container instance had room for a task
+    returned: when I(operation=run) and some tasks could not be placed
+    type: list
 '''
 
+import time
+
+from ansible.module_utils._text import to_native
 from ansible.module_utils.aws.core import AnsibleAWSModule
+from ansible.module_utils.aws.concurrency import chunks, run_concurrently
 from ansible.module_utils.ec2 import ec2_argument_spec, get_ec2_security_group_ids_from_names
 import ansible.module_utils.ec2 as ec2
 
@@ -218,6 +271,16 @@ except ImportError:
     pass  # handled by AnsibleAWSModule
 
 
+# API limits: tasks started by one RunTask call, tasks described by one DescribeTasks call
+RUN_TASK_MAX_COUNT = 10
+DESCRIBE_TASKS_MAX = 100
+
+
+def task_family(task_definition):
+    """'arn:aws:ecs:...:task-definition/family:3' or 'family:3' to 'family', as list_tasks wants"""
+    return task_definition.split('/')[-1].split(':')[0]
+
+
 class EcsExecManager:
     """Handles ECS Tasks"""
 
@@ -245,34 +308,65 @@ class EcsExecManager:
         return dict(awsvpcConfiguration=result)
 
     @ec2.AWSRetry.backoff()
-    def list_tasks(self, cluster_name, service_name, status):
-        response = self.ecs.list_tasks(
-            cluster=cluster_name,
-            family=service_name,
-            desiredStatus=status
-        )
-        if len(response['taskArns']) > 0:
-            for c in response['taskArns']:
-                if c.endswith(service_name):
-                    return c
-        return None
+    def list_tasks_page(self, params):
+        return self.ecs.list_tasks(**params)
+
+    def task_index(self, cluster_name, task_definition, status):
+        """Every task of the task definition's family with the given desired status, all pages of it
+
+        Tasks are indexed by ARN and by task id so lookups don't scan.
+        """
+        params = dict(desiredStatus=status)
+        if cluster_name:
+            params['cluster'] = cluster_name
+        if task_definition:
+            params['family'] = task_family(task_definition)
+        index = dict()
+        while True:
+            response = self.list_tasks_page(params)
+            for arn in response['taskArns']:
+                index[arn] = arn
+                index[arn.split('/')[-1]] = arn
+            if not response.get('nextToken'):
+                return index
+            params['nextToken'] = response['nextToken']
+
+    def list_tasks(self, cluster_name, task_definition, status, task):
+        """Return the ARN of task (an ARN or a task id) if it is one of the family's tasks with this status"""
+        if not task:
+            return None
+        index = self.task_index(cluster_name, task_definition, status)
+        return index.get(task) or index.get(task.split('/')[-1])
 
     @ec2.AWSRetry.backoff()
+    def run_task_chunk(self, params):
+        return self.ecs.run_task(**params)
+
     def run_task(self, cluster, task_definition, overrides, count, startedBy, launch_type):
+        """Start count tasks with concurrent RunTask calls of at most RUN_TASK_MAX_COUNT tasks each"""
         if overrides is None:
             overrides = dict()
         params = dict(cluster=cluster, taskDefinition=task_definition,
-                      overrides=overrides, count=count, startedBy=startedBy)
+                      overrides=overrides, startedBy=startedBy)
         if self.module.params['network_configuration']:
             params['networkConfiguration'] = self.format_network_configuration(self.module.params['network_configuration'])
         if launch_type:
             params['launchType'] = launch_type
-        try:
-            response = self.ecs.run_task(**params)
-        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
-            self.module.fail_json_aws(e, msg="Couldn't run task")
+
+        counts = [len(c) for c in chunks(range(count or 1), RUN_TASK_MAX_COUNT)]
+        tasks, failures, errors = [], [], []
+        for response, error in run_concurrently(lambda n: self.run_task_chunk(dict(params, count=n)), counts, len(counts)):
+            if error is not None:
+                errors.append(error)
+                continue
+            tasks.extend(response['tasks'])
+            failures.extend(response.get('failures', []))
+        if errors:
+            # report every task that did start, whichever calls failed
+            self.module.fail_json_aws(errors[0], msg="Couldn't run all tasks, %d were started" % len(tasks),
+                                      task=tasks, failures=failures, errors=[to_native(e) for e in errors])
         # include tasks and failures
-        return response['tasks']
+        return tasks, failures
 
     @ec2.AWSRetry.backoff()
     def start_task(self, cluster, task_definition, overrides, container_instances, startedBy):
@@ -301,6 +395,60 @@ class EcsExecManager:
         response = self.ecs.stop_task(cluster=cluster, task=task)
         return response['task']
 
+    @ec2.AWSRetry.backoff()
+    def describe_tasks_chunk(self, cluster, task_arns):
+        args = dict(tasks=task_arns)
+        if cluster:
+            args['cluster'] = cluster
+        return self.ecs.describe_tasks(**args)
+
+    def describe_tasks(self, cluster, task_arns):
+        """Describe tasks DESCRIBE_TASKS_MAX at a time, returning a dict keyed by ARN"""
+        tasks = dict()
+        for chunk in chunks(task_arns, DESCRIBE_TASKS_MAX):
+            for task in self.describe_tasks_chunk(cluster, chunk)['tasks']:
+                tasks[task['taskArn']] = task
+        return tasks
+
+    def wait_for_tasks(self, cluster, task_arns, target, timeout, min_delay=6, max_delay=60):
+        """Poll the tasks until every one of them is 'running' or 'stopped'
+
+        Only the tasks still pending are described on each round. The poll
+        interval grows while no task changes status and drops back as soon as
+        one does. Returns the last description of every task.
+        """
+        target_status = target.upper()
+        deadline = time.time() + timeout
+        pending = list(task_arns)
+        tasks = dict()
+        last_status = dict()
+        delay = min_delay
+        while True:
+            try:
+                tasks.update(self.describe_tasks(cluster, pending))
+            except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+                self.module.fail_json_aws(e, msg="Couldn't describe tasks")
+            moved = False
+            for arn in list(pending):
+                task = tasks.get(arn)
+                if task is None:
+                    continue
+                if last_status.get(arn) != task['lastStatus']:
+                    moved = True
+                    last_status[arn] = task['lastStatus']
+                if task['lastStatus'] == target_status:
+                    pending.remove(arn)
+                elif task['lastStatus'] == 'STOPPED':
+                    self.module.fail_json(msg="Task %s stopped before it was running: %s" % (arn, task.get('stoppedReason', '')),
+                                          task=list(tasks.values()))
+            if not pending:
+                return [tasks[arn] for arn in task_arns]
+            delay = min_delay if moved else min(delay * 1.5, max_delay)
+            if time.time() + delay > deadline:
+                self.module.fail_json(msg="Timed out waiting for tasks %s to be %s" % (', '.join(pending), target),
+                                      task=list(tasks.values()))
+            time.sleep(delay)
+
     def ecs_api_handles_launch_type(self):
         from distutils.version import LooseVersion
         # There doesn't seem to be a nice way to inspect botocore to look
@@ -328,7 +476,9 @@ def main():
         container_instances=dict(required=False, type='list'),  # S*
         started_by=dict(required=False, type='str'),  # R S
         network_configuration=dict(required=False, type='dict'),
-        launch_type=dict(required=False, choices=['EC2', 'FARGATE'])
+        launch_type=dict(required=False, choices=['EC2', 'FARGATE']),
+        wait=dict(required=False, choices=['running', 'stopped']),
+        wait_timeout=dict(required=False, default=600, type='int'),
     ))
 
     module = AnsibleAWSModule(argument_spec=argument_spec, supports_check_mode=True,
@@ -338,7 +488,7 @@ def main():
     if module.params['operation'] == 'run':
         if 'task_definition' not in module.params and module.params['task_definition'] is None:
             module.fail_json(msg="To run a task, a task_definition must be specified")
-        task_to_list = module.params['task_definition']
+        task_to_list = None
         status_type = "RUNNING"
 
     if module.params['operation'] == 'start':
@@ -354,7 +504,7 @@ def main():
             module.fail_json(msg="To stop a task, a task must be specified")
         if 'task_definition' not in module.params and module.params['task_definition'] is None:
             module.fail_json(msg="To stop a task, a task definition must be specified")
-        task_to_list = module.params['task_definition']
+        task_to_list = module.params['task']
         status_type = "STOPPED"
 
     service_mgr = EcsExecManager(module)
@@ -365,7 +515,7 @@ def main():
     if module.params['launch_type'] and not service_mgr.ecs_api_handles_launch_type():
         module.fail_json(msg='botocore needs to be version 1.8.4 or higher to use launch type')
 
-    existing = service_mgr.list_tasks(module.params['cluster'], task_to_list, status_type)
+    existing = service_mgr.list_tasks(module.params['cluster'], module.params['task_definition'], status_type, task_to_list)
 
     results = dict(changed=False)
     if module.params['operation'] == 'run':
@@ -374,13 +524,15 @@ def main():
             results['task'] = existing
         else:
             if not module.check_mode:
-                results['task'] = service_mgr.run_task(
+                results['task'], failures = service_mgr.run_task(
                     module.params['cluster'],
                     module.params['task_definition'],
                     module.params['overrides'],
                     module.params['count'],
                     module.params['started_by'],
                     module.params['launch_type'])
+                if failures:
+                    results['failures'] = failures
             results['changed'] = True
 
     elif module.params['operation'] == 'start':
@@ -411,6 +563,17 @@ def main():
                 )
             results['changed'] = True
 
+    if module.params['wait'] and results.get('task') and not module.check_mode:
+        waited = results['task'] if isinstance(results['task'], list) else [results['task']]
+        task_arns = [t['taskArn'] if isinstance(t, dict) else t for t in waited]
+        tasks = service_mgr.wait_for_tasks(module.params['cluster'], task_arns, module.params['wait'], module.params['wait_timeout'])
+        results['task'] = tasks
+        results['exit_codes'] = dict((t['taskArn'], dict((c['name'], c.get('exitCode')) for c in t.get('containers', [])))
+                                     for t in tasks)
+        stopped_reasons = dict((t['taskArn'], t['stoppedReason']) for t in tasks if t.get('stoppedReason'))
+        if stopped_reasons:
+            results['stopped_reasons'] = stopped_reasons
+
     module.exit_json(**results)
 
 
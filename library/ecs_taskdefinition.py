@@ -108,6 +108,16 @@ options:
         required: false
         version_added: 2.7
         type: str
+    revision_cache:
+        description:
+            - Directory in which to keep the task definitions this module has described, keyed by ARN.
+            - A registered revision never changes apart from its status, so later runs can match
+              against cached revisions instead of describing them again.
+            - The fingerprint of every revision matched or registered is recorded too, so a later run
+              with the same definition confirms the recorded revision with a single describe call.
+        required: false
+        version_added: 2.8
+        type: path
 extends_documentation_fragment:
     - aws
     - ec2
@@ -225,7 +235,99 @@ except ImportError:
 from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.ec2 import boto3_conn, camel_dict_to_snake_dict, ec2_argument_spec, get_aws_connection_info
 from ansible.module_utils._text import to_text
+from ansible.module_utils.aws.cache import cache_file, load_cache, save_cache
 import ansible.module_utils.ec2 as ec2
+import hashlib
+import json
+
+# Lists whose order ECS doesn't preserve or doesn't care about. Everything
+# else (command, entryPoint, dnsServers...) is compared in order.
+UNORDERED_LISTS = frozenset([
+    'containerDefinitions', 'volumes', 'environment', 'secrets', 'portMappings', 'mountPoints',
+    'volumesFrom', 'ulimits', 'extraHosts', 'links', 'systemControls', 'dependsOn',
+    'resourceRequirements', 'requiresCompatibilities', 'placementConstraints',
+])
+
+
+def arn_family_revision(arn):
+    """Split 'arn:aws:ecs:region:account:task-definition/family:revision' into (family, revision)"""
+    family, revision = arn.split('/', 1)[-1].rsplit(':', 1)
+    return family, int(revision)
+
+
+def _sort_key(value):
+    return json.dumps(value, sort_keys=True)
+
+
+def _canonical(value, key=None):
+    """Drop empty values, which ECS treats as unset, and sort the lists in UNORDERED_LISTS"""
+    if isinstance(value, dict):
+        result = {}
+        for k, v in value.items():
+            v = _canonical(v, k)
+            if v:
+                result[k] = v
+        return result
+    if isinstance(value, list):
+        items = [_canonical(v) for v in value]
+        items = [v for v in items if v]
+        if key in UNORDERED_LISTS:
+            items.sort(key=_sort_key)
+        return items
+    return value
+
+
+def _to_mib(value, unit):
+    """ECS accepts '1 vCPU' and '1GB' but always reports cpu units and MiB"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.lower().endswith(unit.lower()):
+        return str(int(float(value[:-len(unit)].strip()) * 1024))
+    return value
+
+
+def _canonical_container(container, network_mode):
+    container = dict(container)
+    for param in ('memory', 'cpu', 'memoryReservation'):
+        if container.get(param) is not None:
+            container[param] = int(container[param])
+    container.setdefault('essential', True)
+    port_mappings = []
+    for port_mapping in container.get('portMappings') or []:
+        port_mapping = dict(port_mapping)
+        for port in ('hostPort', 'containerPort'):
+            if port_mapping.get(port) is not None:
+                port_mapping[port] = int(port_mapping[port])
+        port_mapping.setdefault('protocol', 'tcp')
+        if network_mode in ('awsvpc', 'host') and 'containerPort' in port_mapping:
+            port_mapping.setdefault('hostPort', port_mapping['containerPort'])
+        port_mappings.append(port_mapping)
+    container['portMappings'] = port_mappings
+    container['environment'] = [dict(e, value=to_text(e.get('value'))) for e in container.get('environment') or []]
+    return container
+
+
+def task_definition_fingerprint(task_definition):
+    """Hash of everything this module controls in a task definition
+
+    Takes a describe_task_definition result or the same shape built from the
+    module parameters. Container, volume, environment and port mapping order
+    doesn't matter, so matching a candidate revision is one comparison.
+    """
+    network_mode = task_definition.get('networkMode') or 'bridge'
+    canonical = _canonical(dict(
+        taskRoleArn=task_definition.get('taskRoleArn'),
+        executionRoleArn=task_definition.get('executionRoleArn'),
+        networkMode=network_mode,
+        cpu=_to_mib(task_definition.get('cpu'), 'vCPU'),
+        memory=_to_mib(task_definition.get('memory'), 'GB'),
+        requiresCompatibilities=task_definition.get('requiresCompatibilities'),
+        volumes=task_definition.get('volumes'),
+        containerDefinitions=[_canonical_container(c, network_mode) for c in task_definition.get('containerDefinitions') or []],
+    ))
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode('utf-8')).hexdigest()
+
 
 class EcsTaskManager:
     """Handles ECS Tasks"""
@@ -235,6 +337,10 @@ class EcsTaskManager:
 
         region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
         self.ecs = boto3_conn(module, conn_type='client', resource='ecs', region=region, endpoint=ec2_url, **aws_connect_kwargs)
+        self.revision_cache_path = None
+        self.revisions = {}
+        self.fingerprints = {}
+        self.revisions_changed = False
 
     @ec2.AWSRetry.backoff()
     def describe_task(self, task_name):
@@ -290,37 +396,95 @@ class EcsTaskManager:
         return response['taskDefinition']
 
     @ec2.AWSRetry.backoff()
-    def describe_task_definitions(self, family):
-        data = {
-            "taskDefinitionArns": [],
-            "nextToken": None
-        }
-
-        def fetch():
-            # Boto3 is weird about params passed, so only pass nextToken if we have a value
-            params = {
-                'familyPrefix': family
-            }
-
-            if data['nextToken']:
-                params['nextToken'] = data['nextToken']
-
-            result = self.ecs.list_task_definitions(**params)
-            data['taskDefinitionArns'] += result['taskDefinitionArns']
-            data['nextToken'] = result.get('nextToken', None)
-            return data['nextToken'] is not None
-
-        # Fetch all the arns, possibly across multiple pages
-        while fetch():
-            pass
-
-        # Return the full descriptions of the task definitions, sorted ascending by revision
-        return list(
-            sorted(
-                [self.ecs.describe_task_definition(taskDefinition=arn)['taskDefinition'] for arn in data['taskDefinitionArns']],
-                key=lambda td: td['revision']
-            )
-        )
+    def list_task_definitions_page(self, params):
+        return self.ecs.list_task_definitions(**params)
+
+    def list_task_definition_arns(self, family, status='ACTIVE'):
+        """Yield the ARNs of a family's revisions a page at a time, newest first
+
+        familyPrefix also matches longer family names, so those are skipped.
+        """
+        params = dict(familyPrefix=family, status=status, sort='DESC')
+        while True:
+            result = self.list_task_definitions_page(params)
+            for arn in result['taskDefinitionArns']:
+                if arn_family_revision(arn)[0] == family:
+                    yield arn
+            if not result.get('nextToken'):
+                return
+            params['nextToken'] = result['nextToken']
+
+    def latest_revision(self, family):
+        """Highest revision number registered in the family, active or not, 0 if there is none"""
+        latest = 0
+        for status in ('ACTIVE', 'INACTIVE'):
+            for arn in self.list_task_definition_arns(family, status):
+                latest = max(latest, arn_family_revision(arn)[1])
+                break
+        return latest
+
+    def load_revision_cache(self, directory, family):
+        # ARNs are only valid in their own account and region
+        region, ec2_url, aws_connect_kwargs = get_aws_connection_info(self.module, boto3=True)
+        sts = boto3_conn(self.module, conn_type='client', resource='sts', region=region, **aws_connect_kwargs)
+        try:
+            account = sts.get_caller_identity()['Account']
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            self.module.fail_json_aws(e, msg="Couldn't get the account id for the revision cache")
+        self.revision_cache_path = cache_file(directory, 'ecs-taskdefinitions', account, region, family)
+        cached = load_cache(self.revision_cache_path) or {}
+        self.revisions = cached.get('revisions', {})
+        self.fingerprints = cached.get('fingerprints', {})
+
+    def save_revision_cache(self):
+        if self.revision_cache_path and self.revisions_changed:
+            save_cache(self.revision_cache_path, dict(revisions=self.revisions, fingerprints=self.fingerprints))
+
+    def remember_fingerprint(self, fingerprint, task_definition):
+        arn = task_definition['taskDefinitionArn']
+        if self.fingerprints.get(fingerprint) != arn:
+            self.fingerprints[fingerprint] = arn
+            self.revisions[arn] = task_definition
+            self.revisions_changed = True
+
+    def find_by_fingerprint(self, family, fingerprint):
+        """Return the newest ACTIVE task definition of family with this fingerprint, or None
+
+        A revision recorded for the fingerprint in the revision cache only
+        needs one describe to confirm it is still active.
+        """
+        arn = self.fingerprints.get(fingerprint)
+        if arn:
+            task_definition = self.describe_task(arn)
+            if task_definition and task_definition['status'] == 'ACTIVE':
+                return task_definition
+            del self.fingerprints[fingerprint]
+            self.revisions_changed = True
+
+        for task_definition in self.active_task_definitions(family):
+            if task_definition_fingerprint(task_definition) == fingerprint:
+                self.remember_fingerprint(fingerprint, task_definition)
+                return task_definition
+        return None
+
+    def describe_revision(self, arn):
+        """Describe one revision, from the revision cache when possible"""
+        if arn not in self.revisions:
+            task_definition = self.describe_task(arn)
+            if not task_definition:
+                return None
+            self.revisions[arn] = task_definition
+            self.revisions_changed = True
+        return self.revisions[arn]
+
+    def active_task_definitions(self, family):
+        """Yield the family's ACTIVE task definitions newest first, describing each only when it is reached"""
+        for arn in self.list_task_definition_arns(family, 'ACTIVE'):
+            task_definition = self.describe_revision(arn)
+            if task_definition:
+                # status is the only thing that changes after registration, and the listing says it's active
+                task_definition['status'] = 'ACTIVE'
+                yield task_definition
 
     @ec2.AWSRetry.backoff()
     def deregister_task(self, taskArn):
@@ -343,7 +507,8 @@ def main():
         volumes=dict(required=False, type='list'),
         launch_type=dict(required=False, choices=['EC2', 'FARGATE']),
         cpu=dict(),
-        memory=dict(required=False, type='str')
+        memory=dict(required=False, type='str'),
+        revision_cache=dict(required=False, type='path'),
     ))
 
     module = AnsibleAWSModule(argument_spec=argument_spec,
@@ -384,106 +549,38 @@ def main():
             module.fail_json(msg="To use FARGATE launch type, network_mode must be awsvpc")
 
         family = module.params['family']
-        existing_definitions_in_family = task_mgr.describe_task_definitions(module.params['family'])
+        if module.params['revision_cache']:
+            task_mgr.load_revision_cache(module.params['revision_cache'], family)
+        requested_fingerprint = task_definition_fingerprint(dict(
+            taskRoleArn=module.params['task_role_arn'],
+            executionRoleArn=module.params['execution_role_arn'],
+            networkMode=network_mode,
+            cpu=module.params['cpu'],
+            memory=module.params['memory'],
+            requiresCompatibilities=[launch_type] if launch_type else None,
+            volumes=module.params['volumes'],
+            containerDefinitions=module.params['containers'],
+        ))
 
         if 'revision' in module.params and module.params['revision']:
             # The definition specifies revision. We must guarantee that an active revision of that number will result from this.
             revision = int(module.params['revision'])
 
             # A revision has been explicitly specified. Attempt to locate a matching revision
-            tasks_defs_for_revision = [td for td in existing_definitions_in_family if td['revision'] == revision]
-            existing = tasks_defs_for_revision[0] if len(tasks_defs_for_revision) > 0 else None
+            existing = task_mgr.describe_task("%s:%d" % (family, revision))
 
             if existing and existing['status'] != "ACTIVE":
                 # We cannot reactivate an inactive revision
                 module.fail_json(msg="A task in family '%s' already exists for revision %d, but it is inactive" % (family, revision))
             elif not existing:
-                if not existing_definitions_in_family and revision != 1:
-                    module.fail_json(msg="You have specified a revision of %d but a created revision would be 1" % revision)
-                elif existing_definitions_in_family and existing_definitions_in_family[-1]['revision'] + 1 != revision:
+                next_revision = task_mgr.latest_revision(family) + 1
+                if next_revision != revision:
                     module.fail_json(msg="You have specified a revision of %d but a created revision would be %d" %
-                                         (revision, existing_definitions_in_family[-1]['revision'] + 1))
+                                         (revision, next_revision))
         else:
-            existing = None
-
-            def _right_has_values_of_left(left, right):
-                # Make sure the values are equivalent for everything left has
-                for k, v in left.items():
-                    if not ((not v and (k not in right or not right[k])) or (k in right and v == right[k])):
-                        # We don't care about list ordering because ECS can change things
-                        if isinstance(v, list) and k in right:
-                            left_list = v
-                            right_list = right[k] or []
-
-                            if len(left_list) != len(right_list):
-                                return False
-
-                            for list_val in left_list:
-                                if list_val not in right_list:
-                                    return False
-                        else:
-                            return False
-
-                # Make sure right doesn't have anything that left doesn't
-                for k, v in right.items():
-                    if v and k not in left:
-                        return False
-
-                return True
-
-            def _task_definition_matches(requested_volumes, requested_containers, requested_task_role_arn, existing_task_definition):
-                if td['status'] != "ACTIVE":
-                    return None
-
-                if requested_task_role_arn != td.get('taskRoleArn', ""):
-                    return None
-
-                existing_volumes = td.get('volumes', []) or []
-
-                if len(requested_volumes) != len(existing_volumes):
-                    # Nope.
-                    return None
-
-                if len(requested_volumes) > 0:
-                    for requested_vol in requested_volumes:
-                        found = False
-
-                        for actual_vol in existing_volumes:
-                            if _right_has_values_of_left(requested_vol, actual_vol):
-                                found = True
-                                break
-
-                        if not found:
-                            return None
-
-                existing_containers = td.get('containerDefinitions', []) or []
-
-                if len(requested_containers) != len(existing_containers):
-                    # Nope.
-                    return None
-
-                for requested_container in requested_containers:
-                    found = False
-
-                    for actual_container in existing_containers:
-                        if _right_has_values_of_left(requested_container, actual_container):
-                            found = True
-                            break
-
-                    if not found:
-                        return None
-
-                return existing_task_definition
-
-            # No revision explicitly specified. Attempt to find an active, matching revision that has all the properties requested
-            for td in existing_definitions_in_family:
-                requested_volumes = module.params['volumes'] or []
-                requested_containers = module.params['containers'] or []
-                requested_task_role_arn = module.params['task_role_arn']
-                existing = _task_definition_matches(requested_volumes, requested_containers, requested_task_role_arn, td)
-
-                if existing:
-                    break
+            # No revision explicitly specified. Attempt to find an active, matching revision that has all the properties requested,
+            # walking the family newest first and describing revisions only until one matches
+            existing = task_mgr.find_by_fingerprint(family, requested_fingerprint)
 
         if existing and not module.params.get('force_create'):
             # Awesome. Have an existing one. Nothing to do.
@@ -501,7 +598,9 @@ def main():
                                                                    module.params['launch_type'],
                                                                    module.params['cpu'],
                                                                    module.params['memory'])
+                task_mgr.remember_fingerprint(requested_fingerprint, results['taskdefinition'])
             results['changed'] = True
+        task_mgr.save_revision_cache()
 
     elif module.params['state'] == 'absent':
         # When de-registering a task definition, we can specify the ARN OR the family and revision.
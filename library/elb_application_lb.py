@@ -180,6 +180,14 @@ options:
     default: yes
     type: bool
     version_added: 2.7
+  max_concurrency:
+    description:
+      - How many listeners have their rules described at the same time.
+      - The load balancer, its listeners and their rules are described once per run. After a change
+        only the parts it touched are described again, and the result is built from what was described.
+    default: 4
+    type: int
+    version_added: "2.8"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -461,16 +469,88 @@ vpc_id:
     sample: vpc-0011223344
 '''
 
+try:
+    from botocore.exceptions import BotoCoreError, ClientError
+except ImportError:
+    pass  # handled by AnsibleAWSModule
+
 from ansible.module_utils.aws.core import AnsibleAWSModule
-from ansible.module_utils.ec2 import camel_dict_to_snake_dict, boto3_tag_list_to_ansible_dict, compare_aws_tags
+from ansible.module_utils.aws.concurrency import run_concurrently
+from ansible.module_utils.ec2 import AWSRetry, camel_dict_to_snake_dict, boto3_tag_list_to_ansible_dict, compare_aws_tags
 
 from ansible.module_utils.aws.elbv2 import ApplicationLoadBalancer, ELBListeners, ELBListener, ELBListenerRules, ELBListenerRule
-from ansible.module_utils.aws.elb_utils import get_elb_listener_rules
+
+
+@AWSRetry.jittered_backoff()
+def describe_listeners_with_backoff(connection, elb_arn):
+    paginator = connection.get_paginator('describe_listeners')
+    return paginator.paginate(LoadBalancerArn=elb_arn).build_full_result()['Listeners']
+
+
+@AWSRetry.jittered_backoff()
+def describe_rules_with_backoff(connection, listener_arn):
+    return connection.describe_rules(ListenerArn=listener_arn)['Rules']
+
+
+class AlbSnapshot(object):
+    """The listeners of a load balancer and their rules, described once per run
+
+    The rules of all listeners are described at the same time. Changes
+    invalidate only the listeners or rules they touched, and those are
+    described again the next time they are read.
+    """
+
+    def __init__(self, elb_obj):
+        self.connection = elb_obj.connection
+        self.module = elb_obj.module
+        self.elb_obj = elb_obj
+        self._listeners = None
+        self._rules = dict()
+
+    @property
+    def listeners(self):
+        if self._listeners is None:
+            try:
+                self._listeners = describe_listeners_with_backoff(self.connection, self.elb_obj.elb['LoadBalancerArn'])
+            except (BotoCoreError, ClientError) as e:
+                self.module.fail_json_aws(e, msg="Couldn't describe listeners")
+        return self._listeners
+
+    def listener(self, port):
+        for listener in self.listeners:
+            if listener['Port'] == int(port):
+                return listener
+        return {}
+
+    def rules(self, listener_arn):
+        if listener_arn not in self._rules:
+            self.describe_rules()
+        return self._rules[listener_arn]
+
+    def describe_rules(self):
+        """Describe the rules of every listener whose rules aren't known"""
+        listener_arns = [listener['ListenerArn'] for listener in self.listeners if listener['ListenerArn'] not in self._rules]
+        outcomes = run_concurrently(lambda arn: describe_rules_with_backoff(self.connection, arn),
+                                    listener_arns, self.module.params.get('max_concurrency') or 1)
+        for listener_arn, (rules, error) in zip(listener_arns, outcomes):
+            if error is not None:
+                if isinstance(error, (BotoCoreError, ClientError)):
+                    self.module.fail_json_aws(error, msg="Couldn't describe rules of listener {0}".format(listener_arn))
+                raise error
+            self._rules[listener_arn] = rules
+
+    def invalidate_listeners(self):
+        self._listeners = None
+
+    def invalidate_rules(self, listener_arn):
+        self._rules.pop(listener_arn, None)
 
 
 def create_or_update_elb(elb_obj):
     """Create ELB or modify main attributes. json_exit here"""
 
+    snapshot = AlbSnapshot(elb_obj)
+
     if elb_obj.elb:
         # ELB exists so check subnets, security groups and tags match what has been passed
 
@@ -499,12 +579,20 @@ def create_or_update_elb(elb_obj):
         # Create load balancer
         elb_obj.create_elb()
 
-    # ELB attributes
-    elb_obj.update_elb_attributes()
+    # Only describe the ELB again if it was created or changed
+    elb_stale = elb_obj.changed
+
+    # ELB attributes - a new ELB has none described yet
+    if elb_obj.elb_attributes is None:
+        elb_obj.update_elb_attributes()
+    changed, elb_obj.changed = elb_obj.changed, False
     elb_obj.modify_elb_attributes()
+    attributes_stale = elb_obj.changed
+    elb_obj.changed = changed or elb_obj.changed
 
     # Listeners
-    listeners_obj = ELBListeners(elb_obj.connection, elb_obj.module, elb_obj.elb['LoadBalancerArn'])
+    listeners_obj = ELBListeners(elb_obj.connection, elb_obj.module, elb_obj.elb['LoadBalancerArn'],
+                                 current_listeners=snapshot.listeners)
 
     listeners_to_add, listeners_to_modify, listeners_to_delete = listeners_obj.compare_listeners()
 
@@ -525,17 +613,25 @@ def create_or_update_elb(elb_obj):
         listener_obj = ELBListener(elb_obj.connection, elb_obj.module, listener_to_modify, elb_obj.elb['LoadBalancerArn'])
         listener_obj.modify()
         listeners_obj.changed = True
+        # new default actions mean a new default rule
+        snapshot.invalidate_rules(listener_to_modify['ListenerArn'])
 
     # If listeners changed, mark ELB as changed
     if listeners_obj.changed:
         elb_obj.changed = True
+        snapshot.invalidate_listeners()
 
-    # Rules of each listener
+    # Rules of each listener, described for all listeners at once
+    snapshot.describe_rules()
     for listener in listeners_obj.listeners:
         if 'Rules' in listener:
-            rules_obj = ELBListenerRules(elb_obj.connection, elb_obj.module, elb_obj.elb['LoadBalancerArn'], listener['Rules'], listener['Port'])
+            current_listener = snapshot.listener(listener['Port'])
+            rules_obj = ELBListenerRules(elb_obj.connection, elb_obj.module, elb_obj.elb['LoadBalancerArn'], listener['Rules'], listener['Port'],
+                                         current_listener=current_listener, current_rules=snapshot.rules(current_listener['ListenerArn']))
 
-            rules_to_add, rules_to_modify, rules_to_delete = rules_obj.compare_rules()
+            rules_to_add, rules_to_modify, rules_to_delete = rules_obj.compare_rules(elb_obj.module.params['purge_rules'])
+            if rules_to_add or rules_to_modify or rules_obj.rules_to_reorder or (rules_to_delete and elb_obj.module.params['purge_rules']):
+                snapshot.invalidate_rules(rules_obj.listener_arn)
 
             # Delete rules
             if elb_obj.module.params['purge_rules']:
@@ -544,6 +640,11 @@ def create_or_update_elb(elb_obj):
                     rule_obj.delete()
                     elb_obj.changed = True
 
+            # Move rules that only changed priority, all in one call
+            if rules_obj.rules_to_reorder:
+                rules_obj.set_rule_priorities()
+                elb_obj.changed = True
+
             # Add rules
             for rule in rules_to_add:
                 rule_obj = ELBListenerRule(elb_obj.connection, elb_obj.module, rule, rules_obj.listener_arn)
@@ -556,22 +657,23 @@ def create_or_update_elb(elb_obj):
                 rule_obj.modify()
                 elb_obj.changed = True
 
-    # Get the ELB again
-    elb_obj.update()
+    # Get the ELB again if it changed
+    if elb_stale:
+        elb_obj.update()
 
-    # Get the ELB listeners again
-    listeners_obj.update()
+    # Update the ELB attributes if they changed
+    if attributes_stale:
+        elb_obj.update_elb_attributes()
 
-    # Update the ELB attributes
-    elb_obj.update_elb_attributes()
+    # Describe the rules that changed again
+    snapshot.describe_rules()
 
     # Convert to snake_case and merge in everything we want to return to the user
     snaked_elb = camel_dict_to_snake_dict(elb_obj.elb)
     snaked_elb.update(camel_dict_to_snake_dict(elb_obj.elb_attributes))
     snaked_elb['listeners'] = []
-    for listener in listeners_obj.current_listeners:
-        # For each listener, get listener rules
-        listener['rules'] = get_elb_listener_rules(elb_obj.connection, elb_obj.module, listener['ListenerArn'])
+    for listener in snapshot.listeners:
+        listener = dict(listener, rules=snapshot.rules(listener['ListenerArn']))
         snaked_elb['listeners'].append(camel_dict_to_snake_dict(listener))
 
     # Change tags to ansible friendly dict
@@ -618,7 +720,8 @@ def main():
         tags=dict(type='dict'),
         wait_timeout=dict(type='int'),
         wait=dict(default=False, type='bool'),
-        purge_rules=dict(default=True, type='bool')
+        purge_rules=dict(default=True, type='bool'),
+        max_concurrency=dict(default=4, type='int')
     )
 
     module = AnsibleAWSModule(argument_spec=argument_spec,
@@ -31,6 +31,25 @@ options:
       - The names of the load balancers.
     required: false
     type: list
+  include:
+    description:
+      - What to gather about each load balancer besides what C(describe_load_balancers) returns.
+      - C(rules) also gathers C(listeners), since rules are described per listener.
+      - Leave out C(listeners) and C(rules) when only the basic facts of many load balancers are needed.
+    required: false
+    type: list
+    choices: [attributes, listeners, rules, tags]
+    default: [attributes, listeners, rules, tags]
+    version_added: "2.8"
+  max_concurrency:
+    description:
+      - How many describe calls are made at the same time.
+      - Attributes and listeners are described per load balancer, rules per listener and
+        tags for 20 load balancers per call.
+    required: false
+    type: int
+    default: 4
+    version_added: "2.8"
 
 extends_documentation_fragment:
     - aws
@@ -54,6 +73,12 @@ EXAMPLES = '''
       - elb1
       - elb2
 
+# Gather only the basic facts of every ALB, without listeners and rules
+- elb_application_lb_info:
+    include:
+      - attributes
+      - tags
+
 # Gather information about specific ALB
 - elb_application_lb_info:
     names: "alb-name"
@@ -173,47 +198,47 @@ except ImportError:
     HAS_BOTO3 = False
 
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.ec2 import (boto3_conn, boto3_tag_list_to_ansible_dict, camel_dict_to_snake_dict,
+from ansible.module_utils.aws.concurrency import chunks, run_concurrently
+from ansible.module_utils.ec2 import (AWSRetry, boto3_conn, boto3_tag_list_to_ansible_dict, camel_dict_to_snake_dict,
                                       ec2_argument_spec, get_aws_connection_info)
 
+DESCRIBE_TAGS_MAX_ARNS = 20
 
-def get_elb_listeners(connection, module, elb_arn):
 
-    try:
-        return connection.describe_listeners(LoadBalancerArn=elb_arn)['Listeners']
-    except ClientError as e:
-        module.fail_json(msg=e.message, exception=traceback.format_exc(), **camel_dict_to_snake_dict(e.response))
+@AWSRetry.jittered_backoff()
+def get_elb_listeners(connection, elb_arn):
+    paginator = connection.get_paginator('describe_listeners')
+    return paginator.paginate(LoadBalancerArn=elb_arn).build_full_result()['Listeners']
 
 
-def get_listener_rules(connection, module, listener_arn):
+@AWSRetry.jittered_backoff()
+def get_listener_rules(connection, listener_arn):
+    return connection.describe_rules(ListenerArn=listener_arn)['Rules']
 
-    try:
-        return connection.describe_rules(ListenerArn=listener_arn)['Rules']
-    except ClientError as e:
-        module.fail_json(msg=e.message, exception=traceback.format_exc(), **camel_dict_to_snake_dict(e.response))
-
-
-def get_load_balancer_attributes(connection, module, load_balancer_arn):
 
-    try:
-        load_balancer_attributes = boto3_tag_list_to_ansible_dict(connection.describe_load_balancer_attributes(LoadBalancerArn=load_balancer_arn)['Attributes'])
-    except ClientError as e:
-        module.fail_json(msg=e.message, exception=traceback.format_exc(), **camel_dict_to_snake_dict(e.response))
+@AWSRetry.jittered_backoff()
+def get_load_balancer_attributes(connection, load_balancer_arn):
+    load_balancer_attributes = boto3_tag_list_to_ansible_dict(connection.describe_load_balancer_attributes(LoadBalancerArn=load_balancer_arn)['Attributes'])
 
     # Replace '.' with '_' in attribute key names to make it more Ansibley
-    for k, v in list(load_balancer_attributes.items()):
-        load_balancer_attributes[k.replace('.', '_')] = v
-        del load_balancer_attributes[k]
+    return dict((k.replace('.', '_'), v) for k, v in load_balancer_attributes.items())
 
-    return load_balancer_attributes
 
+@AWSRetry.jittered_backoff()
+def get_load_balancers_tags(connection, load_balancer_arns):
+    """Tags of up to DESCRIBE_TAGS_MAX_ARNS load balancers, by ARN"""
+    descriptions = connection.describe_tags(ResourceArns=load_balancer_arns)['TagDescriptions']
+    return dict((d['ResourceArn'], boto3_tag_list_to_ansible_dict(d['Tags'])) for d in descriptions)
 
-def get_load_balancer_tags(connection, module, load_balancer_arn):
 
-    try:
-        return boto3_tag_list_to_ansible_dict(connection.describe_tags(ResourceArns=[load_balancer_arn])['TagDescriptions'][0]['Tags'])
-    except ClientError as e:
-        module.fail_json(msg=e.message, exception=traceback.format_exc(), **camel_dict_to_snake_dict(e.response))
+def check_outcomes(module, outcomes):
+    """Fail the module on the first error of a run_concurrently call, else return its results"""
+    for dummy, error in outcomes:
+        if isinstance(error, ClientError):
+            module.fail_json(msg=str(error), **camel_dict_to_snake_dict(error.response))
+        elif error is not None:
+            module.fail_json(msg=str(error))
+    return [result for result, dummy in outcomes]
 
 
 def list_load_balancers(connection, module):
@@ -237,23 +262,44 @@ def list_load_balancers(connection, module):
     except NoCredentialsError as e:
         module.fail_json(msg="AWS authentication problem. " + e.message, exception=traceback.format_exc())
 
-    for load_balancer in load_balancers['LoadBalancers']:
-        # Get the attributes for each elb
-        load_balancer.update(get_load_balancer_attributes(connection, module, load_balancer['LoadBalancerArn']))
-
-        # Get the listeners for each elb
-        load_balancer['listeners'] = get_elb_listeners(connection, module, load_balancer['LoadBalancerArn'])
-
-        # For each listener, get listener rules
-        for listener in load_balancer['listeners']:
-            listener['rules'] = get_listener_rules(connection, module, listener['ListenerArn'])
+    include = set(module.params.get("include") or [])
+    if 'rules' in include:
+        include.add('listeners')
+    max_workers = module.params.get("max_concurrency")
+    load_balancers = load_balancers['LoadBalancers']
+    arns = [load_balancer['LoadBalancerArn'] for load_balancer in load_balancers]
+
+    # Get the attributes for each elb
+    if 'attributes' in include:
+        attributes = check_outcomes(module, run_concurrently(lambda arn: get_load_balancer_attributes(connection, arn), arns, max_workers))
+        for load_balancer, load_balancer_attributes in zip(load_balancers, attributes):
+            load_balancer.update(load_balancer_attributes)
+
+    # Get the listeners for each elb
+    if 'listeners' in include:
+        listeners = check_outcomes(module, run_concurrently(lambda arn: get_elb_listeners(connection, arn), arns, max_workers))
+        for load_balancer, load_balancer_listeners in zip(load_balancers, listeners):
+            load_balancer['listeners'] = load_balancer_listeners
+
+    # For each listener, get listener rules
+    if 'rules' in include:
+        all_listeners = [listener for load_balancer in load_balancers for listener in load_balancer['listeners']]
+        rules = check_outcomes(module, run_concurrently(lambda listener: get_listener_rules(connection, listener['ListenerArn']),
+                                                        all_listeners, max_workers))
+        for listener, listener_rules in zip(all_listeners, rules):
+            listener['rules'] = listener_rules
 
     # Turn the boto3 result in to ansible_friendly_snaked_names
-    snaked_load_balancers = [camel_dict_to_snake_dict(load_balancer) for load_balancer in load_balancers['LoadBalancers']]
+    snaked_load_balancers = [camel_dict_to_snake_dict(load_balancer) for load_balancer in load_balancers]
 
-    # Get tags for each load balancer
-    for snaked_load_balancer in snaked_load_balancers:
-        snaked_load_balancer['tags'] = get_load_balancer_tags(connection, module, snaked_load_balancer['load_balancer_arn'])
+    # Get tags for each load balancer, 20 load balancers per call
+    if 'tags' in include:
+        tags = dict()
+        batches = chunks(arns, DESCRIBE_TAGS_MAX_ARNS)
+        for batch_tags in check_outcomes(module, run_concurrently(lambda batch: get_load_balancers_tags(connection, batch), batches, max_workers)):
+            tags.update(batch_tags)
+        for snaked_load_balancer in snaked_load_balancers:
+            snaked_load_balancer['tags'] = tags.get(snaked_load_balancer['load_balancer_arn'], {})
 
     module.exit_json(load_balancers=snaked_load_balancers)
 
@@ -264,7 +310,10 @@ def main():
     argument_spec.update(
         dict(
             load_balancer_arns=dict(type='list'),
-            names=dict(type='list')
+            names=dict(type='list'),
+            include=dict(type='list', default=['attributes', 'listeners', 'rules', 'tags'],
+                         choices=['attributes', 'listeners', 'rules', 'tags']),
+            max_concurrency=dict(type='int', default=4)
         )
     )
 
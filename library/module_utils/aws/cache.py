@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Small JSON file cache used by modules that want to remember AWS lookups
+# between tasks of the same play. Every module invocation is a new process,
+# so anything worth keeping has to go to disk.
+
+import json
+import os
+import tempfile
+import time
+
+
+def cache_file(directory, *parts):
+    """Build a cache file path from a directory and name parts (eg: service, account)"""
+    directory = os.path.expanduser(directory)
+    name = '-'.join(str(p).replace(os.sep, '_') for p in parts if p)
+    return os.path.join(directory, name + '.json')
+
+
+def load_cache(path, max_age=None):
+    """Return the data stored at path, or None if it is missing, unreadable or older than max_age seconds"""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+    if max_age is not None and time.time() - cached.get('timestamp', 0) > max_age:
+        return None
+    return cached.get('data')
+
+
+def save_cache(path, data):
+    """Atomically replace the cache at path, so concurrent readers never see half a file"""
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory)
+    except OSError:
+        if not os.path.isdir(directory):
+            raise
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(dict(timestamp=time.time(), data=data), f, default=str)
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
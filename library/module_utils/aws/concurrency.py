@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Helpers for modules that make many independent AWS calls in one run.
+# boto3 clients are thread safe, so a client can be shared by the workers;
+# sessions and resources are not and must not be.
+
+import threading
+import time
+
+try:
+    from concurrent.futures import ThreadPoolExecutor
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
+
+class RateLimiter(object):
+    """Token bucket shared by worker threads to stay under an API's request rate
+
+    acquire() blocks until a request may be sent. Pair it with AWSRetry so
+    the occasional throttling error that still gets through is retried.
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.time()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.time()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def call(self, func, *args, **kwargs):
+        self.acquire()
+        return func(*args, **kwargs)
+
+
+def run_concurrently(func, items, max_workers=4):
+    """Call func(item) for every item on a bounded thread pool
+
+    Returns a list of (result, exception) pairs in the order of items, so one
+    failing item doesn't hide the outcome of the others. Runs serially when
+    concurrent.futures isn't available (python 2 without the futures backport)
+    or when max_workers is 1.
+    """
+    def wrapped(item):
+        try:
+            return func(item), None
+        except Exception as e:
+            return None, e
+
+    items = list(items)
+    if not HAS_FUTURES or max_workers <= 1 or len(items) <= 1:
+        return [wrapped(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(wrapped, items))
+
+
+def chunks(items, size):
+    """Split items into lists of at most size elements"""
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) 2018 Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+# Pagination and lookup helpers shared by the route53_* modules.
+
+try:
+    import botocore
+except ImportError:
+    pass  # it is assumed that calling modules will detect and provide an appropriate nice error.
+
+from ansible.module_utils.ec2 import AWSRetry
+
+
+def strip_zone_id(zone_id):
+    return zone_id.replace('/hostedzone/', '')
+
+
+def normalize_record_name(name):
+    """Lowercase, fully qualified and with wildcards escaped the way Route53 returns them"""
+    name = name.lower().replace('*', '\\052')
+    if not name.endswith('.'):
+        name += '.'
+    return name
+
+
+@AWSRetry.exponential_backoff()
+def list_record_sets_page_with_backoff(client, params):
+    return client.list_resource_record_sets(**params)
+
+
+def iter_record_sets(client, params):
+    """Yield record sets one page at a time, retrying each page separately
+
+    Unlike build_full_result() this never holds more than one page in
+    memory, so callers can filter or stop early on very large zones.
+    """
+    params = dict(params)
+    while True:
+        page = list_record_sets_page_with_backoff(client, params)
+        for record_set in page['ResourceRecordSets']:
+            yield record_set
+        if not page.get('IsTruncated'):
+            return
+        params['StartRecordName'] = page['NextRecordName']
+        params['StartRecordType'] = page['NextRecordType']
+        if page.get('NextRecordIdentifier'):
+            params['StartRecordIdentifier'] = page['NextRecordIdentifier']
+        else:
+            params.pop('StartRecordIdentifier', None)
+
+
+def record_set_values(record_set):
+    if 'AliasTarget' in record_set:
+        return [record_set['AliasTarget']['DNSName']]
+    return [r['Value'] for r in record_set.get('ResourceRecords', [])]
+
+
+def record_set_key(record_set):
+    return (normalize_record_name(record_set['Name']), record_set['Type'], record_set.get('SetIdentifier'))
+
+
+@AWSRetry.exponential_backoff()
+def list_hosted_zones_by_name_with_backoff(client, params):
+    return client.list_hosted_zones_by_name(**params)
+
+
+def hosted_zones_by_name(client, name):
+    """Return every hosted zone called name (a public zone and/or private twins)
+
+    list_hosted_zones_by_name is ordered by name, so this seeks straight to
+    the first candidate rather than listing the whole account.
+    """
+    name = normalize_record_name(name)
+    params = dict(DNSName=name)
+    zones = []
+    while True:
+        page = list_hosted_zones_by_name_with_backoff(client, params)
+        for zone in page['HostedZones']:
+            if zone['Name'] != name:
+                return zones
+            zones.append(zone)
+        if not page.get('IsTruncated'):
+            return zones
+        params = dict(DNSName=page['NextDNSName'], HostedZoneId=page['NextHostedZoneId'])
+
+
+@AWSRetry.exponential_backoff()
+def list_hosted_zones_with_backoff(client):
+    paginator = client.get_paginator('list_hosted_zones')
+    return paginator.paginate().build_full_result()['HostedZones']
+
+
+def index_hosted_zones(zones):
+    """Map zone name to the list of zones with that name"""
+    index = dict()
+    for zone in zones:
+        index.setdefault(zone['Name'], []).append(zone)
+    return index
+
+
+def find_hosted_zone(client, name, private_zone=None):
+    """Return the single hosted zone called name, or None
+
+    private_zone picks between public and private twins; when it is None
+    the first zone found is returned.
+    """
+    for zone in hosted_zones_by_name(client, name):
+        if private_zone is None or zone['Config'].get('PrivateZone', False) == private_zone:
+            return zone
+    return None
@@ -12,9 +12,20 @@ try:
     from botocore.exceptions import BotoCoreError, ClientError
 except ImportError:
     pass
+import json
 import traceback
 from copy import deepcopy
 
+# Where each condition field keeps its values, besides the legacy Values key
+RULE_CONDITION_CONFIGS = {
+    'host-header': 'HostHeaderConfig',
+    'path-pattern': 'PathPatternConfig',
+    'http-header': 'HttpHeaderConfig',
+    'http-request-method': 'HttpRequestMethodConfig',
+    'query-string': 'QueryStringConfig',
+    'source-ip': 'SourceIpConfig',
+}
+
 
 class ElasticLoadBalancerV2(object):
 
@@ -419,7 +430,11 @@ class NetworkLoadBalancer(ElasticLoadBalancerV2):
 
 class ELBListeners(object):
 
-    def __init__(self, connection, module, elb_arn):
+    def __init__(self, connection, module, elb_arn, current_listeners=None):
+        """
+
+        :param current_listeners: the listeners as already described by the caller, to save describing them again
+        """
 
         self.connection = connection
         self.module = module
@@ -429,7 +444,9 @@ class ELBListeners(object):
             # Remove suboption argspec defaults of None from each listener
             listeners = [dict((x, listener_dict[x]) for x in listener_dict if listener_dict[x] is not None) for listener_dict in listeners]
         self.listeners = self._ensure_listeners_default_action_has_arn(listeners)
-        self.current_listeners = self._get_elb_listeners()
+        if current_listeners is None:
+            current_listeners = self._get_elb_listeners()
+        self.current_listeners = current_listeners
         self.purge_listeners = module.params.get("purge_listeners")
         self.changed = False
 
@@ -651,7 +668,12 @@ class ELBListener(object):
 
 class ELBListenerRules(object):
 
-    def __init__(self, connection, module, elb_arn, listener_rules, listener_port):
+    def __init__(self, connection, module, elb_arn, listener_rules, listener_port, current_listener=None, current_rules=None):
+        """
+
+        :param current_listener: the listener on listener_port as already described by the caller, {} if there is none
+        :param current_rules: the rules of current_listener as already described by the caller
+        """
 
         self.connection = connection
         self.module = module
@@ -660,14 +682,19 @@ class ELBListenerRules(object):
         self.changed = False
 
         # Get listener based on port so we can use ARN
-        self.current_listener = get_elb_listener(connection, module, elb_arn, listener_port)
+        if current_listener is None:
+            current_listener = get_elb_listener(connection, module, elb_arn, listener_port)
+        self.current_listener = current_listener
         self.listener_arn = self.current_listener['ListenerArn']
-        self.rules_to_add = deepcopy(self.rules)
+        self.rules_to_add = []
         self.rules_to_modify = []
         self.rules_to_delete = []
+        self.rules_to_reorder = []
 
         # If the listener exists (i.e. has an ARN) get rules for the listener
-        if 'ListenerArn' in self.current_listener:
+        if current_rules is not None:
+            self.current_rules = current_rules
+        elif 'ListenerArn' in self.current_listener:
             self.current_rules = self._get_elb_listener_rules()
         else:
             self.current_rules = []
@@ -701,145 +728,129 @@ class ELBListenerRules(object):
         except (BotoCoreError, ClientError) as e:
             self.module.fail_json_aws(e)
 
-    def _compare_condition(self, current_conditions, condition):
+    def _condition_fingerprint(self, condition):
         """
+        Fingerprint a condition, whichever way its values are given
 
-        :param current_conditions:
-        :param condition:
-        :return:
+        :param condition: a rule condition
+        :return: a string that is the same for conditions matching the same requests
         """
 
-        condition_found = False
-
-        for current_condition in current_conditions:
-            if current_condition.get('SourceIpConfig'):
-                if (current_condition['Field'] == condition['Field'] and
-                        current_condition['SourceIpConfig']['Values'][0] == condition['SourceIpConfig']['Values'][0]):
-                    condition_found = True
-                    break
-            elif current_condition.get('HttpHeaderConfig'):
-                if (current_condition['Field'] == condition['Field'] and current_condition['HttpHeaderConfig']['Values'][0] == condition['HttpHeaderConfig']['Values'][0]):
-                    condition_found = True
-                    break
-            elif current_condition.get('SourceIpConfig'):
-                if (current_condition['Field'] == condition['Field'] and current_condition['SourceIpConfig']['Values'][0] == condition['SourceIpConfig']['Values'][0]):
-                    condition_found = True
-                    break
-            elif current_condition.get('HttpRequestMethodConfig'):
-                if (current_condition['Field'] == condition['Field'] and current_condition['HttpRequestMethodConfig']['Values'][0] == condition['HttpRequestMethodConfig']['Values'][0]):
-                    condition_found = True
-                    break
-            elif current_condition.get('QueryStringConfig'):
-                if (current_condition['Field'] == condition['Field'] and current_condition['QueryStringConfig']['Values'][0]['Value'] == condition['QueryStringConfig']['Values'][0]['Value']):
-                    condition_found = True
-                    break
-            elif current_condition.get('PathPatternConfig'):
-                if (current_condition['Field'] == condition['Field'] and current_condition['PathPatternConfig']['Values'][0] == condition['PathPatternConfig']['Values'][0]):
-                    condition_found = True
-                    break
-            elif current_condition['Field'] == condition['Field'] and sorted(current_condition['Values']) == sorted(condition['Values']):
-                condition_found = True
-                break
-
-        return condition_found
+        config = condition.get(RULE_CONDITION_CONFIGS.get(condition['Field'], '')) or {}
+        values = config.get('Values', condition.get('Values', []))
+        fingerprint = [condition['Field'], sorted(json.dumps(value, sort_keys=True) for value in values)]
+        if 'HttpHeaderName' in config:
+            # header names are case insensitive
+            fingerprint.append(config['HttpHeaderName'].lower())
+        return json.dumps(fingerprint)
 
-    def _compare_rule(self, current_rule, new_rule):
+    def _rule_fingerprint(self, rule):
         """
+        Fingerprint the conditions and actions of a rule, ignoring its priority
 
-        :return:
+        :param rule: a rule dict
+        :return: a string that is the same for rules that route the same requests the same way
         """
 
-        modified_rule = {}
+        conditions = sorted(self._condition_fingerprint(condition) for condition in rule['Conditions'])
+        actions = []
+        for action in sorted(rule['Actions'], key=lambda x: x.get('Order', 0)):
+            action = dict((k, v) for k, v in action.items() if k != 'Order')
+            # the AWS api won't return the client secret, so leave it out of both sides
+            if 'AuthenticateOidcConfig' in action:
+                action['AuthenticateOidcConfig'] = dict((k, v) for k, v in action['AuthenticateOidcConfig'].items() if k != 'ClientSecret')
+            actions.append(action)
+        return json.dumps([conditions, actions], sort_keys=True)
 
-        # Priority
-        if int(current_rule['Priority']) != int(new_rule['Priority']):
-            modified_rule['Priority'] = new_rule['Priority']
+    def compare_rules(self, purge_rules=True):
+        """
+        Compare the rules passed to the module with the current rules of the listener
 
-        # Actions
+        Both are indexed by priority and by fingerprint, so each rule is only looked
+        at a few times. A current rule that matches a passed rule at another priority
+        is moved there with set_rule_priorities rather than deleted and created again.
+        Those moves are left in rules_to_reorder.
 
-        # Check proper rule format on current listener
-        if len(current_rule['Actions']) > 1:
-            for action in current_rule['Actions']:
-                if 'Order' not in action:
-                    self.module.fail_json(msg="'Order' key not found in actions. "
-                                              "installed version of botocore does not support "
-                                              "multiple actions, please upgrade botocore to version "
-                                              "1.10.30 or higher")
+        :param purge_rules: whether current rules at priorities that aren't passed may be moved away
+        :return: the rules to add, the rules to modify and the ARNs of the rules to delete
+        """
 
-        # If the lengths of the actions are the same, we'll have to verify that the
-        # contents of those actions are the same
-        if len(current_rule['Actions']) == len(new_rule['Actions']):
-            # if actions have just one element, compare the contents and then update if
-            # they're different
-            if len(current_rule['Actions']) == 1 and len(new_rule['Actions']) == 1:
-                if current_rule['Actions'] != new_rule['Actions']:
-                    modified_rule['Actions'] = new_rule['Actions']
-            # if actions have multiple elements, we'll have to order them first before comparing.
-            # multiple actions will have an 'Order' key for this purpose
+        current = {}
+        for rule in self.current_rules:
+            if rule['IsDefault']:
+                continue
+            # Check proper rule format on current listener
+            if len(rule['Actions']) > 1 and any('Order' not in action for action in rule['Actions']):
+                self.module.fail_json(msg="'Order' key not found in actions. "
+                                          "installed version of botocore does not support "
+                                          "multiple actions, please upgrade botocore to version "
+                                          "1.10.30 or higher")
+            current[int(rule['Priority'])] = rule
+        desired = dict((int(rule['Priority']), rule) for rule in self.rules)
+        current_fingerprints = dict((priority, self._rule_fingerprint(rule)) for priority, rule in current.items())
+        desired_fingerprints = dict((priority, self._rule_fingerprint(rule)) for priority, rule in desired.items())
+
+        unchanged = set(priority for priority in desired
+                        if priority in current and current_fingerprints[priority] == desired_fingerprints[priority])
+
+        # Current rules that could be moved, by fingerprint, lowest priority last so it is popped first.
+        # Without purge_rules, rules at priorities that aren't passed are kept where they are.
+        movable = {}
+        for priority in sorted(current, reverse=True):
+            if priority not in unchanged and (purge_rules or priority in desired):
+                movable.setdefault(current_fingerprints[priority], []).append(priority)
+
+        # Moves as target priority -> source priority
+        moves = {}
+        for priority in sorted(desired):
+            if priority not in unchanged and movable.get(desired_fingerprints[priority]):
+                moves[priority] = movable[desired_fingerprints[priority]].pop()
+        sources = dict((source, target) for target, source in moves.items())
+
+        # A rule can only be moved to a free priority, or to one whose rule moves away itself
+        blocked = [target for target in moves if target in current and target not in sources]
+        while blocked:
+            source = moves.pop(blocked.pop())
+            del sources[source]
+            if source in moves:
+                blocked.append(source)
+
+        self.rules_to_reorder = [{'RuleArn': current[source]['RuleArn'], 'Priority': target} for target, source in sorted(moves.items())]
+        self.rules_to_add = []
+        self.rules_to_modify = []
+        kept = unchanged | set(sources)
+        for priority in sorted(desired):
+            if priority in unchanged or priority in moves:
+                continue
+            new_rule = desired[priority]
+            if priority in current and priority not in sources:
+                self.rules_to_modify.append({
+                    'Priority': priority,
+                    'RuleArn': current[priority]['RuleArn'],
+                    'Actions': new_rule['Actions'],
+                    'Conditions': new_rule['Conditions'],
+                })
+                kept.add(priority)
             else:
-                current_actions_sorted = sorted(current_rule['Actions'], key=lambda x: x['Order'])
-                new_actions_sorted = sorted(new_rule['Actions'], key=lambda x: x['Order'])
-
-                # the AWS api won't return the client secret, so we'll have to remove it
-                # or the module will always see the new and current actions as different
-                # and try to apply the same config
-                new_actions_sorted_no_secret = []
-                for action in new_actions_sorted:
-                    # the secret is currently only defined in the oidc config
-                    if action['Type'] == 'authenticate-oidc':
-                        action['AuthenticateOidcConfig'].pop('ClientSecret')
-                        new_actions_sorted_no_secret.append(action)
-                    else:
-                        new_actions_sorted_no_secret.append(action)
-
-                if current_actions_sorted != new_actions_sorted_no_secret:
-                    modified_rule['Actions'] = new_rule['Actions']
-        # If the action lengths are different, then replace with the new actions
-        else:
-            modified_rule['Actions'] = new_rule['Actions']
+                self.rules_to_add.append(dict(new_rule))
 
-        # Conditions
-        modified_conditions = []
-        for condition in new_rule['Conditions']:
-            if not self._compare_condition(current_rule['Conditions'], condition):
-                modified_conditions.append(condition)
+        self.rules_to_delete = [current[priority]['RuleArn'] for priority in sorted(current) if priority not in kept]
 
-        if modified_conditions:
-            modified_rule['Conditions'] = modified_conditions
+        return self.rules_to_add, self.rules_to_modify, self.rules_to_delete
 
-        return modified_rule
-
-    def compare_rules(self):
+    def set_rule_priorities(self):
         """
+        Move the rules of rules_to_reorder to their new priorities in one call
 
         :return:
         """
 
-        rules_to_modify = []
-        rules_to_delete = []
-        rules_to_add = deepcopy(self.rules)
-
-        for current_rule in self.current_rules:
-            current_rule_passed_to_module = False
-            for new_rule in self.rules[:]:
-                if current_rule['Priority'] == str(new_rule['Priority']):
-                    current_rule_passed_to_module = True
-                    # Remove what we match so that what is left can be marked as 'to be added'
-                    rules_to_add.remove(new_rule)
-                    modified_rule = self._compare_rule(current_rule, new_rule)
-                    if modified_rule:
-                        modified_rule['Priority'] = int(current_rule['Priority'])
-                        modified_rule['RuleArn'] = current_rule['RuleArn']
-                        modified_rule['Actions'] = new_rule['Actions']
-                        modified_rule['Conditions'] = new_rule['Conditions']
-                        rules_to_modify.append(modified_rule)
-                    break
-
-            # If the current rule was not matched against passed rules, mark for removal
-            if not current_rule_passed_to_module and not current_rule['IsDefault']:
-                rules_to_delete.append(current_rule['RuleArn'])
+        try:
+            AWSRetry.jittered_backoff()(self.connection.set_rule_priorities)(RulePriorities=self.rules_to_reorder)
+        except (BotoCoreError, ClientError) as e:
+            self.module.fail_json_aws(e)
 
-        return rules_to_add, rules_to_modify, rules_to_delete
+        self.changed = True
 
 
 class ELBListenerRule(object):
@@ -43,7 +43,9 @@ options:
     required: false
   max_items:
     description:
-      - Maximum number of items to return for various get/list requests
+      - Maximum number of items to return for various get/list requests.
+      - "When used with any of the C(query: record_sets) filters this is the number
+        of matching record sets to return; paging stops as soon as it is reached."
     required: false
   delegation_set_id:
     description:
@@ -59,6 +61,40 @@ options:
       - The type of DNS record
     required: false
     choices: [ 'A', 'CNAME', 'MX', 'AAAA', 'TXT', 'PTR', 'SRV', 'SPF', 'CAA', 'NS' ]
+  record_name:
+    description:
+      - "Only return record sets whose name matches this shell-style glob
+        (eg: C(*.api.example.com)). Used with C(query: record_sets)."
+      - The trailing dot is optional. When the right-most labels of the glob
+        contain no wildcards the listing starts at, and stops after leaving, that
+        part of the zone instead of paging the whole zone.
+    required: false
+    version_added: "2.8"
+  record_name_regex:
+    description:
+      - "Only return record sets whose name matches this regular expression
+        (searched, not anchored). Used with C(query: record_sets)."
+    required: false
+    version_added: "2.8"
+  record_types:
+    description:
+      - "Only return record sets of these types. Used with C(query: record_sets)."
+    required: false
+    version_added: "2.8"
+  record_value:
+    description:
+      - "Only return record sets where one of the values, or the alias target
+        DNS name, contains this substring. Used with C(query: record_sets)."
+    required: false
+    version_added: "2.8"
+  compact:
+    description:
+      - "Return C(record_set_map), a C({name: {type: [values]}}) mapping, instead
+        of the raw C(resource_record_sets) list. Used with C(query: record_sets)."
+    required: false
+    type: bool
+    default: false
+    version_added: "2.8"
   dns_name:
     description:
       - The first name in the lexicographic ordering of domain names that you want
@@ -133,6 +169,17 @@ EXAMPLES = '''
     max_items: 20
   register: record_sets
 
+- name: Find the first 10 CNAME records under api.example.com pointing at an ELB
+  route53_facts:
+    query: record_sets
+    hosted_zone_id: ZZZ1111112222
+    record_name: '*.api.example.com'
+    record_types: [CNAME]
+    record_value: elb.amazonaws.com
+    max_items: 10
+    compact: yes
+  register: api_records
+
 - name: List first 20 health checks
   route53_facts:
     query: health_check
@@ -306,6 +353,11 @@ hosted_zones:
       type: dict
       sample:
         Hello: World
+matched_count:
+  description: Number of record sets matching the filters
+  returned: when C(query) is I(record_sets) and any record set filter is used
+  type: int
+  sample: 3
 next_dns_name:
   description: The next name that would have been returned had C(max_items) not been passed
   returned: when C(query) is I(hosted_zone) and C(hosted_zone_method) is I(list_by_name) and C(max_items) is specified
@@ -316,9 +368,18 @@ next_hosted_zone_id:
   returned: when C(query) is I(hosted_zone) and C(hosted_zone_method) is I(list_by_name) and C(max_items) is specified
   type: string
   sample: Z1234ABCDEFGHI
+record_set_map:
+  description: Matching record set values keyed by record name and then by type
+  returned: when C(query) is I(record_sets) and C(compact) is true
+  type: dict
+  sample:
+    www.example.com.:
+      A:
+        - 192.0.2.10
+        - 192.0.2.11
 resource_record_sets:
   description: List of Resource Record Sets
-  returned: when C(query) is I(record_sets)
+  returned: when C(query) is I(record_sets) and C(compact) is false
   type: complex
   contains:
     name:
@@ -346,6 +407,11 @@ resource_record_sets:
       returned: always
       type: string
       sample: NS
+scanned_count:
+  description: Number of record sets read from AWS while looking for matches
+  returned: when C(query) is I(record_sets) and any record set filter is used
+  type: int
+  sample: 120
 vpcs:
   description: List of VPCs that can use a private hosted zone
   returned: when C(query) is I(hosted_zone) and C(hosted_zone_method) is I(details) and zone is private
@@ -363,6 +429,9 @@ vpcs:
       sample: us-east-2
 '''
 
+import fnmatch
+import re
+
 try:
     import botocore
 except ImportError:
@@ -372,6 +441,7 @@ from ansible.module_utils.aws.core import AnsibleAWSModule
 from ansible.module_utils.ec2 import boto3_conn, ec2_argument_spec, get_aws_connection_info
 from ansible.module_utils.ec2 import camel_dict_to_snake_dict, AWSRetry
 from ansible.module_utils.ec2 import boto3_tag_list_to_ansible_dict
+from ansible.module_utils.aws.route53 import iter_record_sets, record_set_values
 
 
 @AWSRetry.exponential_backoff()
@@ -392,6 +462,86 @@ def list_record_sets_with_backoff(client, params):
     return paginator.paginate(**params).build_full_result()
 
 
+def fixed_name_suffix(name_glob):
+    """Return the right-most labels of a name glob that contain no wildcards
+
+    Route53 orders record sets by their labels in reverse, so every name
+    matching the glob lives in one contiguous run starting at this suffix.
+    """
+    labels = name_glob.rstrip('.').split('.')
+    suffix = []
+    for label in reversed(labels):
+        if any(c in label for c in '*?['):
+            break
+        suffix.insert(0, label)
+    return '.'.join(suffix)
+
+
+def record_set_matcher(name_glob=None, name_regex=None, types=None, value=None):
+    name_glob = name_glob.lower().rstrip('.') if name_glob else None
+    name_re = re.compile(name_regex) if name_regex else None
+    types = set(types) if types else None
+
+    def matches(record_set):
+        name = record_set['Name'].replace('\\052', '*').rstrip('.')
+        if types and record_set['Type'] not in types:
+            return False
+        if name_glob and not fnmatch.fnmatchcase(name, name_glob):
+            return False
+        if name_re and not name_re.search(name):
+            return False
+        if value and not any(value in v for v in record_set_values(record_set)):
+            return False
+        return True
+    return matches
+
+
+def filter_record_sets(client, module, params):
+    name_glob = module.params.get('record_name')
+    max_items = module.params.get('max_items')
+    max_items = int(max_items) if max_items else None
+    try:
+        matches = record_set_matcher(name_glob=name_glob,
+                                     name_regex=module.params.get('record_name_regex'),
+                                     types=module.params.get('record_types'),
+                                     value=module.params.get('record_value'))
+    except re.error as e:
+        module.fail_json(msg="Invalid record_name_regex: %s" % str(e))
+
+    # MaxItems is the page size for the underlying call; we count matches ourselves
+    params.pop('MaxItems', None)
+    # Route 53 returns names lowercased, so the suffix must be too
+    suffix = fixed_name_suffix(name_glob.lower().rstrip('.')) if name_glob else ''
+    if 'StartRecordName' in params:
+        suffix = ''
+    elif suffix:
+        params['StartRecordName'] = suffix + '.'
+
+    found = []
+    scanned = 0
+    for record_set in iter_record_sets(client, params):
+        scanned += 1
+        if suffix:
+            name = record_set['Name'].rstrip('.').lower()
+            if name != suffix and not name.endswith('.' + suffix):
+                break
+        if matches(record_set):
+            found.append(record_set)
+            if max_items and len(found) >= max_items:
+                break
+
+    results = dict(MatchedCount=len(found), ScannedCount=scanned)
+    if module.params.get('compact'):
+        record_set_map = dict()
+        for record_set in found:
+            types = record_set_map.setdefault(record_set['Name'], dict())
+            types.setdefault(record_set['Type'], []).extend(record_set_values(record_set))
+        results['RecordSetMap'] = record_set_map
+    else:
+        results['ResourceRecordSets'] = found
+    return results
+
+
 def get_hosted_zone(client, module):
     params = dict()
 
@@ -554,6 +704,8 @@ def record_sets_details(client, module):
     elif module.params.get('type'):
         params['StartRecordType'] = module.params.get('type')
     try:
+        if any(module.params.get(f) for f in RECORD_SET_FILTERS):
+            return filter_record_sets(client, module, params)
         return list_record_sets_with_backoff(client, params)
     except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
         module.fail_json_aws(e, msg="Couldn't list record sets")
@@ -586,6 +738,9 @@ def hosted_zone_details(client, module):
     return results
 
 
+RECORD_SET_FILTERS = ['record_name', 'record_name_regex', 'record_types', 'record_value', 'compact']
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
@@ -606,6 +761,11 @@ def main():
         type=dict(choices=[
             'A', 'CNAME', 'MX', 'AAAA', 'TXT', 'PTR', 'SRV', 'SPF', 'CAA', 'NS'
         ]),
+        record_name=dict(),
+        record_name_regex=dict(),
+        record_types=dict(type='list'),
+        record_value=dict(),
+        compact=dict(type='bool', default=False),
         dns_name=dict(),
         resource_id=dict(type='list', aliases=['resource_ids']),
         health_check_id=dict(),
@@ -669,10 +829,14 @@ def main():
         if field in results:
             del(results[field])
     tags = results.get('Tags')
+    # record names and types are data, not keys to be snake_cased
+    record_set_map = results.pop('RecordSetMap', None)
 
     results = camel_dict_to_snake_dict(results)
     if tags is not None:
         results['tags'] = tags
+    if record_set_map is not None:
+        results['record_set_map'] = record_set_map
 
     module.exit_json(**results)
 
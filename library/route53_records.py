@@ -0,0 +1,342 @@
+#!/usr/bin/python
+# Copyright: Ansible Project
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'community'}
+
+
+DOCUMENTATION = '''
+module: route53_records
+short_description: Manage many Route53 record sets in one zone at once
+description:
+    - Brings a list of record sets in a hosted zone to the desired state with as
+      few API calls as possible.
+    - The zone is listed once, the create/upsert/delete diff is computed locally
+      and the changes are submitted in as few ChangeBatches as the Route53 limits
+      allow (1000 records and 32000 characters per batch).
+    - All submitted changes are then waited on together.
+version_added: "2.8"
+options:
+  zone:
+    description:
+      - The DNS zone to modify. Either I(zone) or I(hosted_zone_id) is required.
+    required: false
+  hosted_zone_id:
+    description:
+      - The Hosted Zone ID of the DNS zone to modify.
+    required: false
+  private_zone:
+    description:
+      - When looking the zone up by I(zone), pick the private zone of that name
+        rather than the public one.
+    type: bool
+    default: false
+  records:
+    description:
+      - List of record sets that should exist in the zone.
+      - Each item takes the same keys as the C(route53) module, C(record), C(type),
+        C(ttl), C(value), C(alias), C(alias_hosted_zone_id), C(alias_evaluate_target_health),
+        C(identifier), C(weight), C(region), C(failover) and C(health_check).
+      - C(value) may be a single value or a list of values.
+    required: true
+  ttl:
+    description:
+      - Default TTL for items of I(records) that don't set one.
+    default: 3600
+  purge:
+    description:
+      - Delete record sets in the zone that are not listed in I(records).
+      - The SOA and NS record sets of the zone apex are never deleted.
+    type: bool
+    default: false
+  wait:
+    description:
+      - Wait until all submitted changes have propagated to every Route53 DNS server.
+    type: bool
+    default: false
+  wait_timeout:
+    description:
+      - How long to wait for the changes to be replicated, in seconds.
+    default: 300
+author: Ansible Project
+extends_documentation_fragment:
+    - aws
+    - ec2
+'''
+
+EXAMPLES = '''
+- name: Make sure the service records exist
+  route53_records:
+    zone: example.com
+    records:
+      - record: www.example.com
+        type: A
+        value: [192.0.2.10, 192.0.2.11]
+      - record: api.example.com
+        type: CNAME
+        ttl: 60
+        value: api-lb-123.eu-west-1.elb.amazonaws.com
+      - record: app.example.com
+        type: A
+        alias: yes
+        alias_hosted_zone_id: Z32O12XQLNTSW2
+        value: app-lb-456.eu-west-1.elb.amazonaws.com
+    wait: yes
+
+- name: Make the private zone contain exactly these records
+  route53_records:
+    zone: internal.example.com
+    private_zone: yes
+    records: "{{ internal_records }}"
+    purge: yes
+'''
+
+RETURN = '''
+created:
+  description: Record sets that were (or would be in check mode) created, as C(name type [identifier])
+  returned: always
+  type: list
+  sample: ["www.example.com. A"]
+updated:
+  description: Record sets that were (or would be in check mode) updated
+  returned: always
+  type: list
+  sample: ["api.example.com. CNAME"]
+deleted:
+  description: Record sets that were (or would be in check mode) deleted
+  returned: always
+  type: list
+  sample: ["old.example.com. A"]
+change_ids:
+  description: IDs of the submitted ChangeBatches
+  returned: when changed and not in check mode
+  type: list
+  sample: ["/change/C2682N5HXP0BZ4"]
+zone_id:
+  description: Hosted zone id
+  returned: always
+  type: string
+  sample: Z6JQG9820BEFMW
+'''
+
+import time
+
+try:
+    import botocore
+except ImportError:
+    pass  # handled by AnsibleAWSModule
+
+from ansible.module_utils.aws.core import AnsibleAWSModule
+from ansible.module_utils.ec2 import boto3_conn, ec2_argument_spec, get_aws_connection_info, AWSRetry
+from ansible.module_utils.aws.route53 import iter_record_sets, record_set_key, record_set_values
+from ansible.module_utils.aws.route53 import normalize_record_name, find_hosted_zone, strip_zone_id
+
+# Limits of a single ChangeResourceRecordSets request. UPSERTs count twice.
+MAX_BATCH_RECORDS = 1000
+MAX_BATCH_CHARACTERS = 32000
+
+
+@AWSRetry.exponential_backoff()
+def change_record_sets_with_backoff(client, zone_id, changes):
+    return client.change_resource_record_sets(HostedZoneId=zone_id, ChangeBatch=dict(Changes=changes))
+
+
+@AWSRetry.exponential_backoff()
+def get_change_with_backoff(client, change_id):
+    return client.get_change(Id=change_id)
+
+
+def desired_record_set(module, spec):
+    for key in ('record', 'type', 'value'):
+        if not spec.get(key):
+            module.fail_json(msg="Every item of records needs a %s: %s" % (key, spec))
+
+    values = spec['value']
+    if not isinstance(values, list):
+        values = [values]
+    record_set = dict(Name=normalize_record_name(spec['record']), Type=spec['type'].upper())
+
+    if spec.get('alias'):
+        if not spec.get('alias_hosted_zone_id'):
+            module.fail_json(msg="alias_hosted_zone_id is required for alias record %s" % spec['record'])
+        record_set['AliasTarget'] = dict(HostedZoneId=spec['alias_hosted_zone_id'],
+                                         DNSName=values[0],
+                                         EvaluateTargetHealth=bool(spec.get('alias_evaluate_target_health', False)))
+    else:
+        record_set['TTL'] = int(spec.get('ttl') or module.params.get('ttl'))
+        record_set['ResourceRecords'] = [dict(Value=str(v)) for v in values]
+
+    for key, aws_key in (('identifier', 'SetIdentifier'), ('region', 'Region'),
+                         ('failover', 'Failover'), ('health_check', 'HealthCheckId')):
+        if spec.get(key):
+            record_set[aws_key] = spec[key]
+    if spec.get('weight') is not None:
+        record_set['Weight'] = int(spec['weight'])
+    return record_set
+
+
+def record_set_digest(record_set):
+    """Hashable form of everything about a record set that an UPSERT can change"""
+    alias = record_set.get('AliasTarget')
+    if alias:
+        alias = (strip_zone_id(alias['HostedZoneId']), alias['DNSName'].lower().rstrip('.'),
+                 bool(alias.get('EvaluateTargetHealth')))
+    return (record_set.get('TTL'),
+            tuple(sorted(record_set_values(record_set))) if not alias else None,
+            alias,
+            record_set.get('Weight'),
+            record_set.get('Region'),
+            record_set.get('Failover'),
+            record_set.get('HealthCheckId'))
+
+
+def describe_key(key):
+    return ' '.join(k for k in key if k)
+
+
+def compute_changes(module, current, desired, zone_name):
+    """Diff the desired record sets against the zone snapshot
+
+    Both sides are dicts keyed by record_set_key so every lookup is O(1).
+    """
+    deletes, creates, upserts = [], [], []
+    for key, record_set in desired.items():
+        existing = current.get(key)
+        if existing is None:
+            creates.append(dict(Action='CREATE', ResourceRecordSet=record_set))
+        elif record_set_digest(existing) != record_set_digest(record_set):
+            upserts.append(dict(Action='UPSERT', ResourceRecordSet=record_set))
+
+    if module.params.get('purge'):
+        for key, record_set in current.items():
+            if key in desired:
+                continue
+            if key[0] == zone_name and key[1] in ('SOA', 'NS'):
+                continue
+            deletes.append(dict(Action='DELETE', ResourceRecordSet=record_set))
+
+    # deletes go first so that e.g. a CNAME can be replaced by an A record
+    return deletes + creates + upserts
+
+
+def change_weight(change):
+    record_set = change['ResourceRecordSet']
+    values = record_set_values(record_set)
+    factor = 2 if change['Action'] == 'UPSERT' else 1
+    return max(len(values), 1) * factor, sum(len(v) for v in values) * factor
+
+
+def batch_changes(changes):
+    batch, records, characters = [], 0, 0
+    for change in changes:
+        change_records, change_characters = change_weight(change)
+        if batch and (records + change_records > MAX_BATCH_RECORDS or
+                      characters + change_characters > MAX_BATCH_CHARACTERS):
+            yield batch
+            batch, records, characters = [], 0, 0
+        batch.append(change)
+        records += change_records
+        characters += change_characters
+    if batch:
+        yield batch
+
+
+def wait_for_changes(client, module, change_ids):
+    """Poll all pending changes in one loop until every one is INSYNC"""
+    pending = list(change_ids)
+    deadline = time.time() + module.params.get('wait_timeout')
+    delay = 2
+    while pending:
+        # changes in a zone go INSYNC in submission order, so check the newest first
+        for change_id in reversed(pending[:]):
+            status = get_change_with_backoff(client, change_id)['ChangeInfo']['Status']
+            if status != 'INSYNC':
+                break
+            pending.remove(change_id)
+        if not pending:
+            return
+        if time.time() + delay > deadline:
+            module.fail_json(msg="Timed out waiting for changes %s to be INSYNC" % ', '.join(pending))
+        time.sleep(delay)
+        delay = min(delay * 2, 30)
+
+
+def main():
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(dict(
+        zone=dict(),
+        hosted_zone_id=dict(),
+        private_zone=dict(type='bool', default=False),
+        records=dict(type='list', required=True),
+        ttl=dict(type='int', default=3600),
+        purge=dict(type='bool', default=False),
+        wait=dict(type='bool', default=False),
+        wait_timeout=dict(type='int', default=300),
+    ))
+
+    module = AnsibleAWSModule(
+        argument_spec=argument_spec,
+        supports_check_mode=True,
+        required_one_of=[['zone', 'hosted_zone_id']],
+        mutually_exclusive=[['zone', 'hosted_zone_id']],
+    )
+
+    try:
+        region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
+        route53 = boto3_conn(module, conn_type='client', resource='route53', region=region, endpoint=ec2_url, **aws_connect_kwargs)
+    except botocore.exceptions.ProfileNotFound as e:
+        module.fail_json_aws(e)
+
+    try:
+        if module.params.get('hosted_zone_id'):
+            zone = route53.get_hosted_zone(Id=module.params.get('hosted_zone_id'))['HostedZone']
+        else:
+            zone = find_hosted_zone(route53, module.params.get('zone'), module.params.get('private_zone'))
+            if zone is None:
+                module.fail_json(msg="Hosted zone %s not found" % module.params.get('zone'))
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json_aws(e, msg="Couldn't find hosted zone")
+    zone_id = strip_zone_id(zone['Id'])
+
+    desired = dict()
+    for spec in module.params.get('records'):
+        record_set = desired_record_set(module, spec)
+        key = record_set_key(record_set)
+        if key in desired:
+            module.fail_json(msg="Record set %s is listed more than once" % describe_key(key))
+        desired[key] = record_set
+
+    try:
+        current = dict((record_set_key(r), r) for r in iter_record_sets(route53, dict(HostedZoneId=zone_id)))
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json_aws(e, msg="Couldn't list record sets")
+
+    changes = compute_changes(module, current, desired, normalize_record_name(zone['Name']))
+    result = dict(changed=bool(changes), zone_id=zone_id, created=[], updated=[], deleted=[])
+    for change in changes:
+        action = dict(CREATE='created', UPSERT='updated', DELETE='deleted')[change['Action']]
+        result[action].append(describe_key(record_set_key(change['ResourceRecordSet'])))
+
+    if changes and not module.check_mode:
+        change_ids = []
+        try:
+            for batch in batch_changes(changes):
+                response = change_record_sets_with_backoff(route53, zone_id, batch)
+                change_ids.append(response['ChangeInfo']['Id'])
+            if module.params.get('wait'):
+                wait_for_changes(route53, module, change_ids)
+        except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+            module.fail_json_aws(e, msg="Couldn't change record sets", change_ids=change_ids, **result)
+        result['change_ids'] = change_ids
+
+    module.exit_json(**result)
+
+
+if __name__ == '__main__':
+    main()
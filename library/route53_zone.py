@@ -29,7 +29,25 @@ options:
     zone:
         description:
             - "The DNS zone record (eg: foo.com.)"
-        required: true
+            - One of I(zone) or I(zones) is required.
+        required: false
+    zones:
+        description:
+            - Manage many zones in one invocation instead of looping over I(zone).
+            - Each item is a dict with the keys C(zone), C(state), C(vpc_id), C(vpc_region)
+              and C(comment). Missing keys default to the module level options.
+            - The account's zones are listed once, and zones are created, deleted and
+              (dis)associated with VPCs concurrently, staying under the Route53 limit
+              of five requests per second.
+            - The result is returned per zone in C(zones).
+        required: false
+        version_added: "2.8"
+    max_concurrency:
+        description:
+            - How many zones of I(zones) are worked on at the same time.
+        required: false
+        default: 4
+        version_added: "2.8"
     state:
         description:
             - whether or not the zone should exist or not
@@ -52,6 +70,24 @@ options:
             - Comment associated with the zone
         required: false
         default: ''
+    zone_index_cache:
+        description:
+            - Directory in which to keep an index of every hosted zone in the account.
+            - Without it the zone is looked up by name with C(list_hosted_zones_by_name),
+              which is the quickest option for a single zone. With it the whole account
+              is listed once and later tasks of the play reuse the index, which is
+              quicker when a play manages many zones.
+            - Zones this module creates or deletes are written back to the index. A zone
+              missing from the index is always looked up again before it is created.
+        required: false
+        version_added: "2.8"
+    zone_index_cache_ttl:
+        description:
+            - How many seconds the index in I(zone_index_cache) is reused before the
+              account is listed again.
+        required: false
+        default: 300
+        version_added: "2.8"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -97,6 +133,25 @@ EXAMPLES = '''
 
 - debug:
     var: zone_out
+
+- name: create private zones and associate each with several VPCs in one go
+  route53_zone:
+    vpc_region: '{{ ec2_region }}'
+    zones:
+      - zone: svc1.internal.example.com
+        vpc_id: '{{ shared_vpc_ids }}'
+      - zone: svc2.internal.example.com
+        vpc_id: '{{ shared_vpc_ids }}'
+      - zone: retired.internal.example.com
+        state: absent
+  register: zones_out
+
+- name: manage many zones, listing the account only once
+  route53_zone:
+    zone: '{{ item }}'
+    state: present
+    zone_index_cache: ~/.ansible/tmp/route53
+  loop: '{{ customer_zones }}'
 '''
 
 RETURN = '''
@@ -130,142 +185,335 @@ zone_id:
     returned: when hosted zone exists
     type: string
     sample: "Z6JQG9820BEFMW"
+zones:
+    description: Result for every item of I(zones), with the keys described above plus C(changed),
+      and C(failed) and C(msg) for zones that could not be managed
+    returned: when I(zones) is used
+    type: list
+    sample:
+      - name: svc1.internal.example.com.
+        zone_id: Z6JQG9820BEFMW
+        private_zone: true
+        vpc_id: vpc-1d36c84f,vpc-2e47d95a
+        vpc_region: eu-west-1
+        comment: ''
+        changed: true
 '''
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.ec2 import ec2_argument_spec, get_aws_connection_info
-from ansible.module_utils.ec2 import boto3_conn, HAS_BOTO3, camel_dict_to_snake_dict
+from ansible.module_utils.ec2 import boto3_conn, HAS_BOTO3, camel_dict_to_snake_dict, AWSRetry
+from ansible.module_utils.aws.route53 import hosted_zones_by_name, list_hosted_zones_with_backoff
+from ansible.module_utils.aws.route53 import index_hosted_zones, strip_zone_id
+from ansible.module_utils.aws.cache import cache_file, load_cache, save_cache
+from ansible.module_utils.aws.concurrency import RateLimiter, run_concurrently
 
 try:
     import botocore
 except ImportError:
     pass  # caught by imported HAS_BOTO3
 
+import threading
 import traceback
 import uuid
 
-
-def update_vpc_associations(module, conn, zone, current_vpcs, desired_vpcs):
-    _, _, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
-    vpc_region = module.params.get('vpc_region')
+# Route53 allows five API requests per second per account
+ROUTE53_REQUESTS_PER_SECOND = 5
+
+
+class ZoneIndex(object):
+    """Hosted zone lookups, either seeking by name or from a cached full index
+
+    Seeking costs one list_hosted_zones_by_name call per zone. The full index
+    lists every zone in the account once and keeps it in zone_index_cache so
+    later tasks of the same play don't list the account again.
+    """
+
+    def __init__(self, module, conn, full=False):
+        self.module = module
+        self.conn = conn
+        self.cache_path = None
+        self.index = None
+        self.lock = threading.Lock()
+        if module.params.get('zone_index_cache'):
+            self.load()
+        elif full:
+            self.index = index_hosted_zones(self._slim(z) for z in list_hosted_zones_with_backoff(self.conn))
+
+    def load(self):
+        region, _, aws_connect_kwargs = get_aws_connection_info(self.module, boto3=True)
+        sts = boto3_conn(self.module, conn_type='client', resource='sts', region=region or 'us-east-1', **aws_connect_kwargs)
+        account = sts.get_caller_identity()['Account']
+        self.cache_path = cache_file(self.module.params.get('zone_index_cache'), 'route53-zones', account)
+        zones = load_cache(self.cache_path, self.module.params.get('zone_index_cache_ttl'))
+        if zones is None:
+            zones = [self._slim(z) for z in list_hosted_zones_with_backoff(self.conn)]
+            save_cache(self.cache_path, zones)
+        self.index = index_hosted_zones(zones)
+
+    @staticmethod
+    def _slim(zone):
+        return dict(Id=zone['Id'], Name=zone['Name'], Config=zone.get('Config', {}))
+
+    def candidates(self, name, fresh=False):
+        if self.index is None or fresh:
+            return hosted_zones_by_name(self.conn, name)
+        return self.index.get(name, [])
+
+    def find(self, name, private_zone, fresh=False):
+        for zone in self.candidates(name, fresh):
+            if zone.get('Config', {}).get('PrivateZone', False) == private_zone:
+                return zone
+        return None
+
+    def add(self, zone):
+        if self.index is not None:
+            with self.lock:
+                self.index.setdefault(zone['Name'], []).append(self._slim(zone))
+                self.save()
+
+    def remove(self, zone):
+        if self.index is not None:
+            with self.lock:
+                zones = [z for z in self.index.get(zone['Name'], []) if z['Id'] != zone['Id']]
+                self.index[zone['Name']] = zones
+                self.save()
+
+    def save(self):
+        if self.cache_path:
+            save_cache(self.cache_path, [z for zones in self.index.values() for z in zones])
+
+
+@AWSRetry.exponential_backoff(catch_extra_error_codes=['PriorRequestNotComplete'])
+def throttled_call(limiter, func, **kwargs):
+    return limiter.call(func, **kwargs)
+
+
+class ZoneError(Exception):
+    def __init__(self, msg, error=None):
+        super(ZoneError, self).__init__(msg)
+        self.msg = msg
+        self.error = error
+
+
+def zone_spec(params, defaults):
+    """Fill a zone description in from the module level options"""
+    spec = dict((k, params.get(k) if params.get(k) is not None else defaults.get(k))
+                for k in ('zone', 'state', 'vpc_id', 'vpc_region', 'comment'))
+    if not spec['zone']:
+        raise ZoneError("Every item of zones needs a zone")
+    spec['zone'] = spec['zone'].lower()
+    if spec['zone'][-1:] != '.':
+        spec['zone'] += '.'
+    spec['state'] = (spec['state'] or 'present').lower()
+    if spec['state'] not in ('present', 'absent'):
+        raise ZoneError("state of zone %s must be present or absent" % spec['zone'])
+    if not isinstance(spec['vpc_id'] or [], list):
+        spec['vpc_id'] = [spec['vpc_id']]
+    spec['vpc_id'] = spec['vpc_id'] or []
+    spec['comment'] = spec['comment'] or ''
+    spec['private_zone'] = bool(spec['vpc_id']) and spec['vpc_region'] is not None
+    return spec
+
+
+def update_vpc_associations(conn, limiter, zone, vpc_region, current_vpcs, desired_vpcs):
+    zone_id = strip_zone_id(zone['Id'])
     for vpc in desired_vpcs - current_vpcs:
         try:
-            conn.associate_vpc_with_hosted_zone(HostedZoneId=zone['Id'].replace('/hostedzone/', ''),
-                                                VPC=dict(VPCRegion=vpc_region,
-                                                         VPCId=vpc))
+            throttled_call(limiter, conn.associate_vpc_with_hosted_zone, HostedZoneId=zone_id,
+                           VPC=dict(VPCRegion=vpc_region, VPCId=vpc))
         except botocore.exceptions.ClientError as e:
-            module.fail_json(msg="Couldn't associate VPC %s with zone %s: %s" % (vpc, zone['Name'], str(e)),
-                             exception=traceback.format_exc(e), **camel_dict_to_snake_dict(e.response))
+            raise ZoneError("Couldn't associate VPC %s with zone %s: %s" % (vpc, zone['Name'], str(e)), e)
     for vpc in current_vpcs - desired_vpcs:
         try:
-            conn.disassociate_vpc_from_hosted_zone(HostedZoneId=zone['Id'].replace('/hostedzone/', ''),
-                                                   VPC=dict(VPCRegion=vpc_region,
-                                                            VPCId=vpc))
+            throttled_call(limiter, conn.disassociate_vpc_from_hosted_zone, HostedZoneId=zone_id,
+                           VPC=dict(VPCRegion=vpc_region, VPCId=vpc))
         except botocore.exceptions.ClientError as e:
-            module.fail_json(msg="Couldn't disassociate VPC %s from zone %s: %s" % (vpc, zone['Name'], str(e)),
-                             exception=traceback.format_exc(e), **camel_dict_to_snake_dict(e.response))
+            raise ZoneError("Couldn't disassociate VPC %s from zone %s: %s" % (vpc, zone['Name'], str(e)), e)
+
+
+def ensure_zone(module, conn, limiter, zones, spec, zone):
+    """Bring one zone to the state in spec. zone is the existing zone or None.
+
+    Returns (changed, record) and raises ZoneError rather than failing the
+    module, so it can run on a worker thread in zones: mode.
+    """
+    zone_in = spec['zone']
+    private_zone = spec['private_zone']
+    vpc_id = spec['vpc_id']
+    vpc_region = spec['vpc_region']
+    desired_vpcs = set(vpc_id)
+
+    record = {
+        'private_zone': private_zone,
+        'vpc_id': vpc_id[0] if vpc_id else None,
+        'vpc_region': vpc_region,
+        'comment': spec['comment'],
+    }
+
+    try:
+        if spec['state'] == 'present' and zone is not None:
+            changed = False
+            zone_id = strip_zone_id(zone['Id'])
+            if private_zone:
+                details = throttled_call(limiter, conn.get_hosted_zone, Id=zone_id)
+
+                if not details['HostedZone']['Config']['PrivateZone']:
+                    raise ZoneError("Can't change VPC from public to private")
+
+                current_vpc_region = details['VPCs'][0]['VPCRegion']
+                current_vpcs = set([v['VPCId'] for v in details['VPCs']])
+
+                if current_vpc_region != vpc_region:
+                    raise ZoneError("Can't change VPC Region once a zone has been created")
+
+                if current_vpcs != desired_vpcs:
+                    if not module.check_mode:
+                        update_vpc_associations(conn, limiter, details['HostedZone'], vpc_region, current_vpcs, desired_vpcs)
+                    changed = True
+                record['vpc_id'] = ','.join(desired_vpcs)
+
+            record['zone_id'] = zone_id
+            record['name'] = zone_in
+            return changed, record
+
+        elif spec['state'] == 'present':
+            params = dict(Name=zone_in, HostedZoneConfig=dict(Comment=spec['comment'], PrivateZone=private_zone),
+                          CallerReference=str(uuid.uuid4()))
+            if private_zone:
+                params['VPC'] = dict(VPCRegion=vpc_region, VPCId=vpc_id[0])
+            if not module.check_mode:
+                result = throttled_call(limiter, conn.create_hosted_zone, **params)
+                hosted_zone = result['HostedZone']
+                zones.add(hosted_zone)
+                record['zone_id'] = strip_zone_id(hosted_zone['Id'])
+                if len(desired_vpcs) > 1:
+                    current_vpcs = set([vpc_id[0]])
+                    update_vpc_associations(conn, limiter, hosted_zone, vpc_region, current_vpcs, desired_vpcs)
+            if private_zone:
+                record['vpc_id'] = ','.join(desired_vpcs)
+            record['name'] = zone_in
+            return True, record
+
+        elif zone is not None:
+            if not module.check_mode:
+                try:
+                    throttled_call(limiter, conn.delete_hosted_zone, Id=strip_zone_id(zone['Id']))
+                except botocore.exceptions.ClientError as e:
+                    if e.response['Error']['Code'] != 'NoSuchHostedZone':
+                        raise
+                zones.remove(zone)
+            return True, dict(name=zone_in, zone_id=strip_zone_id(zone['Id']))
+
+        return False, dict(name=zone_in)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        raise ZoneError("Couldn't manage zone %s: %s" % (zone_in, str(e)), e)
+
+
+def fail_zone_error(module, e):
+    kwargs = dict()
+    if e.error is not None:
+        kwargs['exception'] = traceback.format_exc()
+        if hasattr(e.error, 'response'):
+            kwargs.update(camel_dict_to_snake_dict(e.error.response))
+    module.fail_json(msg=e.msg, **kwargs)
+
+
+def manage_zones(module, conn, limiter):
+    """zones: mode - resolve every zone from one index and manage them concurrently"""
+    try:
+        specs = [zone_spec(item, module.params) for item in module.params.get('zones')]
+    except ZoneError as e:
+        fail_zone_error(module, e)
+    seen = set()
+    for spec in specs:
+        key = (spec['zone'], spec['private_zone'])
+        if key in seen:
+            module.fail_json(msg="Zone %s is listed more than once" % spec['zone'])
+        seen.add(key)
+
+    try:
+        zones = ZoneIndex(module, conn, full=True)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json(msg="Couldn't list hosted zones: %s" % str(e), exception=traceback.format_exc())
+
+    def worker(spec):
+        zone = zones.find(spec['zone'], spec['private_zone'])
+        if zone is None and zones.cache_path:
+            # a cache miss may be a zone created since the cache was written
+            zone = zones.find(spec['zone'], spec['private_zone'], fresh=True)
+        return ensure_zone(module, conn, limiter, zones, spec, zone)
+
+    results = []
+    failed = False
+    for spec, (outcome, error) in zip(specs, run_concurrently(worker, specs, module.params.get('max_concurrency'))):
+        if error is not None:
+            failed = True
+            results.append(dict(name=spec['zone'], changed=False, failed=True,
+                                msg=getattr(error, 'msg', str(error))))
+        else:
+            changed, record = outcome
+            record['changed'] = changed
+            results.append(record)
+
+    changed = any(r['changed'] for r in results)
+    if failed:
+        module.fail_json(msg="Failed to manage some zones", changed=changed, zones=results)
+    module.exit_json(changed=changed, zones=results)
 
 
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            zone=dict(required=True),
+            zone=dict(),
+            zones=dict(type='list'),
             state=dict(default='present', choices=['present', 'absent']),
             vpc_id=dict(type='list', default=[]),
             vpc_region=dict(),
-            comment=dict(default='')
+            comment=dict(default=''),
+            zone_index_cache=dict(type='path'),
+            zone_index_cache_ttl=dict(type='int', default=300),
+            max_concurrency=dict(type='int', default=4),
         )
     )
     module = AnsibleModule(argument_spec=argument_spec,
+                           required_one_of=[['zone', 'zones']],
+                           mutually_exclusive=[['zone', 'zones']],
                            supports_check_mode=True)
 
     if not HAS_BOTO3:
-        module.fail_json("boto3 and botocore are required for route53_zone module")
-
-    zone_in = module.params.get('zone').lower()
-    state = module.params.get('state').lower()
-    vpc_id = module.params.get('vpc_id')
-    vpc_region = module.params.get('vpc_region')
-    comment = module.params.get('comment')
-
-    if zone_in[-1:] != '.':
-        zone_in += "."
-
-    private_zone = vpc_id is not None and vpc_region is not None
+        module.fail_json(msg="boto3 and botocore are required for route53_zone module")
 
     _, _, aws_connect_kwargs = get_aws_connection_info(module, boto3=True)
     conn = boto3_conn(module, conn_type='client', resource='route53',
                       **aws_connect_kwargs)
-
-    results = conn.list_hosted_zones()
-    zones = {}
-
-    for r53zone in results['HostedZones']:
-        zone_id = r53zone['Id'].replace('/hostedzone/', '')
-        zones[r53zone['Name']] = zone_id
-
-    if vpc_id:
-        desired_vpcs = set(vpc_id)
-
-    record = {
-        'private_zone': private_zone,
-        'vpc_id': vpc_id[0],
-        'vpc_region': vpc_region,
-        'comment': comment,
-    }
-
-    if state == 'present' and zone_in in zones:
-        if private_zone:
-            details = conn.get_hosted_zone(Id=zones[zone_in])
-            changed = False
-
-            if not details['HostedZone']['Config']['PrivateZone']:
-                module.fail_json(
-                    msg="Can't change VPC from public to private"
-                )
-
-            desired_vpcs = set(vpc_id)
-            current_vpc_region = details['VPCs'][0]['VPCRegion']
-            current_vpcs = set([v['VPCId'] for v in details['VPCs']])
-
-            if current_vpc_region != vpc_region:
-                module.fail_json(msg="Can't change VPC Region once a zone has been created")
-
-            if current_vpcs != desired_vpcs:
-                update_vpc_associations(module, conn, details['HostedZone'], current_vpcs, desired_vpcs)
-                changed = True
-
-        record['zone_id'] = zones[zone_in]
-        record['name'] = zone_in
-        record['vpc_id'] = ','.join(desired_vpcs)
-        module.exit_json(changed=changed, set=record)
-
-    elif state == 'present':
-        params = dict(Name=zone_in, HostedZoneConfig=dict(Comment=comment, PrivateZone=private_zone),
-                      CallerReference=str(uuid.uuid4()))
-        if private_zone:
-            params['VPC'] = dict(VPCRegion=vpc_region, VPCId=vpc_id[0])
-        if not module.check_mode:
-            result = conn.create_hosted_zone(**params)
-            hosted_zone = result['HostedZone']
-            zone_id = hosted_zone['Id'].replace('/hostedzone/', '')
-            record['zone_id'] = zone_id
-        record['name'] = zone_in
-        if len(desired_vpcs) > 1:
-            current_vpcs = set([vpc_id[0]])
-            update_vpc_associations(module, conn, hosted_zone, current_vpcs, desired_vpcs)
-            record['vpc_id'] = ','.join(desired_vpcs)
-
-        module.exit_json(changed=True, set=record)
-
-    elif state == 'absent' and zone_in in zones:
-        if not module.check_mode:
-            conn.delete_hosted_zone(zones[zone_in])
-        module.exit_json(changed=True)
-
-    elif state == 'absent':
-        module.exit_json(changed=False)
+    limiter = RateLimiter(ROUTE53_REQUESTS_PER_SECOND)
+
+    if module.params.get('zones') is not None:
+        manage_zones(module, conn, limiter)
+
+    spec = zone_spec(module.params, {})
+
+    try:
+        zones = ZoneIndex(module, conn)
+        zone = zones.find(spec['zone'], spec['private_zone'])
+        if zone is None and zones.index is not None:
+            # never create a duplicate zone, or leave one in place, on the word of a possibly stale cache
+            zone = zones.find(spec['zone'], spec['private_zone'], fresh=True)
+            if zone is not None:
+                zones.add(zone)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json(msg="Couldn't look up hosted zone %s: %s" % (spec['zone'], str(e)), exception=traceback.format_exc())
+
+    try:
+        changed, record = ensure_zone(module, conn, limiter, zones, spec, zone)
+    except ZoneError as e:
+        fail_zone_error(module, e)
+
+    if spec['state'] == 'absent':
+        module.exit_json(changed=changed)
+    module.exit_json(changed=changed, set=record)
 
 if __name__ == '__main__':
     main()
@@ -24,20 +24,42 @@ module: s3_bucket
 short_description: Manage S3 buckets in AWS, Ceph, Walrus and FakeS3
 description:
     - Manage S3 buckets in AWS, Ceph, Walrus and FakeS3
+    - On AWS with boto3 installed, the versioning, requester pays, policy and tags of a bucket are
+      fetched concurrently, and only the settings that differ from the task are written.
 version_added: "2.0"
 author: "Rob White (@wimnat)"
 options:
   force:
     description:
       - When trying to delete a bucket, delete all keys in the bucket first (an s3 bucket must be empty for a successful deletion)
+      - With boto3 installed, every object version and delete marker is removed, up to 1000 keys per
+        DeleteObjects request with I(max_concurrency) requests at a time. The counts of listed, deleted
+        and failed keys are returned in C(emptied).
     required: false
     default: no
     choices: [ 'yes', 'no' ]
+  max_concurrency:
+    description:
+      - How many DeleteObjects requests are sent at the same time when emptying a bucket with I(force).
+      - How many settings of a bucket are fetched or written at the same time, and with I(buckets),
+        how many buckets are reconciled at the same time.
+    default: 4
+    version_added: "2.8"
   name:
     description:
       - Name of the s3 bucket
-    required: true
+      - Either I(name) or I(buckets) is required.
+    required: false
     default: null
+  buckets:
+    description:
+      - Create or update many buckets in one invocation instead of looping over I(name). Requires boto3,
+        AWS and I(state=present).
+      - Each item is a dict with the keys C(name), C(policy), C(requester_pays), C(tags) and C(versioning).
+        Missing keys default to the module level options.
+      - The result is returned per bucket in C(buckets).
+    required: false
+    version_added: "2.8"
   policy:
     description:
       - The JSON policy as a string.
@@ -111,10 +133,21 @@ EXAMPLES = '''
       example: tag1
       another: tag2
 
+# Reconcile several buckets in one task, all tagged alike
+- s3_bucket:
+    tags:
+      team: data
+    buckets:
+      - name: data-raw
+        versioning: yes
+      - name: data-curated
+        policy: "{{ lookup('file','curated-policy.json') }}"
+
 '''
 
 import json
 import os
+import time
 import traceback
 import xml.etree.ElementTree as ET
 
@@ -124,6 +157,9 @@ from ansible.module_utils._text import to_native
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.ec2 import get_aws_connection_info, ec2_argument_spec
 from ansible.module_utils.ec2 import sort_json_policy_dict, compare_policies
+from ansible.module_utils.ec2 import boto3_conn, AWSRetry, HAS_BOTO3
+from ansible.module_utils.ec2 import ansible_dict_to_boto3_tag_list, boto3_tag_list_to_ansible_dict
+from ansible.module_utils.aws.concurrency import chunks, run_concurrently
 
 try:
     import boto.ec2
@@ -134,6 +170,26 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+try:
+    import botocore
+    from botocore.config import Config
+except ImportError:
+    pass  # caught by imported HAS_BOTO3
+
+# The most keys DeleteObjects accepts in one request
+DELETE_OBJECTS_MAX = 1000
+# How often keys S3 couldn't delete for a transient reason are sent again
+DELETE_OBJECTS_ATTEMPTS = 5
+DELETE_OBJECTS_RETRYABLE = ('SlowDown', 'InternalError', 'ServiceUnavailable')
+BUCKET_KEYS = ('policy', 'requester_pays', 'tags', 'versioning')
+
+
+class BucketError(Exception):
+    def __init__(self, msg, error):
+        super(BucketError, self).__init__(msg)
+        self.msg = msg
+        self.error = error
+
 
 def get_request_payment_status(bucket):
 
@@ -258,7 +314,303 @@ def _create_or_update_bucket(connection, module, location):
                      requester_pays=requester_pays_status, policy=current_policy, tags=current_tags_dict)
 
 
-def _destroy_bucket(connection, module):
+@AWSRetry.jittered_backoff(catch_extra_error_codes=['SlowDown', 'OperationAborted', 'NoSuchBucket'])
+def bucket_call(client, operation, **params):
+    # a bucket that was just created may not be visible to the next request yet
+    return getattr(client, operation)(**params)
+
+
+def error_code(e):
+    return getattr(e, 'response', {}).get('Error', {}).get('Code')
+
+
+def get_bucket_versioning(client, name):
+    response = bucket_call(client, 'get_bucket_versioning', Bucket=name)
+    # the shape boto's get_versioning_status returned
+    versioning = {}
+    if response.get('Status'):
+        versioning['Versioning'] = response['Status']
+    if response.get('MFADelete'):
+        versioning['MfaDelete'] = response['MFADelete']
+    return versioning
+
+
+def get_bucket_requester_pays(client, name):
+    return bucket_call(client, 'get_bucket_request_payment', Bucket=name).get('Payer') == 'Requester'
+
+
+def get_bucket_policy(client, name):
+    try:
+        return json.loads(bucket_call(client, 'get_bucket_policy', Bucket=name)['Policy'])
+    except botocore.exceptions.ClientError as e:
+        if error_code(e) == 'NoSuchBucketPolicy':
+            return {}
+        raise
+
+
+def get_bucket_tags(client, name):
+    try:
+        return boto3_tag_list_to_ansible_dict(bucket_call(client, 'get_bucket_tagging', Bucket=name)['TagSet'])
+    except botocore.exceptions.ClientError as e:
+        if error_code(e) == 'NoSuchTagSet':
+            return {}
+        raise
+
+
+BUCKET_SNAPSHOT = (
+    ('versioning', get_bucket_versioning),
+    ('requester_pays', get_bucket_requester_pays),
+    ('policy', get_bucket_policy),
+    ('tags', get_bucket_tags),
+)
+# what a bucket that was just created has
+NEW_BUCKET_SNAPSHOT = dict(versioning={}, requester_pays=False, policy={}, tags={})
+
+
+@AWSRetry.jittered_backoff(catch_extra_error_codes=['SlowDown'])
+def head_bucket(client, name):
+    return client.head_bucket(Bucket=name)
+
+
+def bucket_exists(client, name):
+    try:
+        head_bucket(client, name)
+    except botocore.exceptions.ClientError as e:
+        if error_code(e) in ('404', 'NoSuchBucket'):
+            return False
+        raise
+    return True
+
+
+def bucket_snapshot(client, name, max_concurrency):
+    """Fetch every setting the module manages in one go"""
+    outcomes = run_concurrently(lambda fetch: fetch[1](client, name), BUCKET_SNAPSHOT, max_concurrency)
+    snapshot = {}
+    for (key, dummy), (value, error) in zip(BUCKET_SNAPSHOT, outcomes):
+        if error is not None:
+            raise BucketError("Failed to get the %s of bucket %s" % (key, name), error)
+        snapshot[key] = value
+    return snapshot
+
+
+def plan_bucket(snapshot, spec):
+    """Diff a bucket snapshot against the desired settings
+
+    Returns (setting, operation, params, new value) for every setting that
+    differs; settings left to None in spec aren't managed.
+    """
+    changes = []
+
+    versioning = spec.get('versioning')
+    status = snapshot['versioning'].get('Versioning')
+    if versioning is not None and versioning != (status == 'Enabled'):
+        # once enabled, versioning can only be suspended
+        if versioning or status == 'Enabled':
+            new_status = 'Enabled' if versioning else 'Suspended'
+            new_versioning = dict(snapshot['versioning'], Versioning=new_status)
+            changes.append(('versioning', 'put_bucket_versioning',
+                            dict(VersioningConfiguration={'Status': new_status}), new_versioning))
+
+    requester_pays = spec.get('requester_pays')
+    if requester_pays is not None and requester_pays != snapshot['requester_pays']:
+        payer = 'Requester' if requester_pays else 'BucketOwner'
+        changes.append(('requester_pays', 'put_bucket_request_payment',
+                        dict(RequestPaymentConfiguration={'Payer': payer}), requester_pays))
+
+    policy = spec.get('policy')
+    if isinstance(policy, string_types):
+        policy = json.loads(policy)
+    if policy is not None:
+        if not policy:
+            if snapshot['policy']:
+                changes.append(('policy', 'delete_bucket_policy', {}, {}))
+        elif compare_policies(snapshot['policy'], policy):
+            changes.append(('policy', 'put_bucket_policy', dict(Policy=json.dumps(policy)), policy))
+
+    tags = spec.get('tags')
+    if tags is not None and tags != snapshot['tags']:
+        if tags:
+            changes.append(('tags', 'put_bucket_tagging',
+                            dict(Tagging={'TagSet': ansible_dict_to_boto3_tag_list(tags)}), tags))
+        else:
+            changes.append(('tags', 'delete_bucket_tagging', {}, {}))
+
+    return changes
+
+
+def reconcile_bucket(client, spec, region, max_concurrency):
+    """Create or update one bucket, returning its settings and whether it changed"""
+    name = spec['name']
+    try:
+        exists = bucket_exists(client, name)
+        if not exists:
+            params = dict(Bucket=name)
+            if region not in ('us-east-1', '', None):
+                params['CreateBucketConfiguration'] = {'LocationConstraint': region}
+            bucket_call(client, 'create_bucket', **params)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        raise BucketError("Failed to create bucket %s" % name, e)
+
+    if exists:
+        snapshot = bucket_snapshot(client, name, max_concurrency)
+    else:
+        snapshot = dict(NEW_BUCKET_SNAPSHOT)
+
+    changes = plan_bucket(snapshot, spec)
+    outcomes = run_concurrently(lambda change: bucket_call(client, change[1], Bucket=name, **change[2]),
+                                changes, max_concurrency)
+    for (key, dummy, params, value), (response, error) in zip(changes, outcomes):
+        if error is not None:
+            raise BucketError("Failed to update the %s of bucket %s" % (key, name), error)
+        snapshot[key] = value
+
+    return dict(snapshot, name=name, changed=not exists or bool(changes))
+
+
+def reconcile_buckets(client, module, region):
+    """Reconcile every item of the buckets option, returning one result per bucket"""
+    specs = []
+    for item in module.params.get('buckets'):
+        if not isinstance(item, dict) or not item.get('name'):
+            module.fail_json(msg="Every item of buckets needs a name: %s" % item)
+        spec = dict((key, module.params.get(key)) for key in BUCKET_KEYS)
+        spec.update((key, item[key]) for key in BUCKET_KEYS if item.get(key) is not None)
+        spec['name'] = item['name']
+        specs.append(spec)
+
+    # the buckets are reconciled concurrently, the settings of each one in turn
+    outcomes = run_concurrently(lambda spec: reconcile_bucket(client, spec, region, 1),
+                                specs, module.params.get('max_concurrency'))
+    results = []
+    failed = []
+    for spec, (result, error) in zip(specs, outcomes):
+        if error is None:
+            results.append(result)
+            continue
+        if isinstance(error, BucketError):
+            msg = "%s: %s" % (error.msg, to_native(error.error))
+        else:
+            msg = to_native(error)
+        results.append(dict(name=spec['name'], failed=True, msg=msg))
+        failed.append(spec['name'])
+    return results, failed
+
+
+@AWSRetry.jittered_backoff(catch_extra_error_codes=['SlowDown'])
+def list_object_versions_page(client, **params):
+    return client.list_object_versions(**params)
+
+
+@AWSRetry.jittered_backoff(catch_extra_error_codes=['SlowDown'])
+def list_objects_page(client, **params):
+    return client.list_objects_v2(**params)
+
+
+@AWSRetry.jittered_backoff(catch_extra_error_codes=['SlowDown'])
+def delete_objects(client, name, objects):
+    return client.delete_objects(Bucket=name, Delete={'Objects': objects, 'Quiet': True})
+
+
+def bucket_object_pages(client, name):
+    """Yield the keys of a bucket a page at a time, as DeleteObjects wants them
+
+    Lists every version and delete marker, falling back to plain keys on
+    S3-compatible stores that don't implement ListObjectVersions.
+    """
+    params = dict(Bucket=name)
+    try:
+        page = list_object_versions_page(client, **params)
+    except botocore.exceptions.ClientError as e:
+        if e.response.get('Error', {}).get('Code') not in ('NotImplemented', 'MethodNotAllowed'):
+            raise
+        page = None
+
+    while page is not None:
+        yield [dict(Key=v['Key'], VersionId=v['VersionId'])
+               for v in page.get('Versions', []) + page.get('DeleteMarkers', [])]
+        if not page.get('IsTruncated'):
+            return
+        params['KeyMarker'] = page['NextKeyMarker']
+        if page.get('NextVersionIdMarker'):
+            params['VersionIdMarker'] = page['NextVersionIdMarker']
+        page = list_object_versions_page(client, **params)
+
+    params = dict(Bucket=name)
+    while True:
+        page = list_objects_page(client, **params)
+        yield [dict(Key=o['Key']) for o in page.get('Contents', [])]
+        if not page.get('IsTruncated'):
+            return
+        params['ContinuationToken'] = page['NextContinuationToken']
+
+
+def delete_object_batch(client, name, objects):
+    """Delete up to 1000 keys, sending again those S3 was too busy to delete
+
+    Returns the number of deleted keys and the errors of the others.
+    """
+    deleted = 0
+    failed = []
+    retry = []
+    for attempt in range(DELETE_OBJECTS_ATTEMPTS):
+        if attempt:
+            time.sleep(2 ** attempt)
+        errors = delete_objects(client, name, objects).get('Errors', [])
+        deleted += len(objects) - len(errors)
+        retry = [e for e in errors if e.get('Code') in DELETE_OBJECTS_RETRYABLE]
+        failed.extend(e for e in errors if e.get('Code') not in DELETE_OBJECTS_RETRYABLE)
+        if not retry:
+            break
+        objects = [dict((k, e[k]) for k in ('Key', 'VersionId') if e.get(k)) for e in retry]
+    return deleted, failed + retry
+
+
+def empty_bucket(client, module, name):
+    """Delete every key of a bucket, several DeleteObjects requests at a time
+
+    Keys are deleted as they are listed, max_concurrency batches per round,
+    so a bucket of millions of objects is never held in memory. Returns the
+    progress counters.
+    """
+    max_concurrency = module.params.get('max_concurrency') or 1
+    round_size = DELETE_OBJECTS_MAX * max_concurrency
+    emptied = dict(listed=0, deleted=0, failed=0, batches=0)
+    errors = []
+
+    def delete_round(objects):
+        batches = chunks(objects, DELETE_OBJECTS_MAX)
+        outcomes = run_concurrently(lambda batch: delete_object_batch(client, name, batch), batches, max_concurrency)
+        for outcome, error in outcomes:
+            if error is not None:
+                module.fail_json(msg="Failed to delete objects from bucket %s: %s" % (name, to_native(error)),
+                                 emptied=emptied)
+            emptied['batches'] += 1
+            emptied['deleted'] += outcome[0]
+            emptied['failed'] += len(outcome[1])
+            errors.extend(outcome[1])
+        module.log("s3_bucket: deleted %(deleted)d of %(listed)d keys listed so far" % emptied)
+
+    pending = []
+    try:
+        for page in bucket_object_pages(client, name):
+            emptied['listed'] += len(page)
+            pending.extend(page)
+            while len(pending) >= round_size:
+                delete_round(pending[:round_size])
+                pending = pending[round_size:]
+        if pending:
+            delete_round(pending)
+    except (botocore.exceptions.ClientError, botocore.exceptions.BotoCoreError) as e:
+        module.fail_json(msg="Failed to list objects of bucket %s: %s" % (name, to_native(e)),
+                         exception=traceback.format_exc(), emptied=emptied)
+
+    if errors:
+        module.fail_json(msg="Failed to delete %d keys from bucket %s, the first: %s" % (len(errors), name, errors[0]),
+                         emptied=emptied)
+    return emptied
+
+
+def _destroy_bucket(connection, module, s3_client=None):
 
     force = module.params.get("force")
     name = module.params.get("name")
@@ -273,7 +625,10 @@ def _destroy_bucket(connection, module):
             # Bucket already absent
             module.exit_json(changed=changed)
 
-    if force:
+    emptied = None
+    if force and s3_client is not None:
+        emptied = empty_bucket(s3_client, module, name)
+    elif force:
         try:
             # Empty the bucket
             for key in bucket.list():
@@ -286,8 +641,10 @@ def _destroy_bucket(connection, module):
         bucket = connection.delete_bucket(name)
         changed = True
     except S3ResponseError as e:
-        module.fail_json(msg=e.message)
+        module.fail_json(msg=e.message, emptied=emptied)
 
+    if emptied is not None:
+        module.exit_json(changed=changed, emptied=emptied)
     module.exit_json(changed=changed)
 
 
@@ -313,9 +670,9 @@ def _create_or_update_bucket_ceph(connection, module, location):
         module.fail_json(msg='Unable to create bucket, no error from the API')
 
 
-def _destroy_bucket_ceph(connection, module):
+def _destroy_bucket_ceph(connection, module, s3_client=None):
 
-    _destroy_bucket(connection, module)
+    _destroy_bucket(connection, module, s3_client=s3_client)
 
 
 def create_or_update_bucket(connection, module, location, flavour='aws'):
@@ -325,11 +682,11 @@ def create_or_update_bucket(connection, module, location, flavour='aws'):
         _create_or_update_bucket(connection, module, location)
 
 
-def destroy_bucket(connection, module, flavour='aws'):
+def destroy_bucket(connection, module, flavour='aws', s3_client=None):
     if flavour == 'ceph':
-        _destroy_bucket_ceph(connection, module)
+        _destroy_bucket_ceph(connection, module, s3_client=s3_client)
     else:
-        _destroy_bucket(connection, module)
+        _destroy_bucket(connection, module, s3_client=s3_client)
 
 
 def is_fakes3(s3_url):
@@ -351,6 +708,22 @@ def is_walrus(s3_url):
         return False
 
 
+def get_s3_client(module, s3_url):
+    """Returns a boto3 S3 client for AWS, or for the S3-compatible store at s3_url"""
+    region, ec2_url, aws_connect_params = get_aws_connection_info(module, boto3=True)
+    endpoint = None
+    if s3_url:
+        endpoint = s3_url
+        if is_fakes3(s3_url):
+            fakes3 = urlparse.urlparse(s3_url)
+            scheme = 'https' if fakes3.scheme == 'fakes3s' else 'http'
+            endpoint = '%s://%s' % (scheme, fakes3.netloc)
+        # S3-compatible stores rarely serve bucket subdomains
+        aws_connect_params['config'] = Config(s3={'addressing_style': 'path'})
+    return boto3_conn(module, conn_type='client', resource='s3', region=region or 'us-east-1',
+                      endpoint=endpoint, **aws_connect_params)
+
+
 def main():
 
     argument_spec = ec2_argument_spec()
@@ -358,17 +731,21 @@ def main():
         dict(
             force=dict(required=False, default='no', type='bool'),
             policy=dict(required=False, default=None, type='json'),
-            name=dict(required=True, type='str'),
+            name=dict(type='str'),
+            buckets=dict(type='list'),
             requester_pays=dict(default='no', type='bool'),
             s3_url=dict(aliases=['S3_URL'], type='str'),
             state=dict(default='present', type='str', choices=['present', 'absent']),
             tags=dict(required=False, default=None, type='dict'),
             versioning=dict(default=None, type='bool'),
-            ceph=dict(default='no', type='bool')
+            ceph=dict(default='no', type='bool'),
+            max_concurrency=dict(default=4, type='int')
         )
     )
 
-    module = AnsibleModule(argument_spec=argument_spec)
+    module = AnsibleModule(argument_spec=argument_spec,
+                           required_one_of=[['name', 'buckets']],
+                           mutually_exclusive=[['name', 'buckets']])
 
     if not HAS_BOTO:
         module.fail_json(msg='boto required for this module')
@@ -440,11 +817,35 @@ def main():
         module.fail_json(msg='Unknown error, failed to create s3 connection, no information from boto.')
 
     state = module.params.get("state")
-
-    if state == 'present':
+    # fakes3 and Walrus don't implement the bucket sub-resources, so they stay with boto
+    use_boto3 = HAS_BOTO3 and flavour == 'aws' and not is_fakes3(s3_url) and not is_walrus(s3_url)
+
+    if module.params.get('buckets') is not None:
+        if state != 'present':
+            module.fail_json(msg='buckets can only be used with state=present')
+        if not use_boto3:
+            module.fail_json(msg='buckets requires boto3 and AWS')
+        results, failed = reconcile_buckets(get_s3_client(module, s3_url), module, region)
+        changed = any(result.get('changed') for result in results)
+        if failed:
+            module.fail_json(msg='Failed to reconcile buckets: %s' % ', '.join(failed), changed=changed, buckets=results)
+        module.exit_json(changed=changed, buckets=results)
+
+    if state == 'present' and use_boto3:
+        try:
+            result = reconcile_bucket(get_s3_client(module, s3_url), module.params, region,
+                                      module.params.get('max_concurrency'))
+        except BucketError as e:
+            module.fail_json(msg="%s: %s" % (e.msg, to_native(e.error)))
+        module.exit_json(**result)
+    elif state == 'present':
         create_or_update_bucket(connection, module, location, flavour=flavour)
     elif state == 'absent':
-        destroy_bucket(connection, module, flavour=flavour)
+        s3_client = None
+        # Walrus doesn't speak enough of the S3 API for the batched deletion
+        if module.params.get('force') and HAS_BOTO3 and not is_walrus(s3_url):
+            s3_client = get_s3_client(module, s3_url)
+        destroy_bucket(connection, module, flavour=flavour, s3_client=s3_client)
 
 if __name__ == '__main__':
     main()